@@ -0,0 +1,148 @@
+"""
+Barge-in handling for agent replies.
+Stops LLM generation as soon as the caller interrupts, and accounts for
+tokens generated against tokens the caller actually heard.
+"""
+import asyncio
+import logging
+from bisect import bisect_right
+from typing import AsyncIterator, Callable, List, Optional
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("barge-in")
+
+
+def _speech_chars(text: str) -> int:
+    # Segments are whitespace-stripped before TTS, so compare non-space characters
+    return len(text) - sum(text.count(c) for c in " \t\r\n")
+
+
+# Reader -> track() signals
+_END = object()
+
+
+class _StreamError:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class ReplyTracker:
+    """
+    One agent reply: the LLM tokens fed to it, and how many were spoken.
+
+    cancel() interrupts the stream mid-await, so generation stops even
+    while the reply is waiting on the next token. The stream is then
+    closed, which tears down the HTTP request to the inference server.
+    Tokens are counted as they arrive from the LLM.
+    """
+
+    def __init__(self, on_first_token: Optional[Callable[[], None]] = None):
+        """
+        Initialize reply.
+
+        Args:
+            on_first_token: Called when the first LLM token arrives
+        """
+        self.on_first_token = on_first_token
+        self.tokens_generated = 0
+        self.tokens_spoken: Optional[int] = None
+        self.cancelled = False
+        self.finished = False
+        # Some text came from a degraded path (local fallback, error message)
+        self.degraded = False
+        self._token_ends: List[int] = []
+        self._chars = 0
+        self._reader: Optional[asyncio.Task] = None
+
+    @property
+    def in_flight(self) -> bool:
+        """True while the LLM stream is still open."""
+        return not self.finished and not self.cancelled
+
+    async def track(self, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Pass an LLM token stream through, counting tokens.
+
+        One reader task per reply pulls the stream into a queue, so
+        cancel() can stop it mid-await without a task per token.
+
+        Args:
+            stream: Raw LLM token stream
+
+        Yields:
+            The stream's tokens until it ends or the reply is cancelled
+
+        Raises:
+            Whatever the stream raised
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._reader = asyncio.ensure_future(self._read(stream, queue))
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, _StreamError):
+                    raise item.error
+                yield item
+        finally:
+            self.finished = True
+            if not self._reader.done():
+                self._reader.cancel()
+            await asyncio.wait([self._reader])
+
+    async def _read(self, stream: AsyncIterator[str], queue: asyncio.Queue) -> None:
+        iterator = stream.__aiter__()
+        try:
+            async for token in iterator:
+                if getattr(token, "degraded", False):
+                    self.degraded = True
+                if self.tokens_generated == 0 and self.on_first_token is not None:
+                    self.on_first_token()
+                self.tokens_generated += 1
+                self._chars += _speech_chars(token)
+                self._token_ends.append(self._chars)
+                queue.put_nowait(token)
+        except asyncio.CancelledError:
+            if not self.cancelled:
+                raise
+        except Exception as e:
+            queue.put_nowait(_StreamError(e))
+        finally:
+            # Closing the stream tears down the HTTP request to the inference server
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            queue.put_nowait(_END)
+
+    def cancel(self) -> bool:
+        """
+        Stop generating this reply.
+
+        Returns:
+            True if the LLM stream was still open
+        """
+        if not self.in_flight:
+            return False
+        self.cancelled = True
+        if self._reader is not None and not self._reader.done():
+            self._reader.cancel()
+        return True
+
+    def mark_spoken(self, text: Optional[str] = None) -> int:
+        """
+        Record how much of the reply the caller heard (first call wins).
+
+        Args:
+            text: Text spoken before an interruption (None = all of it)
+
+        Returns:
+            Tokens spoken
+        """
+        if self.tokens_spoken is None:
+            if text is None:
+                self.tokens_spoken = self.tokens_generated
+            else:
+                self.tokens_spoken = bisect_right(self._token_ends, _speech_chars(text))
+        return self.tokens_spoken
@@ -12,14 +12,21 @@ from livekit.agents import (
     AutoSubscribe,
     JobContext,
     llm,
+    stt,
     VoiceAssistantOptions,
 )
 from livekit.agents.voice_assistant import VoiceAssistant
-from livekit.plugins import deepgram, silero
+from livekit.plugins import deepgram
 
-from services.llm.huggingface_provider import HuggingFaceLLMProvider
+from services.logic.embedding_cache import EmbeddingLRUCache
 from services.logic.semantic_scorer import SemanticIntentScorer
-from agent.router import ClientRouter
+from services.tts.phrase_cache import PhraseAudioCache
+from agent.engine import engine_from_settings
+from agent.latency import END_OF_SPEECH, FINAL_TRANSCRIPT, FIRST_AUDIO, LAST_AUDIO
+from agent.phrase_player import LiveKitSynthesizer, PhrasePlayer
+from agent.prewarm import WorkerResources, load_worker_resources
+from agent.session import CallSession
+from agent.trace import start_trace
 from analytics.db import log_call_to_db
 from config.settings import settings
 
@@ -27,20 +34,41 @@ logger = logging.getLogger("voice-agent")
 
 
 class AIReceptionistAgent:
-    """Main voice agent for handling incoming calls."""
-
-    def __init__(self):
-        """Initialize agent with providers and router."""
-        self.llm_provider = HuggingFaceLLMProvider()
-        self.router = ClientRouter(settings.clients_db_path)
-        self.semantic_scorer = SemanticIntentScorer()
-        self.conversation_history = []
-        self.call_start_time = None
-        self.latencies = {
-            "stt": 0,
-            "llm": 0,
-            "tts": 0,
-        }
+    """
+    Main voice agent for handling incoming calls.
+
+    One instance per job process, which LiveKit gives a single call.
+    Per-call state lives on the CallSession created for the call.
+    """
+
+    def __init__(self, resources: Optional[WorkerResources] = None):
+        """
+        Initialize agent with providers and router.
+
+        Args:
+            resources: Models and clients loaded once by worker prewarm.
+                Loaded here when omitted.
+        """
+        if resources is None:
+            resources = load_worker_resources()
+
+        self.llm_provider = resources.llm_provider
+        self.vad = resources.vad
+        cache_bytes = int(settings.embedding_cache_mb * 1024 * 1024)
+        self.semantic_scorer = SemanticIntentScorer(
+            settings.semantic_model_name,
+            model=resources.embedding_model,
+            cache=EmbeddingLRUCache(max_bytes=cache_bytes) if cache_bytes else None,
+        )
+        self.engine = engine_from_settings(settings, self.llm_provider, self.semantic_scorer)
+        self.phrase_cache = (
+            PhraseAudioCache(
+                settings.phrase_cache_dir,
+                LiveKitSynthesizer(self._create_tts_wrapper(), settings.tts_voice),
+            )
+            if settings.phrase_cache_enabled
+            else None
+        )
 
     async def handle_call(
         self, ctx: JobContext, incoming_number: str
@@ -52,33 +80,23 @@ class AIReceptionistAgent:
             ctx: LiveKit job context
             incoming_number: Caller's phone number (E.164)
         """
-        self.call_start_time = time.time()
         logger.info(f"📞 Incoming call from: {incoming_number}")
+        session = None
 
         try:
             # Connect to LiveKit room
             await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
 
-            # Get client config by phone number
-            client_config = self.router.get_client_by_phone(incoming_number)
-            if not client_config:
-                logger.warning(f"No client found for {incoming_number}")
+            # Route to client + profession and start an isolated session
+            session = await self.engine.start_session(incoming_number)
+            if not session:
                 return
-
-            # Get profession-specific config
-            profession = client_config.get("profession", "dentist")
-            prof_config = self.router.get_profession_config(profession)
-            system_prompt = prof_config.get("system_prompt", "You are a helpful AI assistant.")
-            
-            # Register specific intents for this profession
-            # Assuming prof_config can have "intents": {"EMERGENCY": [...], "BOOKING": [...]}
-            # For backward compat, map emergency_keywords to "EMERGENCY"
-            intents = prof_config.get("intents", {})
-            legacy_keywords = prof_config.get("emergency_keywords", [])
-            if legacy_keywords:
-                intents["EMERGENCY"] = intents.get("EMERGENCY", []) + legacy_keywords
-            
-            self.semantic_scorer.register_intents(intents)
+            session.trace = start_trace(session.call_id, settings.trace_sample_rate)
+            if session.trace.enabled:
+                session.trace.metadata.update(
+                    client=session.client_config.get("name", "unknown"),
+                    profession=session.profession,
+                )
 
             # Get participant (caller)
             participant = await ctx.wait_for_participant()
@@ -86,10 +104,10 @@ class AIReceptionistAgent:
 
             # Create voice assistant
             assistant = VoiceAssistant(
-                vad=silero.VAD.load(),
-                stt=deepgram.STT(),  # Cloud STT (fast)
-                llm=self._create_llm_wrapper(system_prompt),
-                tts=self._create_tts_wrapper(),
+                vad=self.vad,
+                stt=self._create_stt_wrapper(session),  # Cloud STT (fast)
+                llm=self._create_llm_wrapper(session),
+                tts=self._create_tts_wrapper(session),
                 voice_assistant_options=VoiceAssistantOptions(
                     base_volume=1.0,
                     transcription_options=deepgram.STTOptions(
@@ -102,116 +120,309 @@ class AIReceptionistAgent:
             # Start assistant
             assistant.start(ctx.room, participant)
 
-            # Send greeting
-            greeting = prof_config.get("greeting", "Hello! Thank you for calling. How can I help you today?")
-            await assistant.say(greeting, allow_interruptions=True)
+            # Fixed phrases and filler play from cached audio instead of live TTS
+            player = PhrasePlayer(ctx.room)
+            speak_fixed = self._create_phrase_speaker(session, assistant, player)
+            session.speak_fixed = speak_fixed
+            if self.phrase_cache is not None:
+                session.play_filler = self._create_filler_player(session, player)
+
+            # Speak the emergency line as soon as an interim transcript fires it
+            def on_early_intent(label: str, score: float):
+                session.spawn(speak_fixed(session.emergency_response))
+
+            if session.interim_monitor is not None:
+                session.interim_monitor.on_trigger = on_early_intent
+
+            # Turn latency spans
+            @assistant.on("user_started_speaking")
+            def on_user_started():
+                session.trace.instant("vad", "speech.start")
+                # Barge-in on an interruptible cached phrase (the greeting)
+                if player.interrupt():
+                    session.trace.instant("tts", "phrase_cache.interrupted")
+
+            @assistant.on("user_stopped_speaking")
+            def on_user_stopped():
+                session.latency.mark(END_OF_SPEECH)
+                session.trace.instant("vad", "speech.end")
+
+            @assistant.on("agent_started_speaking")
+            def on_agent_started():
+                session.latency.mark(FIRST_AUDIO)
+                session.trace.instant("tts", "playout.start")
+
+            @assistant.on("agent_stopped_speaking")
+            def on_agent_stopped():
+                session.latency.mark(LAST_AUDIO)
+                session.trace.instant("tts", "playout.end")
 
             # Track conversation
             @assistant.on("user_speech_committed")
             def on_user_speech(msg: str):
-                self.conversation_history.append(f"Caller: {msg}")
+                session.add_caller_message(msg)
 
             @assistant.on("agent_speech_committed")
             def on_agent_speech(msg: str):
-                self.conversation_history.append(f"Agent: {msg}")
+                session.add_agent_message(msg)
+                session.reply_spoken()
+
+            # Caller talked over the agent: stop generating what won't be heard
+            @assistant.on("agent_speech_interrupted")
+            def on_agent_interrupted(msg: str):
+                session.add_agent_message(msg)
+                session.interrupt(spoken_text=msg)
+
+            # Send greeting
+            await speak_fixed(session.greeting, allow_interruptions=True)
 
             # Wait for call to end
             await assistant.wait_for_completion()
 
             # Log call analytics
-            await self._log_call_analytics(client_config)
+            await self._log_call_analytics(session)
 
         except Exception as e:
             logger.error(f"❌ Call error: {e}", exc_info=True)
+        finally:
+            if session is not None:
+                session.close()
+                if session.trace.enabled:
+                    await self._write_trace(session)
+
+    def _create_phrase_speaker(
+        self, session: CallSession, assistant: VoiceAssistant, player: PhrasePlayer
+    ):
+        """
+        Create the call's fixed-phrase speaker.
+
+        Cached phrases are played straight into the room and return once
+        heard; an interruptible phrase stops when the caller starts
+        speaking. A phrase not yet cached is synthesized once, played, and
+        kept in the cache for later calls; live TTS is only the fallback
+        when that synthesis fails.
+        """
+        async def speak_fixed(text: str, allow_interruptions: bool = False) -> None:
+            audio = None
+            if self.phrase_cache is not None:
+                try:
+                    audio = await self.phrase_cache.get_or_synthesize(text)
+                except Exception as e:
+                    logger.error(f"Phrase synthesis failed, speaking through live TTS: {e}")
+            if audio is None:
+                await assistant.say(text, allow_interruptions=allow_interruptions)
+                return
+
+            session.latency.mark(FIRST_AUDIO)
+            session.trace.instant("tts", "phrase_cache.play", chars=len(text))
+            heard = await player.play(audio, wait_for_playout=True, interruptible=allow_interruptions)
+            session.latency.mark(LAST_AUDIO)
+            session.trace.instant("tts", "playout.end")
+            if heard:
+                session.add_agent_message(text)
+            else:
+                logger.info("Cached phrase interrupted by the caller")
+
+        return speak_fixed
+
+    def _create_filler_player(self, session: CallSession, player: PhrasePlayer):
+        """
+        Create the call's filler player.
+
+        Filler only ever plays from cache: going through live TTS would
+        take as long as the LLM it is meant to mask. An uncached phrase is
+        skipped and synthesized in the background.
+        """
+
+        async def play_filler(text: str) -> None:
+            audio = await self.phrase_cache.lookup(text)
+            if audio is None:
+                session.spawn(self.phrase_cache.get_or_synthesize(text))
+                return
+            await player.play(audio, wait_for_playout=True)
+
+        return play_filler
+
+    def _create_stt_wrapper(self, session: CallSession):
+        """
+        Create Deepgram STT that also feeds interim transcripts to the
+        session (early intent triggering and speculative generation), and
+        timestamps final transcripts for turn latency.
+        """
+        inner_stt = deepgram.STT(interim_results=True)
 
-    def _create_llm_wrapper(self, system_prompt: str):
+        def on_interim(text: str):
+            session.trace.instant("stt", "stt.interim", chars=len(text))
+            session.spawn(session.on_interim_transcript(text))
+
+        class InterimTapStream:
+            """Proxy over the Deepgram stream that taps interim events."""
+
+            def __init__(self, inner):
+                self._inner = inner
+
+            def __getattr__(self, name):
+                return getattr(self._inner, name)
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                event = await self._inner.__anext__()
+                if event.type == stt.SpeechEventType.INTERIM_TRANSCRIPT and event.alternatives:
+                    on_interim(event.alternatives[0].text)
+                elif event.type == stt.SpeechEventType.FINAL_TRANSCRIPT:
+                    session.latency.mark(FINAL_TRANSCRIPT)
+                    session.trace.instant("stt", "stt.final")
+                return event
+
+        class InterimTapSTT(stt.STT):
+            def __init__(self, inner):
+                super().__init__(capabilities=inner.capabilities)
+                self._inner = inner
+
+            async def recognize(self, *args, **kwargs):
+                return await self._inner.recognize(*args, **kwargs)
+
+            def stream(self, *args, **kwargs):
+                return InterimTapStream(self._inner.stream(*args, **kwargs))
+
+        return InterimTapSTT(inner_stt)
+
+    def _create_llm_wrapper(self, session: CallSession):
         """
         Create LLM wrapper compatible with LiveKit.
-        Uses parent agent's semantic scorer.
+        Delegates each turn to the call's session.
         """
 
         class HFLLMWrapper(llm.LLM):
-            def __init__(self, provider, sys_prompt, scorer):
+            def __init__(self, call_session):
                 super().__init__()
-                self.provider = provider
-                self.system_prompt = sys_prompt
-                self.scorer = scorer
+                self.session = call_session
 
             async def chat(self, chat_ctx: llm.ChatContext) -> llm.ChatResponse:
                 # Get last user message
                 messages = chat_ctx.messages
                 user_msg = messages[-1].content if messages else ""
 
-                # 🧠 Micro-Model Semantic Check (Sub-second)
-                intent_label, score = self.scorer.score(user_msg)
-                
-                if intent_label == "EMERGENCY" and score > 0.75:
-                    logger.info(f"🚨 SEMANTIC TRIGGER: {intent_label} ({score:.2f})")
-                    
-                    async def emergency_stream():
-                        # Immediate response
-                        response_text = "I understand this is urgent. Let me check our emergency schedule immediately."
-                        yield llm.ChatChunk(
-                            choices=[
-                                llm.Choice(
-                                    delta=llm.ChoiceDelta(role="assistant", content=response_text),
-                                    index=0,
-                                )
-                            ]
-                        )
-                    return llm.ChatResponse(stream=emergency_stream())
-
-                # Get stream from HF
-                hf_stream = self.provider.stream_response(
-                    prompt=user_msg,
-                    system_prompt=self.system_prompt,
-                )
+                reply_stream = self.session.respond(user_msg)
 
-                # Convert text stream to LiveKit ChatChunks
+                # Convert sentence segments to LiveKit ChatChunks
                 async def stream_adapter():
-                    async for chunk in hf_stream:
-                        yield llm.ChatChunk(
-                            choices=[
-                                llm.Choice(
-                                    delta=llm.ChoiceDelta(role="assistant", content=chunk),
-                                    index=0,
-                                )
-                            ]
-                        )
+                    try:
+                        async for chunk in reply_stream:
+                            yield llm.ChatChunk(
+                                choices=[
+                                    llm.Choice(
+                                        delta=llm.ChoiceDelta(role="assistant", content=chunk),
+                                        index=0,
+                                    )
+                                ]
+                            )
+                    finally:
+                        # Closed early on interruption: close the reply down to the HTTP stream
+                        await reply_stream.aclose()
 
                 return llm.ChatResponse(stream=stream_adapter())
 
-        return HFLLMWrapper(self.llm_provider, system_prompt, self.semantic_scorer)
+        return HFLLMWrapper(session)
 
-    def _create_tts_wrapper(self):
-        """Create TTS wrapper (Cartesia for ultra-low latency)."""
+    def _create_tts_wrapper(self, session: Optional[CallSession] = None):
+        """
+        Create TTS wrapper (Cartesia for ultra-low latency).
+        For a traced call, each synthesized audio chunk is traced.
+        """
         from livekit.plugins import cartesia
 
-        return cartesia.TTS(
+        inner_tts = cartesia.TTS(
             api_key=settings.cartesia_api_key,
-            voice="sonic-english",
+            voice=settings.tts_voice,
         )
+        if session is None or not session.trace.enabled:
+            return inner_tts
+
+        class ChunkTapStream:
+            """Proxy over a TTS stream that traces audio chunks."""
+
+            def __init__(self, inner):
+                self._inner = inner
+                self._chunks = 0
+
+            def __getattr__(self, name):
+                return getattr(self._inner, name)
 
-    async def _log_call_analytics(self, client_config: dict) -> None:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                audio = await self._inner.__anext__()
+                self._chunks += 1
+                session.trace.instant("tts", "tts.chunk", index=self._chunks)
+                return audio
+
+        class TracedTTS:
+            """Proxy over the TTS engine that taps its streams."""
+
+            def __init__(self, inner):
+                self._inner = inner
+
+            def __getattr__(self, name):
+                return getattr(self._inner, name)
+
+            def synthesize(self, text, *args, **kwargs):
+                session.trace.instant("tts", "tts.synthesize", chars=len(text))
+                return ChunkTapStream(self._inner.synthesize(text, *args, **kwargs))
+
+            def stream(self, *args, **kwargs):
+                return ChunkTapStream(self._inner.stream(*args, **kwargs))
+
+        return TracedTTS(inner_tts)
+
+    async def _log_call_analytics(self, session: CallSession) -> None:
         """
         Log call to analytics database.
 
         Args:
-            client_config: Client configuration dict
+            session: Finished call session
         """
+        client_config = session.client_config
         try:
-            total_duration = time.time() - self.call_start_time
-            transcript = "\n".join(self.conversation_history)
-
-            await log_call_to_db(
-                client_name=client_config.get("name", "unknown"),
-                duration=total_duration,
-                transcript=transcript,
-                profession=client_config.get("profession", "unknown"),
-                success=True,
-            )
+            total_duration = session.duration()
+            transcript = session.transcript()
+            session.latency.close()
+            latency = session.latency.call_summary()
+
+            with session.trace.span("db", "db.log_call"):
+                await log_call_to_db(
+                    client_name=client_config.get("name", "unknown"),
+                    duration=total_duration,
+                    transcript=transcript,
+                    profession=client_config.get("profession", "unknown"),
+                    success=True,
+                    turns=session.turns,
+                    template_turns=session.template_turns,
+                    stt_latency_ms=latency["stt_latency_ms"],
+                    llm_latency_ms=latency["llm_latency_ms"],
+                    tts_latency_ms=latency["tts_latency_ms"],
+                    turn_latencies=session.latency.turn_records(),
+                )
 
-            logger.info(f"✅ Call logged: {total_duration:.1f}s")
+            usage = session.token_usage()
+            logger.info(
+                f"✅ Call logged: {total_duration:.1f}s, "
+                f"LLM tokens spoken {usage['spoken']}/{usage['generated']}, "
+                f"latency ms stt={latency['stt_latency_ms'] or 0:.0f} "
+                f"llm={latency['llm_latency_ms'] or 0:.0f} tts={latency['tts_latency_ms'] or 0:.0f}"
+            )
 
         except Exception as e:
             logger.error(f"Error logging call: {e}")
+
+    async def _write_trace(self, session: CallSession) -> None:
+        """Write a traced call's timeline to the trace directory."""
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, session.trace.write, settings.trace_dir
+            )
+        except Exception as e:
+            logger.error(f"Error writing call trace: {e}")
@@ -0,0 +1,278 @@
+"""
+Conversation context for LLM turns.
+Keeps the most recent turns verbatim within a token budget and folds
+older turns into a running summary: key facts the caller has given
+(name, phone, insurance, reason, requested time), which are always kept,
+followed by excerpts of folded turns, which are trimmed oldest first.
+"""
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("call-context")
+
+ROLE_LABELS = {"caller": "User", "agent": "Assistant"}
+
+# Separators and labels format_prompt adds around the history
+PROMPT_OVERHEAD_TOKENS = 8
+SUMMARY_PREFIX = "Earlier in this call:"
+# Longest excerpt of a single folded turn
+MAX_EXCERPT_CHARS = 160
+
+# Longest value of a single key fact
+MAX_FACT_CHARS = 80
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+_TIME = (
+    r"(?:(?:next|this)\s+)?(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday|today|tomorrow)"
+    r"(?:\s+(?:morning|afternoon|evening))?(?:\s+at\s+\d{1,2}(?::\d{2})?(?:\s*[ap]\.?m\.?)?)?"
+    r"|\d{1,2}(?::\d{2})?\s*(?:[ap]\.?m\b\.?|o'clock)"
+)
+# Caller facts worth keeping for the whole call, in summary order.
+# Each pattern's first group is the value.
+FACT_PATTERNS: List[Tuple[str, "re.Pattern[str]"]] = [
+    ("name", re.compile(
+        r"(?i:\b(?:my name is|my name's|this is|i'm|i am)\s+)([A-Z][a-z'-]+(?:\s+[A-Z][a-z'-]+)?)"
+    )),
+    ("phone", re.compile(r"(\+?\d[\d ().-]{5,}\d)")),
+    ("insurance", re.compile(
+        r"(?i:\b(?:insurance is|insured (?:with|by|through)|coverage is)\s+)([A-Z][\w&]*(?:\s+[A-Z][\w&]*)*)"
+        r"|(?!(?:My|Our|The|Your|No)\b)([A-Z][\w&]*(?:\s+[A-Z][\w&]*)*)\s+(?i:insurance|coverage)\b"
+    )),
+    ("reason", re.compile(
+        r"(?i)\b((?:i'm calling|i am calling|calling) (?:about|because|to)\b[^.!?]*"
+        r"|i (?:need|want|would like|'d like) (?:to|a|an)\b[^.!?]*"
+        r"|i have (?:a|an)\b[^.!?]*)"
+    )),
+    ("requested time", re.compile(r"(?i)\b(" + _TIME + r")")),
+]
+# Facts that identify the caller; text containing them is never shared
+PERSONAL_FACTS = ("name", "phone", "insurance")
+FACT_LABELS = {"name": "name", "phone": "phone", "insurance": "insurance",
+               "reason": "reason for calling", "requested time": "requested time"}
+
+
+def _excerpt(role: str, text: str) -> str:
+    text = " ".join(text.split())
+    if role == "agent":
+        # The agent's own wording matters less than what the caller said
+        text = _SENTENCE_END.split(text, 1)[0]
+    if len(text) > MAX_EXCERPT_CHARS:
+        text = text[:MAX_EXCERPT_CHARS].rsplit(" ", 1)[0] + "..."
+    speaker = "the caller" if role == "caller" else "you"
+    return f"{speaker} said \"{text}\"."
+
+
+def extract_facts(text: str) -> Dict[str, str]:
+    """
+    Key facts stated in one caller turn.
+
+    Args:
+        text: What the caller said
+
+    Returns:
+        Fact name -> value, for the facts found
+    """
+    facts = {}
+    for name, pattern in FACT_PATTERNS:
+        match = pattern.search(text)
+        if match is None:
+            continue
+        value = next(group for group in match.groups() if group)
+        if name == "phone" and sum(c.isdigit() for c in value) < 7:
+            continue
+        value = " ".join(value.split()).rstrip(",;")
+        if len(value) > MAX_FACT_CHARS:
+            value = value[:MAX_FACT_CHARS].rsplit(" ", 1)[0] + "..."
+        facts[name] = value
+    return facts
+
+
+def mentions_personal_facts(text: str, facts: Dict[str, str]) -> bool:
+    """
+    Whether text states who a caller is.
+
+    Args:
+        text: Text to check (e.g. an LLM reply)
+        facts: Key facts this call's caller has given (extract_facts)
+
+    Returns:
+        True if text gives a name, phone number or insurer of its own,
+        or repeats any word of the caller's
+    """
+    if any(name in PERSONAL_FACTS for name in extract_facts(text)):
+        return True
+    words = set(re.findall(r"[\w']+", text.lower()))
+    digits = "".join(c for c in text if c.isdigit())
+    for name in PERSONAL_FACTS:
+        value = facts.get(name)
+        if value is None:
+            continue
+        if name == "phone":
+            if "".join(c for c in value if c.isdigit()) in digits:
+                return True
+        elif words & set(re.findall(r"[\w']+", value.lower())):
+            return True
+    return False
+
+
+class ContextBuilder:
+    """
+    Per-call conversation memory for the LLM prompt.
+
+    The newest turns (up to recent_turns) go in verbatim while they fit
+    the token budget. Turns that fall out of that window are folded, once
+    each, into a summary bounded by summary_max_tokens: key facts from the
+    caller's turns (a later value replaces an earlier one, except the
+    reason for calling) are always kept, and excerpts of the folded turns
+    fill the rest, oldest dropped first. The summary only changes when a
+    turn is folded, so the system prompt plus summary stays a stable
+    prompt prefix between folds.
+    """
+
+    def __init__(
+        self,
+        counter: Any,
+        max_tokens: int = 1536,
+        recent_turns: int = 6,
+        summary_max_tokens: int = 160,
+        reply_tokens: int = 256,
+    ):
+        """
+        Initialize builder.
+
+        Args:
+            counter: Shared TokenCounter (count(text) -> tokens)
+            max_tokens: Prompt budget: system prompt, history and utterance
+            recent_turns: Most turns kept verbatim
+            summary_max_tokens: Budget of the summary
+            reply_tokens: Tokens reserved for the reply
+        """
+        self.counter = counter
+        self.max_tokens = max_tokens
+        self.recent_turns = recent_turns
+        self.summary_max_tokens = summary_max_tokens
+        self.reply_tokens = reply_tokens
+        self.turns: List[Tuple[str, str]] = []
+        self.summary = ""
+        self.facts: Dict[str, str] = {}
+        self._summary_items: List[str] = []
+        self._folded = 0
+        self.last_prompt_tokens = 0
+
+    def add_turn(self, role: str, text: str) -> None:
+        """
+        Record a committed turn.
+
+        Args:
+            role: "caller" or "agent"
+            text: What was said
+        """
+        text = text.strip()
+        if text:
+            self.turns.append((role, text))
+
+    def fingerprint(self, user_msg: str) -> Tuple[int, Optional[Tuple[str, str]]]:
+        """
+        Cheap identity of the history build() would send for an utterance.
+
+        Turns are append-only, so the count and last turn before the
+        utterance change whenever the context would.
+
+        Args:
+            user_msg: Caller utterance being answered
+
+        Returns:
+            (turn count, last turn) excluding the utterance itself
+        """
+        count = len(self.turns)
+        if count and self.turns[-1] == ("caller", user_msg.strip()):
+            count -= 1
+        return count, self.turns[count - 1] if count else None
+
+    def build(self, system_prompt: str, user_msg: str) -> str:
+        """
+        Conversation context for the next LLM request.
+
+        Args:
+            system_prompt: The call's system prompt
+            user_msg: Caller utterance being answered
+
+        Returns:
+            Summary and recent turns, formatted for format_prompt
+        """
+        turns = self.turns
+        if turns and turns[-1] == ("caller", user_msg.strip()):
+            # The utterance being answered was already committed to history
+            turns = turns[:-1]
+
+        count = self.counter.count
+        fixed = count(system_prompt) + count(user_msg) + PROMPT_OVERHEAD_TOKENS
+        budget = self.max_tokens - self.reply_tokens - fixed
+        start = self._window(turns, budget)
+        if start > self._folded or self.summary:
+            # Leave room for the summary
+            start = self._window(turns, budget - self.summary_max_tokens)
+
+        if start > self._folded:
+            self._fold(turns[self._folded:start])
+            self._folded = start
+
+        parts = [f"({SUMMARY_PREFIX} {self.summary})"] if self.summary else []
+        parts.extend(self._line(turn) for turn in turns[start:])
+        context = "\n\n".join(parts)
+
+        self.last_prompt_tokens = fixed + count(context)
+        get_metrics().observe("context.prompt_tokens", self.last_prompt_tokens)
+        return context
+
+    def _window(self, turns: List[Tuple[str, str]], budget: int) -> int:
+        """Index of the oldest turn kept verbatim."""
+        start = len(turns)
+        used = 0
+        while start > self._folded and len(turns) - start < self.recent_turns:
+            cost = self.counter.count(self._line(turns[start - 1])) + 1
+            if used + cost > budget:
+                break
+            used += cost
+            start -= 1
+        return start
+
+    def _fold(self, turns: List[Tuple[str, str]]) -> None:
+        for role, text in turns:
+            if role == "caller":
+                for name, value in extract_facts(text).items():
+                    if name == "reason" and name in self.facts:
+                        continue  # The first reason given is why they called
+                    self.facts[name] = value
+            self._summary_items.append(_excerpt(role, text))
+
+        facts = self._facts_line()
+        # Key facts always stay; excerpts go oldest first once over budget
+        while self._summary_items and self.counter.count(self._join(facts)) > self.summary_max_tokens:
+            self._summary_items.pop(0)
+        self.summary = self._join(facts)
+        get_metrics().inc("context.folded_turns", len(turns))
+        logger.debug(
+            f"Folded {len(turns)} turns into summary "
+            f"({len(self.facts)} facts, {len(self._summary_items)} excerpts)"
+        )
+
+    def _facts_line(self) -> Optional[str]:
+        if not self.facts:
+            return None
+        known = "; ".join(
+            f"{FACT_LABELS[name]} {self.facts[name]}" for name, _ in FACT_PATTERNS if name in self.facts
+        )
+        return f"Caller's {known}."
+
+    def _join(self, facts: Optional[str]) -> str:
+        return " ".join(([facts] if facts else []) + self._summary_items)
+
+    @staticmethod
+    def _line(turn: Tuple[str, str]) -> str:
+        role, text = turn
+        return f"{ROLE_LABELS[role]}: {text}"
@@ -0,0 +1,387 @@
+"""
+Call engine of a job process.
+Holds the process's models, clients and per-profession intent snapshots,
+and starts an isolated CallSession for its call.
+
+LiveKit's process executor runs each call in its own job process, so
+nothing held here is shared between calls: in-memory caches, connection
+pools, endpoint latency estimates and scheduler queues start with the
+call and only pay off within it. What later calls need lives outside the
+job process: phrase audio and approved answers on disk, worker load
+reports and the local fallback model in the worker's main process.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from agent.context import ContextBuilder
+from agent.router import ClientRouter
+from agent.session import CallSession
+from agent.templates import compile_templates
+from services.llm.prompt import TokenCounter
+from services.logic.keyword_matcher import KeywordMatcher
+from services.logic.response_cache import SemanticResponseCache, tenant_fingerprint
+from services.logic.scoring_service import AsyncScoringService
+
+logger = logging.getLogger("call-engine")
+
+
+def build_profession_intents(prof_config: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Collect intent phrases from a profession config.
+
+    Legacy emergency_keywords are merged into the "EMERGENCY" intent.
+
+    Args:
+        prof_config: Profession configuration
+
+    Returns:
+        Dict mapping IntentLabel -> [List of phrases]
+    """
+    intents = {
+        label: list(phrases)
+        for label, phrases in prof_config.get("intents", {}).items()
+    }
+    legacy_keywords = prof_config.get("emergency_keywords", [])
+    if legacy_keywords:
+        intents["EMERGENCY"] = intents.get("EMERGENCY", []) + list(legacy_keywords)
+    return intents
+
+
+def build_profession_keywords(prof_config: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Collect strong keywords from a profession config.
+
+    A keyword hit skips the embedding stage, so only high-precision
+    entries qualify: everything in the "keywords" section, plus the
+    multi-word phrases of emergency_keywords. Single generic words such
+    as "pain" are left to the embedding stage (see build_profession_intents).
+
+    Args:
+        prof_config: Profession configuration
+
+    Returns:
+        Dict mapping IntentLabel -> [List of keywords]
+    """
+    keywords = {
+        label: list(words)
+        for label, words in prof_config.get("keywords", {}).items()
+    }
+    phrases = [k for k in prof_config.get("emergency_keywords", []) if len(k.split()) > 1]
+    if phrases:
+        keywords["EMERGENCY"] = keywords.get("EMERGENCY", []) + phrases
+    return keywords
+
+
+class ReceptionistEngine:
+    """Engine of one job process (one call under LiveKit, see module docstring)."""
+
+    def __init__(
+        self,
+        llm_provider: Any,
+        scorer: Any,
+        clients_db_path: str,
+        scoring_batch_window_ms: float = 3.0,
+        scoring_max_batch_size: int = 32,
+        speculative_enabled: bool = False,
+        speculative_stable_ms: float = 300.0,
+        interim_intent_enabled: bool = True,
+        reply_max_sentences: int = 3,
+        segment_max_wait_ms: float = 400.0,
+        filler_enabled: bool = True,
+        filler_deadline_ms: float = 800.0,
+        context_max_tokens: int = 1536,
+        context_recent_turns: int = 6,
+        context_summary_max_tokens: int = 160,
+        tokenizer_name: str = "",
+        response_cache_enabled: bool = True,
+        response_cache_threshold: float = 0.92,
+        response_cache_ttl_seconds: float = 24 * 3600,
+        response_cache_max_entries: int = 200,
+        response_cache_dir: str = "",
+        templates_enabled: bool = True,
+    ):
+        """
+        Initialize engine.
+
+        Args:
+            llm_provider: Shared LLM provider
+            scorer: Shared SemanticIntentScorer (model only, no call state)
+            clients_db_path: Path to clients.json
+            scoring_batch_window_ms: Encode batching window
+            scoring_max_batch_size: Max utterances per batched encode
+            speculative_enabled: Default for speculative LLM generation
+            speculative_stable_ms: Default interim stability window
+            interim_intent_enabled: Fire the emergency fast path on interim transcripts
+            reply_max_sentences: Default sentence limit per reply (0 = no limit)
+            segment_max_wait_ms: Max wait before flushing reply text to TTS
+            filler_enabled: Default for filler audio on a slow first token
+            filler_deadline_ms: Default first-token deadline before filler plays
+            context_max_tokens: Prompt token budget per turn (0 = no conversation memory)
+            context_recent_turns: Turns kept verbatim before folding into the summary
+            context_summary_max_tokens: Token budget of the rolling summary
+            tokenizer_name: Hugging Face tokenizer for token counts ("" = estimate)
+            response_cache_enabled: Reuse approved answers to FAQ-style questions
+            response_cache_threshold: Question similarity needed to reuse an answer
+            response_cache_ttl_seconds: Lifetime of a cached answer
+            response_cache_max_entries: Cached answers per client
+            response_cache_dir: Where answers are kept for later calls ("" = this call only)
+            templates_enabled: Answer turns matching a client's caller_responses
+                templates without the LLM
+        """
+        self.llm_provider = llm_provider
+        self.scorer = scorer
+        self.scoring = AsyncScoringService(
+            scorer,
+            batch_window_ms=scoring_batch_window_ms,
+            max_batch_size=scoring_max_batch_size,
+        )
+        self.clients_db_path = clients_db_path
+        self.speculative_enabled = speculative_enabled
+        self.speculative_stable_ms = speculative_stable_ms
+        self.interim_intent_enabled = interim_intent_enabled
+        self.reply_max_sentences = reply_max_sentences
+        self.segment_max_wait_ms = segment_max_wait_ms
+        self.filler_enabled = filler_enabled
+        self.filler_deadline_ms = filler_deadline_ms
+        self.context_max_tokens = context_max_tokens
+        self.context_recent_turns = context_recent_turns
+        self.context_summary_max_tokens = context_summary_max_tokens
+        self.token_counter = TokenCounter(tokenizer_name)
+        self.response_cache = (
+            SemanticResponseCache(
+                threshold=response_cache_threshold,
+                ttl_seconds=response_cache_ttl_seconds,
+                max_entries=response_cache_max_entries,
+                cache_dir=response_cache_dir or None,
+            )
+            if response_cache_enabled
+            else None
+        )
+        self._snapshots: Dict[str, Any] = {}
+        self._keyword_matchers: Dict[str, KeywordMatcher] = {}
+        self.templates_enabled = templates_enabled
+        # Client name -> (templates fingerprint, snapshot with template intents)
+        self._tenant_snapshots: Dict[str, Tuple[str, Any]] = {}
+        # Snapshot builds in progress, so concurrent session starts share one encode
+        self._building: Dict[Hashable, asyncio.Future] = {}
+
+    async def _build_snapshot(self, key: Hashable, intents: Dict[str, List[str]]) -> Any:
+        """Build a snapshot off the event loop, joining a build already running for key."""
+        building = self._building.get(key)
+        if building is None:
+            building = asyncio.ensure_future(self.scoring.build_snapshot(intents))
+            self._building[key] = building
+            building.add_done_callback(lambda _: self._building.pop(key, None))
+        # One caller hanging up must not cancel the build for the others
+        return await asyncio.shield(building)
+
+    async def intent_snapshot(self, profession: str, prof_config: Dict[str, Any]) -> Any:
+        """
+        Get the immutable intent snapshot for a profession, building it once.
+
+        Args:
+            profession: Profession name
+            prof_config: Profession configuration
+
+        Returns:
+            IntentSnapshot shared by this engine's sessions of the profession
+        """
+        snapshot = self._snapshots.get(profession)
+        if snapshot is None:
+            snapshot = await self._build_snapshot(
+                ("profession", profession), build_profession_intents(prof_config)
+            )
+            self._snapshots[profession] = snapshot
+        return snapshot
+
+    async def tenant_intents(
+        self, client_config: Dict[str, Any], prof_config: Dict[str, Any]
+    ) -> Tuple[Any, Dict[str, str], Optional[str]]:
+        """
+        Intent snapshot for a client, with its caller_responses templates
+        compiled in.
+
+        Clients without templates share their profession's snapshot. A
+        client's snapshot is rebuilt when its templates change.
+
+        Returns:
+            (IntentSnapshot, template label -> response, emergency line or None)
+        """
+        profession = client_config.get("profession", "dentist")
+        caller_responses = client_config.get("caller_responses") if self.templates_enabled else None
+        intents, responses, emergency = compile_templates(caller_responses)
+        if not intents:
+            return await self.intent_snapshot(profession, prof_config), responses, emergency
+
+        tenant = client_config.get("name", "unknown")
+        fingerprint = tenant_fingerprint(profession, intents)
+        cached = self._tenant_snapshots.get(tenant)
+        if cached is None or cached[0] != fingerprint:
+            merged = build_profession_intents(prof_config)
+            merged.update(intents)
+            snapshot = await self._build_snapshot(("tenant", tenant, fingerprint), merged)
+            cached = (fingerprint, snapshot)
+            self._tenant_snapshots[tenant] = cached
+            logger.info(f"Compiled {len(intents)} caller_responses templates for {tenant}")
+        return cached[1], responses, emergency
+
+    def keyword_matcher(self, profession: str, prof_config: Dict[str, Any]) -> KeywordMatcher:
+        """
+        Get the keyword matcher for a profession, building it once.
+
+        Args:
+            profession: Profession name
+            prof_config: Profession configuration
+
+        Returns:
+            KeywordMatcher shared by this engine's sessions of the profession
+        """
+        matcher = self._keyword_matchers.get(profession)
+        if matcher is None:
+            matcher = KeywordMatcher(build_profession_keywords(prof_config))
+            self._keyword_matchers[profession] = matcher
+        return matcher
+
+    def speculative_window(self, prof_config: Dict[str, Any]) -> Optional[float]:
+        """
+        Speculation stability window for a profession.
+
+        A profession config may override the worker defaults with
+        {"speculative": {"enabled": true, "stable_ms": 250}}.
+
+        Returns:
+            Window in ms, or None if speculation is disabled
+        """
+        overrides = prof_config.get("speculative", {})
+        if not overrides.get("enabled", self.speculative_enabled):
+            return None
+        return float(overrides.get("stable_ms", self.speculative_stable_ms))
+
+    def filler_deadline(self, prof_config: Dict[str, Any]) -> Optional[float]:
+        """
+        First-token deadline before filler audio plays, for a profession.
+
+        A profession config may override the worker defaults with
+        {"filler": {"enabled": true, "deadline_ms": 700, "phrases": [...]}}.
+
+        Returns:
+            Deadline in ms, or None if filler is disabled
+        """
+        overrides = prof_config.get("filler", {})
+        if not overrides.get("enabled", self.filler_enabled):
+            return None
+        return float(overrides.get("deadline_ms", self.filler_deadline_ms))
+
+    def cache_intents(self, prof_config: Dict[str, Any]) -> List[str]:
+        """
+        Intents whose questions may be answered from the response cache.
+
+        Set per profession with {"response_cache": {"intents": ["HOURS", ...]}};
+        only questions whose answers don't depend on the caller belong here.
+        """
+        if self.response_cache is None:
+            return []
+        return list(prof_config.get("response_cache", {}).get("intents", []))
+
+    def context_builder(self) -> Optional[ContextBuilder]:
+        """Fresh conversation memory for a call, or None if disabled."""
+        if self.context_max_tokens <= 0:
+            return None
+        return ContextBuilder(
+            self.token_counter,
+            max_tokens=self.context_max_tokens,
+            recent_turns=self.context_recent_turns,
+            summary_max_tokens=self.context_summary_max_tokens,
+        )
+
+    async def start_session(self, incoming_number: str) -> Optional[CallSession]:
+        """
+        Route an incoming call and create its session.
+
+        Args:
+            incoming_number: Caller's phone number (E.164)
+
+        Returns:
+            New CallSession, or None if no client owns the number
+        """
+        # Re-read clients per call so newly onboarded numbers route immediately
+        router = ClientRouter(self.clients_db_path)
+        client_config = router.get_client_by_phone(incoming_number)
+        if not client_config:
+            logger.warning(f"No client found for {incoming_number}")
+            return None
+
+        profession = client_config.get("profession", "dentist")
+        prof_config = router.get_profession_config(profession)
+
+        intents, templates, emergency_response = await self.tenant_intents(client_config, prof_config)
+        if self.response_cache is not None:
+            await self.response_cache.load(client_config.get("name", "unknown"))
+
+        return CallSession(
+            incoming_number=incoming_number,
+            client_config=client_config,
+            prof_config=prof_config,
+            llm_provider=self.llm_provider,
+            scoring=self.scoring,
+            intents=intents,
+            keywords=self.keyword_matcher(profession, prof_config),
+            speculative_stable_ms=self.speculative_window(prof_config),
+            interim_intents=self.interim_intent_enabled,
+            max_sentences=int(prof_config.get("max_sentences", self.reply_max_sentences)),
+            segment_max_wait_ms=self.segment_max_wait_ms,
+            filler_deadline_ms=self.filler_deadline(prof_config),
+            context=self.context_builder(),
+            response_cache=self.response_cache,
+            cache_intents=self.cache_intents(prof_config),
+            # Cached answers go stale when any prompt or template they came from changes
+            cache_fingerprint=tenant_fingerprint(
+                prof_config.get("system_prompt"),
+                client_config.get("system_prompt"),
+                client_config.get("caller_responses"),
+            ),
+            templates=templates,
+            emergency_response=emergency_response,
+        )
+
+
+def engine_from_settings(
+    settings: Any, llm_provider: Any, scorer: Any, clients_db_path: Optional[str] = None
+) -> ReceptionistEngine:
+    """
+    Build the engine with its defaults taken from application settings.
+
+    Args:
+        settings: config.settings.Settings
+        llm_provider: Shared LLM provider
+        scorer: Shared SemanticIntentScorer
+        clients_db_path: Path to clients.json (default settings.clients_db_path)
+
+    Returns:
+        Configured ReceptionistEngine
+    """
+    return ReceptionistEngine(
+        llm_provider=llm_provider,
+        scorer=scorer,
+        clients_db_path=clients_db_path or settings.clients_db_path,
+        scoring_batch_window_ms=settings.scoring_batch_window_ms,
+        scoring_max_batch_size=settings.scoring_max_batch_size,
+        speculative_enabled=settings.speculative_enabled,
+        speculative_stable_ms=settings.speculative_stable_ms,
+        interim_intent_enabled=settings.interim_intent_enabled,
+        reply_max_sentences=settings.reply_max_sentences,
+        segment_max_wait_ms=settings.segment_max_wait_ms,
+        filler_enabled=settings.filler_enabled,
+        filler_deadline_ms=settings.filler_deadline_ms,
+        context_max_tokens=settings.context_max_tokens,
+        context_recent_turns=settings.context_recent_turns,
+        context_summary_max_tokens=settings.context_summary_max_tokens,
+        tokenizer_name=settings.context_tokenizer,
+        response_cache_enabled=settings.response_cache_enabled,
+        response_cache_threshold=settings.response_cache_threshold,
+        response_cache_ttl_seconds=settings.response_cache_ttl_seconds,
+        response_cache_max_entries=settings.response_cache_max_entries,
+        response_cache_dir=settings.response_cache_dir,
+        templates_enabled=settings.templates_enabled,
+    )
@@ -0,0 +1,70 @@
+"""
+Filler-audio masking for a slow first LLM token.
+If the reply has not started by the deadline, a short cached
+acknowledgement plays first and the real reply follows it.
+"""
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("filler")
+
+DEFAULT_FILLER_PHRASES = ("Let me check that for you.",)
+
+
+async def mask_first_token(
+    stream: AsyncIterator[str],
+    deadline_ms: float,
+    play_filler: Callable[[], Awaitable[None]],
+    metric_prefix: str = "filler",
+) -> AsyncIterator[str]:
+    """
+    Pass an LLM stream through, playing filler if its first token is late.
+
+    The LLM keeps generating while the filler plays; buffered tokens are
+    released only once play_filler returns, so the two never overlap.
+
+    Args:
+        stream: Raw LLM token stream
+        deadline_ms: How long the first token may take before filler plays
+        play_filler: Plays the filler, returning when it has finished
+        metric_prefix: Prefix for turn, fire and first-token metrics
+
+    Yields:
+        The stream's chunks, unchanged
+    """
+    metrics = get_metrics()
+    metrics.inc(f"{metric_prefix}.turns")
+    started = time.monotonic()
+
+    iterator = stream.__aiter__()
+    first = asyncio.ensure_future(iterator.__anext__())
+    try:
+        done, _ = await asyncio.wait({first}, timeout=deadline_ms / 1000.0)
+        if not done:
+            metrics.inc(f"{metric_prefix}.fired")
+            logger.info(f"⏳ No LLM token after {deadline_ms:.0f}ms, playing filler")
+            await play_filler()
+
+        try:
+            chunk = await first
+        except StopAsyncIteration:
+            return
+        metrics.observe(f"{metric_prefix}.first_token_ms", (time.monotonic() - started) * 1000)
+        yield chunk
+
+        async for chunk in iterator:
+            yield chunk
+    finally:
+        if not first.done():
+            first.cancel()
+            try:
+                await first
+            except (asyncio.CancelledError, StopAsyncIteration):
+                pass
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
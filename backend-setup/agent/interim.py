@@ -0,0 +1,124 @@
+"""
+Early intent detection on interim STT transcripts.
+Scores the caller's words while they are still speaking so the emergency
+fast path can fire before end-of-utterance.
+"""
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("interim-intent")
+
+Detector = Callable[[str], Awaitable[Tuple[str, float]]]
+TriggerCallback = Callable[[str, float], Any]
+
+
+class InterimIntentMonitor:
+    """
+    Per-call monitor fed with interim transcripts.
+
+    Fires on_trigger at most once per turn, the first time an interim
+    transcript crosses the threshold for one of the trigger labels.
+    """
+
+    def __init__(
+        self,
+        detect: Detector,
+        trigger_labels: Iterable[str] = ("EMERGENCY",),
+        threshold: float = 0.75,
+        on_trigger: Optional[TriggerCallback] = None,
+    ):
+        """
+        Initialize monitor.
+
+        Args:
+            detect: Async intent detector, text -> (label, score)
+            trigger_labels: Intents that fire early
+            threshold: Confidence needed to fire
+            on_trigger: Called with (label, score) when the monitor fires
+        """
+        self.detect = detect
+        self.trigger_labels = frozenset(trigger_labels)
+        self.threshold = threshold
+        self.on_trigger = on_trigger
+        self._latest_text = ""
+        self._scored_text = ""
+        self._scoring = False
+        self._turn = 0
+        self._triggered: Optional[Tuple[str, float]] = None
+        self._triggered_at = 0.0
+
+    @property
+    def triggered(self) -> Optional[Tuple[str, float]]:
+        """Intent fired during the current turn, if any."""
+        return self._triggered
+
+    async def on_interim(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Score an interim transcript.
+
+        Only one detection runs at a time; interims arriving meanwhile
+        are coalesced and the newest one is scored next, so chatty STT
+        streams cost at most one encode in flight per call.
+
+        Args:
+            text: Interim transcript of the current utterance so far
+
+        Returns:
+            (label, score) if this call fired the trigger, else None
+        """
+        text = text.strip()
+        if self._triggered is not None or not text or text == self._latest_text:
+            return None
+
+        self._latest_text = text
+        if self._scoring:
+            return None
+
+        metrics = get_metrics()
+        turn = self._turn
+        self._scoring = True
+        try:
+            while self._triggered is None and self._latest_text != self._scored_text:
+                current = self._scored_text = self._latest_text
+                metrics.inc("intent.interim.scored")
+                label, score = await self.detect(current)
+
+                if turn != self._turn:
+                    # The utterance was committed while we were scoring
+                    return None
+                if label in self.trigger_labels and score >= self.threshold:
+                    return self._fire(label, score)
+        finally:
+            self._scoring = False
+        return None
+
+    def _fire(self, label: str, score: float) -> Tuple[str, float]:
+        self._triggered = (label, score)
+        self._triggered_at = time.monotonic()
+        get_metrics().inc("intent.interim.triggered")
+        logger.info(f"⚡ EARLY TRIGGER on interim: {label} ({score:.2f})")
+
+        if self.on_trigger is not None:
+            self.on_trigger(label, score)
+        return self._triggered
+
+    def end_turn(self) -> Optional[Tuple[str, float]]:
+        """
+        Close the current turn and re-arm the monitor.
+
+        Returns:
+            Intent fired during the turn, if any
+        """
+        triggered = self._triggered
+        if triggered is not None:
+            get_metrics().observe(
+                "intent.interim.lead_ms", (time.monotonic() - self._triggered_at) * 1000
+            )
+        self._turn += 1
+        self._triggered = None
+        self._latest_text = ""
+        self._scored_text = ""
+        return triggered
@@ -0,0 +1,156 @@
+"""
+Per-turn latency spans for a call.
+Timestamps each caller turn from end of speech to the last agent audio,
+and rolls the turns up into the call's STT/LLM/TTS latency figures.
+"""
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("turn-latency")
+
+# Turn events, in the order they normally happen
+END_OF_SPEECH = "end_of_speech"  # VAD: caller stopped talking
+FINAL_TRANSCRIPT = "final_transcript"  # STT: final transcript of the utterance
+FIRST_TOKEN = "first_token"  # First LLM token (or fixed reply text ready)
+FIRST_AUDIO = "first_audio"  # Agent audio started playing
+LAST_AUDIO = "last_audio"  # Agent audio finished
+
+# Caller-side events: the latest one before the reply starts counts
+INPUT_EVENTS = (END_OF_SPEECH, FINAL_TRANSCRIPT)
+
+# Span -> (start event, end event)
+SPANS = {
+    "stt_ms": (END_OF_SPEECH, FINAL_TRANSCRIPT),
+    "llm_ms": (FINAL_TRANSCRIPT, FIRST_TOKEN),
+    "tts_ms": (FIRST_TOKEN, FIRST_AUDIO),
+    "response_ms": (END_OF_SPEECH, FIRST_AUDIO),
+    "playout_ms": (FIRST_AUDIO, LAST_AUDIO),
+}
+
+# Call-level column -> span averaged over the call's turns
+CALL_COLUMNS = {
+    "stt_latency_ms": "stt_ms",
+    "llm_latency_ms": "llm_ms",
+    "tts_latency_ms": "tts_ms",
+}
+
+
+class TurnSpans:
+    """Event timestamps of one caller turn and the agent's reply."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.marks: Dict[str, float] = {}
+
+    @property
+    def replied(self) -> bool:
+        """True once any part of the agent's reply has happened."""
+        return FIRST_TOKEN in self.marks or FIRST_AUDIO in self.marks
+
+    def spans(self) -> Dict[str, Optional[float]]:
+        """
+        Span durations in milliseconds.
+
+        A span is None when either event is missing (e.g. no LLM call on
+        a cached answer). Negative spans, such as a final transcript that
+        arrived before the VAD endpoint, count as zero wait.
+        """
+        spans: Dict[str, Optional[float]] = {}
+        for name, (start, end) in SPANS.items():
+            if start in self.marks and end in self.marks:
+                spans[name] = max(0.0, (self.marks[end] - self.marks[start]) * 1000)
+            else:
+                spans[name] = None
+        return spans
+
+
+class CallLatency:
+    """
+    Turn-by-turn latency of one call.
+
+    Events are fed as they happen. A turn opens with the caller's end of
+    speech or final transcript and closes at the agent's last audio, or
+    when the caller's next turn starts. Until the reply starts, later
+    caller events replace earlier ones (the caller paused and went on);
+    reply events keep their first timestamp.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize call latency.
+
+        Args:
+            clock: Time source (injectable for tests)
+        """
+        self.clock = clock
+        self.turns: List[TurnSpans] = []
+        self._current: Optional[TurnSpans] = None
+
+    def mark(self, event: str, at: Optional[float] = None) -> None:
+        """
+        Record a turn event.
+
+        Args:
+            event: One of END_OF_SPEECH ... LAST_AUDIO
+            at: Event time on the clock (default now)
+        """
+        at = self.clock() if at is None else at
+        turn = self._current
+        if event in INPUT_EVENTS:
+            if turn is not None and turn.replied:
+                self._finish()
+                turn = None
+            if turn is None:
+                turn = self._current = TurnSpans(len(self.turns))
+            turn.marks[event] = at
+            return
+
+        if turn is None:
+            # Agent audio outside a caller turn (greeting)
+            return
+        turn.marks.setdefault(event, at)
+        if event == LAST_AUDIO:
+            self._finish()
+
+    def close(self) -> None:
+        """Close the open turn at the end of the call."""
+        if self._current is not None:
+            self._finish()
+
+    def turn_records(self) -> List[Dict[str, Optional[float]]]:
+        """
+        Per-turn spans, for percentile analysis.
+
+        Returns:
+            One dictionary of span -> milliseconds (or None) per turn
+        """
+        return [{"turn": turn.index, **turn.spans()} for turn in self.turns]
+
+    def call_summary(self) -> Dict[str, Optional[float]]:
+        """
+        Mean STT/LLM/TTS latency over the call's turns.
+
+        Returns:
+            Dictionary of Call column (stt_latency_ms, ...) -> mean milliseconds,
+            or None when no turn had that span
+        """
+        records = self.turn_records()
+        summary: Dict[str, Optional[float]] = {}
+        for column, span in CALL_COLUMNS.items():
+            values = [r[span] for r in records if r[span] is not None]
+            summary[column] = sum(values) / len(values) if values else None
+        return summary
+
+    def _finish(self) -> None:
+        turn, self._current = self._current, None
+        if not turn.replied:
+            # Noise or an utterance the agent never answered
+            return
+        self.turns.append(turn)
+        metrics = get_metrics()
+        for name, value in turn.spans().items():
+            if value is not None:
+                metrics.observe(f"turn.{name}", value)
@@ -0,0 +1,145 @@
+"""
+Direct playback of cached phrase audio into the LiveKit room.
+Bypasses live TTS for fixed phrases so they start speaking immediately.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+from livekit import rtc
+
+from services.tts.phrase_cache import SAMPLE_WIDTH, PhraseAudio
+
+logger = logging.getLogger("phrase-player")
+
+FRAME_MS = 20
+
+
+class LiveKitSynthesizer:
+    """Adapts a LiveKit TTS plugin to the phrase cache's synthesize() interface."""
+
+    def __init__(self, tts: Any, voice_id: str):
+        """
+        Initialize synthesizer.
+
+        Args:
+            tts: LiveKit TTS (e.g. cartesia.TTS)
+            voice_id: Voice the TTS is configured with (part of the cache key)
+        """
+        self.tts = tts
+        self.voice_id = voice_id
+
+    async def synthesize(self, text: str) -> PhraseAudio:
+        """Synthesize a whole phrase into 16-bit PCM."""
+        pcm = bytearray()
+        sample_rate, num_channels = self.tts.sample_rate, self.tts.num_channels
+        async for audio in self.tts.synthesize(text):
+            frame = audio.frame
+            sample_rate, num_channels = frame.sample_rate, frame.num_channels
+            pcm.extend(bytes(frame.data))
+        return PhraseAudio(pcm=bytes(pcm), sample_rate=sample_rate, num_channels=num_channels)
+
+
+class PhrasePlayer:
+    """Publishes an audio track for one call and plays cached phrases on it."""
+
+    def __init__(self, room: rtc.Room):
+        """
+        Initialize player.
+
+        Args:
+            room: Connected LiveKit room of the call
+        """
+        self.room = room
+        self._source: Optional[rtc.AudioSource] = None
+        # Concurrent plays (greeting + early emergency line) publish one track
+        self._publish_lock = asyncio.Lock()
+        # Set to stop the phrase playing now, if it may be interrupted
+        self._interrupt: Optional[asyncio.Event] = None
+
+    async def _ensure_track(self, audio: PhraseAudio) -> rtc.AudioSource:
+        async with self._publish_lock:
+            source = self._source
+            if (
+                source is None
+                or source.sample_rate != audio.sample_rate
+                or source.num_channels != audio.num_channels
+            ):
+                source = rtc.AudioSource(audio.sample_rate, audio.num_channels)
+                track = rtc.LocalAudioTrack.create_audio_track("agent-phrases", source)
+                options = rtc.TrackPublishOptions(source=rtc.TrackSource.SOURCE_MICROPHONE)
+                await self.room.local_participant.publish_track(track, options)
+                self._source = source
+            return source
+
+    def interrupt(self) -> bool:
+        """
+        Stop an interruptible phrase (caller started speaking).
+
+        Returns:
+            True if a phrase was cut off
+        """
+        if self._interrupt is None or self._interrupt.is_set():
+            return False
+        self._interrupt.set()
+        if self._source is not None:
+            # Drop audio already queued for the caller
+            self._source.clear_queue()
+        return True
+
+    async def play(
+        self, audio: PhraseAudio, wait_for_playout: bool = False, interruptible: bool = False
+    ) -> bool:
+        """
+        Play a phrase to the caller.
+
+        Args:
+            audio: Cached phrase audio
+            wait_for_playout: Return only once the caller has heard all of it,
+                rather than once it has been queued
+            interruptible: Let interrupt() cut the phrase off
+
+        Returns:
+            False if the phrase was interrupted
+        """
+        source = await self._ensure_track(audio)
+        interrupted = asyncio.Event()
+        if interruptible:
+            self._interrupt = interrupted
+        try:
+            return await self._play(source, audio, wait_for_playout, interrupted)
+        finally:
+            if self._interrupt is interrupted:
+                self._interrupt = None
+
+    async def _play(
+        self, source: rtc.AudioSource, audio: PhraseAudio, wait_for_playout: bool, interrupted: asyncio.Event
+    ) -> bool:
+        started = time.monotonic()
+        samples_per_frame = audio.sample_rate * FRAME_MS // 1000
+        frame_bytes = samples_per_frame * audio.num_channels * SAMPLE_WIDTH
+
+        for offset in range(0, len(audio.pcm), frame_bytes):
+            if interrupted.is_set():
+                return False
+            chunk = audio.pcm[offset:offset + frame_bytes]
+            if len(chunk) < frame_bytes:
+                chunk = chunk + b"\0" * (frame_bytes - len(chunk))
+            await source.capture_frame(
+                rtc.AudioFrame(
+                    data=chunk,
+                    sample_rate=audio.sample_rate,
+                    num_channels=audio.num_channels,
+                    samples_per_channel=samples_per_frame,
+                )
+            )
+
+        if wait_for_playout:
+            remaining = started + audio.duration - time.monotonic()
+            if remaining > 0:
+                try:
+                    await asyncio.wait_for(interrupted.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        return not interrupted.is_set()
@@ -0,0 +1,102 @@
+"""
+Job process prewarm stage.
+LiveKit starts job processes ahead of demand and runs prewarm in each
+before a call is assigned, so the call does not wait for model loading.
+Every call gets its own process, so these resources serve one call.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from livekit.agents import JobProcess
+from livekit.plugins import silero
+
+from services.llm.huggingface_provider import HuggingFaceLLMProvider
+from services.llm.fallback_server import RemoteFallbackModel, fallback_url
+from services.logic.semantic_scorer import load_embedding_model
+from services.metrics import get_metrics
+from config.settings import settings
+
+logger = logging.getLogger("prewarm")
+
+RESOURCES_KEY = "resources"
+
+
+@dataclass
+class WorkerResources:
+    """Resources loaded by a job process before its call arrives."""
+
+    vad: Any
+    embedding_model: Optional[Any]
+    llm_provider: HuggingFaceLLMProvider
+    prewarm_seconds: float = 0.0
+
+
+def load_worker_resources() -> WorkerResources:
+    """
+    Load VAD, embedding model and LLM client, timing each stage.
+
+    Returns:
+        Loaded worker resources
+    """
+    metrics = get_metrics()
+    start = time.perf_counter()
+
+    stage = time.perf_counter()
+    vad = silero.VAD.load()
+    metrics.set_gauge("worker.prewarm.vad_seconds", time.perf_counter() - stage)
+
+    stage = time.perf_counter()
+    embedding_model = load_embedding_model(
+        settings.semantic_model_name,
+        backend=settings.semantic_backend,
+        max_seq_length=settings.semantic_max_seq_length,
+        onnx_file=settings.semantic_onnx_file,
+    )
+    metrics.set_gauge("worker.prewarm.embedding_seconds", time.perf_counter() - stage)
+
+    stage = time.perf_counter()
+    # The model is loaded once per host (see entrypoint.main); this process only connects
+    url = fallback_url()
+    fallback = RemoteFallbackModel(url) if url else None
+    llm_provider = HuggingFaceLLMProvider(fallback=fallback)
+    metrics.set_gauge("worker.prewarm.llm_client_seconds", time.perf_counter() - stage)
+
+    elapsed = time.perf_counter() - start
+    metrics.set_gauge("worker.prewarm_seconds", elapsed)
+    logger.info(f"🔥 Worker prewarm complete in {elapsed:.2f}s")
+
+    return WorkerResources(
+        vad=vad,
+        embedding_model=embedding_model,
+        llm_provider=llm_provider,
+        prewarm_seconds=elapsed,
+    )
+
+
+def prewarm(proc: JobProcess) -> None:
+    """
+    LiveKit prewarm hook, run in each job process before its call is assigned.
+
+    Args:
+        proc: LiveKit job process
+    """
+    proc.userdata[RESOURCES_KEY] = load_worker_resources()
+
+
+def get_worker_resources(proc: JobProcess) -> WorkerResources:
+    """
+    Get the resources loaded by prewarm, loading them now if prewarm was skipped.
+
+    Args:
+        proc: LiveKit job process
+
+    Returns:
+        Worker resources for this process
+    """
+    resources = proc.userdata.get(RESOURCES_KEY)
+    if resources is None:
+        logger.warning("Prewarm did not run; loading worker resources on first call")
+        resources = proc.userdata[RESOURCES_KEY] = load_worker_resources()
+    return resources
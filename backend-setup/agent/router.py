@@ -5,7 +5,7 @@ Routes incoming calls to the correct client's agent + profession.
 import json
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 logger = logging.getLogger("router")
 
@@ -133,6 +133,38 @@ class ClientRouter:
             logger.error(f"Error adding client: {e}")
             return False
 
+    def set_caller_responses(
+        self, phone_numbers: List[str], caller_responses: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Store onboarding caller_responses on the client owning a number.
+
+        Args:
+            phone_numbers: Numbers the business gave during onboarding (E.164)
+            caller_responses: Template key -> template
+
+        Returns:
+            Name of the updated client, or None if no client owns the numbers
+        """
+        for client_name, config in self.clients.items():
+            if any(number in config.get("phone_numbers", []) for number in phone_numbers if number):
+                break
+        else:
+            logger.warning(f"No client found for onboarding numbers: {phone_numbers}")
+            return None
+
+        try:
+            config["caller_responses"] = caller_responses
+            with open(self.db_path, "w") as f:
+                json.dump(self.clients, f, indent=2)
+
+            logger.info(f"Updated caller responses for client: {client_name}")
+            return client_name
+
+        except Exception as e:
+            logger.error(f"Error updating caller responses: {e}")
+            return None
+
     def get_all_clients(self) -> Dict[str, Any]:
         """Get all clients."""
         return self.clients
@@ -0,0 +1,244 @@
+"""
+Sentence-boundary segmentation between the LLM stream and TTS.
+Re-chunks raw LLM tokens into whole clauses and sentences so TTS gets
+speakable text as soon as each one closes, and stops generation once a
+reply reaches the profession's sentence limit.
+"""
+import asyncio
+import logging
+import re
+import time
+from typing import AsyncIterator, List, Optional, Tuple
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("segmenter")
+
+# Terminal punctuation (plus closing quotes/brackets) followed by whitespace
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'”’)\]]*(?=\s)")
+# Clause punctuation followed by whitespace
+_CLAUSE_END = re.compile(r"[,;:—–](?=\s)")
+# Words whose trailing period does not end a sentence
+_ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "st", "vs", "etc", "e.g", "i.e", "jr", "sr",
+})
+# Abbreviations only before a number ("No. 5"); otherwise a sentence ("No. We don't.")
+_NUMBER_ABBREVIATIONS = frozenset({"no"})
+
+_END_OF_STREAM = object()
+
+
+class SentenceSegmenter:
+    """
+    Incremental splitter over streamed text.
+
+    feed() returns complete segments as they close: every sentence, plus
+    clauses once the pending text is long enough to be worth speaking
+    on its own. Nothing after the max_sentences-th sentence is emitted.
+    """
+
+    def __init__(self, max_sentences: int = 0, min_clause_chars: int = 40):
+        """
+        Initialize segmenter.
+
+        Args:
+            max_sentences: Sentences per reply before cutting off (0 = no limit)
+            min_clause_chars: Shortest clause emitted before its sentence ends
+        """
+        self.max_sentences = max_sentences
+        self.min_clause_chars = min_clause_chars
+        self.sentences = 0
+        self._buffer = ""
+
+    @property
+    def pending(self) -> str:
+        """Text received but not yet emitted."""
+        return self._buffer
+
+    @property
+    def done(self) -> bool:
+        """True once the sentence limit has been reached."""
+        return bool(self.max_sentences) and self.sentences >= self.max_sentences
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add streamed text.
+
+        Args:
+            text: Next chunk from the LLM
+
+        Returns:
+            Segments completed by this chunk, in order
+        """
+        if self.done:
+            return []
+        self._buffer += text
+
+        segments = []
+        while not self.done:
+            boundary = self._next_boundary()
+            if boundary is None:
+                break
+            end, is_sentence = boundary
+            segments.append(self._take(end))
+            if is_sentence:
+                self.sentences += 1
+        return segments
+
+    def flush_partial(self) -> Optional[str]:
+        """
+        Emit pending text up to its last complete word (max-wait flush).
+
+        Returns:
+            Flushed segment, or None if no complete word is pending
+        """
+        end = max(self._buffer.rfind(" "), self._buffer.rfind("\n"))
+        if self.done or end <= 0 or not self._buffer[:end].strip():
+            return None
+        return self._take(end)
+
+    def flush(self) -> Optional[str]:
+        """
+        Emit whatever is pending (end of stream).
+
+        Returns:
+            Final segment, or None if nothing is pending
+        """
+        if self.done or not self._buffer.strip():
+            self._buffer = ""
+            return None
+        segment = self._take(len(self._buffer))
+        self.sentences += 1
+        return segment
+
+    def _next_boundary(self) -> Optional[Tuple[int, bool]]:
+        for match in _SENTENCE_END.finditer(self._buffer):
+            if not _is_abbreviation(self._buffer, match.start()):
+                return match.end(), True
+
+        if len(self._buffer) >= self.min_clause_chars:
+            clause = None
+            for match in _CLAUSE_END.finditer(self._buffer):
+                if match.end() >= self.min_clause_chars:
+                    clause = match
+                    break
+            if clause is not None:
+                return clause.end(), False
+        return None
+
+    def _take(self, end: int) -> str:
+        segment, self._buffer = self._buffer[:end], self._buffer[end:].lstrip()
+        return segment.strip()
+
+
+def _is_abbreviation(text: str, dot_index: int) -> bool:
+    if text[dot_index] != ".":
+        return False
+    start = dot_index
+    while start > 0 and (text[start - 1].isalpha() or text[start - 1] == "."):
+        start -= 1
+    word = text[start:dot_index].lower()
+    if word in _NUMBER_ABBREVIATIONS:
+        following = text[dot_index + 1:].lstrip()
+        # Wait for the next word when it has not streamed in yet
+        return not following or following[0].isdigit()
+    # Single letters ("J. Smith") are initials
+    return word in _ABBREVIATIONS or len(word) == 1
+
+
+async def segment_stream(
+    stream: AsyncIterator[str],
+    max_sentences: int = 0,
+    max_wait_ms: float = 400.0,
+    min_clause_chars: int = 40,
+    metric_prefix: str = "segmenter",
+) -> AsyncIterator[str]:
+    """
+    Re-chunk an LLM token stream into speakable segments.
+
+    Pending text that has not closed within max_wait_ms is flushed up to
+    its last complete word, so a slow or run-on reply still starts
+    speaking. Reaching max_sentences closes the source stream, which
+    stops generation instead of paying for tokens nobody will hear.
+
+    Args:
+        stream: Raw LLM token stream
+        max_sentences: Sentences per reply before cutting off (0 = no limit)
+        max_wait_ms: Longest time text may wait for a boundary
+        min_clause_chars: Shortest clause emitted before its sentence ends
+        metric_prefix: Prefix for segment timing and cut-off metrics
+
+    Yields:
+        Whole clauses and sentences
+
+    Raises:
+        Whatever the source stream raised, once its complete sentences are out
+    """
+    segmenter = SentenceSegmenter(max_sentences, min_clause_chars)
+    queue: asyncio.Queue = asyncio.Queue()
+    max_wait = max_wait_ms / 1000.0
+    metrics = get_metrics()
+    started = time.monotonic()
+    first_segment = True
+
+    async def pump():
+        try:
+            async for chunk in stream:
+                queue.put_nowait(chunk)
+        finally:
+            queue.put_nowait(_END_OF_STREAM)
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def emitted(segment: str) -> str:
+        nonlocal first_segment
+        if first_segment:
+            first_segment = False
+            metrics.observe(f"{metric_prefix}.first_segment_ms", (time.monotonic() - started) * 1000)
+        return segment
+
+    pump_task = asyncio.ensure_future(pump())
+    pending_since: Optional[float] = None
+    try:
+        while not segmenter.done:
+            timeout = None
+            if pending_since is not None:
+                timeout = max(0.0, pending_since + max_wait - time.monotonic())
+            try:
+                chunk = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                segment = segmenter.flush_partial()
+                pending_since = time.monotonic() if segmenter.pending else None
+                if segment:
+                    metrics.inc(f"{metric_prefix}.max_wait_flushes")
+                    yield emitted(segment)
+                continue
+
+            if chunk is _END_OF_STREAM:
+                try:
+                    await pump_task
+                except Exception:
+                    # The LLM stream failed: the unfinished sentence is dropped
+                    metrics.inc(f"{metric_prefix}.stream_errors")
+                    raise
+                segment = segmenter.flush()
+                if segment:
+                    yield emitted(segment)
+                return
+
+            for segment in segmenter.feed(chunk):
+                pending_since = None
+                yield emitted(segment)
+            if segmenter.pending and pending_since is None:
+                pending_since = time.monotonic()
+
+        metrics.inc(f"{metric_prefix}.cutoffs")
+        logger.debug(f"Reply cut off after {segmenter.sentences} sentences")
+    finally:
+        if not pump_task.done():
+            pump_task.cancel()
+            try:
+                await pump_task
+            except asyncio.CancelledError:
+                pass
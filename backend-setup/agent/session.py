@@ -0,0 +1,521 @@
+"""
+Per-call session state.
+Owns the conversation history, timers and intent snapshot of one call,
+so a single worker process can serve overlapping calls without cross-talk.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from agent.barge_in import ReplyTracker
+from agent.context import ContextBuilder, extract_facts, mentions_personal_facts
+from agent.filler import DEFAULT_FILLER_PHRASES, mask_first_token
+from agent.interim import InterimIntentMonitor
+from agent.latency import FIRST_TOKEN, CallLatency
+from agent.segmenter import SentenceSegmenter, segment_stream
+from agent.speculative import SpeculativeGenerator
+from agent.templates import template_phrases
+from agent.trace import NULL_TRACE
+from services.metrics import get_metrics
+
+logger = logging.getLogger("call-session")
+
+DEFAULT_SYSTEM_PROMPT = "You are a helpful AI assistant."
+DEFAULT_GREETING = "Hello! Thank you for calling. How can I help you today?"
+EMERGENCY_RESPONSE = (
+    "I understand this is urgent. Let me check our emergency schedule immediately."
+)
+# Said when the LLM stream fails before any of the reply was spoken
+REPLY_ERROR_RESPONSE = "Sorry, I lost my train of thought. Could you say that again?"
+EMERGENCY_THRESHOLD = 0.75
+KEYWORD_MATCH_SCORE = 1.0
+
+
+def fixed_phrases(
+    prof_config: Dict[str, Any], client_config: Optional[Dict[str, Any]] = None
+) -> List[str]:
+    """
+    Phrases a profession (and optionally a client) speaks verbatim,
+    worth pre-synthesizing.
+
+    Args:
+        prof_config: Profession configuration
+        client_config: Client configuration whose caller_responses templates to add
+
+    Returns:
+        Greeting, emergency line, booking confirmation, filler and templates
+    """
+    phrases = [prof_config.get("greeting", DEFAULT_GREETING), EMERGENCY_RESPONSE]
+    if prof_config.get("booking_confirmation"):
+        phrases.append(prof_config["booking_confirmation"])
+    phrases.extend(filler_phrases(prof_config))
+    if client_config is not None:
+        phrases.extend(template_phrases(client_config.get("caller_responses")))
+    return phrases
+
+
+def filler_phrases(prof_config: Dict[str, Any]) -> List[str]:
+    """Acknowledgements a profession plays while the LLM is slow to start."""
+    return list(prof_config.get("filler", {}).get("phrases", DEFAULT_FILLER_PHRASES))
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split a complete reply into the segments it would have streamed as."""
+    segmenter = SentenceSegmenter()
+    segments = segmenter.feed(text)
+    last = segmenter.flush()
+    return segments + [last] if last else segments
+
+
+class CallSession:
+    """State and turn handling for a single call."""
+
+    def __init__(
+        self,
+        incoming_number: str,
+        client_config: Dict[str, Any],
+        prof_config: Dict[str, Any],
+        llm_provider: Any,
+        scoring: Any,
+        intents: Any,
+        keywords: Optional[Any] = None,
+        speculative_stable_ms: Optional[float] = None,
+        interim_intents: bool = True,
+        max_sentences: int = 0,
+        segment_max_wait_ms: float = 400.0,
+        filler_deadline_ms: Optional[float] = None,
+        context: Optional[ContextBuilder] = None,
+        response_cache: Optional[Any] = None,
+        cache_intents: Iterable[str] = (),
+        cache_fingerprint: str = "",
+        templates: Optional[Dict[str, str]] = None,
+        emergency_response: Optional[str] = None,
+    ):
+        """
+        Initialize call session.
+
+        Args:
+            incoming_number: Caller's phone number (E.164)
+            client_config: Routed client configuration
+            prof_config: Profession configuration
+            llm_provider: Shared LLM provider (stream_response)
+            scoring: Shared AsyncScoringService
+            intents: Immutable IntentSnapshot for this call's profession
+            keywords: KeywordMatcher for this call's profession (first stage)
+            speculative_stable_ms: Start the LLM once an interim transcript is
+                stable this long (None disables speculation)
+            interim_intents: Detect emergencies on interim transcripts
+            max_sentences: Cut replies off after this many sentences (0 = no limit)
+            segment_max_wait_ms: Flush reply text to TTS if no sentence closes this fast
+            filler_deadline_ms: Play filler if the first LLM token takes longer
+                (None disables filler)
+            context: Conversation memory sent with each LLM request
+                (None sends the latest utterance only)
+            response_cache: Shared SemanticResponseCache of approved answers
+            cache_intents: Intents whose questions may be answered from the cache
+            cache_fingerprint: Fingerprint of the client configuration answers depend on
+            templates: Intent label -> caller_responses template answering it
+            emergency_response: Client's emergency line (default EMERGENCY_RESPONSE)
+        """
+        self.call_id = uuid.uuid4().hex
+        self.incoming_number = incoming_number
+        self.client_config = client_config
+        self.prof_config = prof_config
+        self.profession = client_config.get("profession", "dentist")
+        self.system_prompt = prof_config.get("system_prompt", DEFAULT_SYSTEM_PROMPT)
+        self.llm_provider = llm_provider
+        self.scoring = scoring
+        self.intents = intents
+        self.keywords = keywords
+        self.interim_monitor = (
+            InterimIntentMonitor(self._detect_interim, threshold=EMERGENCY_THRESHOLD)
+            if interim_intents
+            else None
+        )
+        self.speculator = (
+            SpeculativeGenerator(
+                self._start_llm_stream,
+                self.profession,
+                speculative_stable_ms,
+                context_key=self._context_fingerprint,
+            )
+            if speculative_stable_ms is not None
+            else None
+        )
+        self.max_sentences = max_sentences
+        self.segment_max_wait_ms = segment_max_wait_ms
+        self.filler_deadline_ms = filler_deadline_ms
+        self.context = context
+        self.tenant = client_config.get("name", "unknown")
+        self.response_cache = response_cache
+        self.cache_intents = frozenset(cache_intents)
+        self.cache_fingerprint = cache_fingerprint
+        self.templates = templates or {}
+        self.emergency_response = emergency_response or EMERGENCY_RESPONSE
+        self.turns = 0
+        self.template_turns = 0
+        # LLM scheduler class; the rest of a call that raised an emergency goes first
+        self.priority = "normal"
+        # (reply, question, embedding, answer) awaiting the caller hearing it in full
+        self._unapproved: Optional[Tuple[ReplyTracker, str, Any, str]] = None
+        self.filler_phrases = filler_phrases(prof_config)
+        self._filler_turns = 0
+        # Plays a fixed phrase from cached audio; set by the voice layer
+        self.speak_fixed: Optional[Callable[[str], Awaitable[None]]] = None
+        # Plays cached filler audio to completion; set by the voice layer
+        self.play_filler: Optional[Callable[[str], Awaitable[None]]] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.replies: List[ReplyTracker] = []
+        self.conversation_history: List[str] = []
+        self.call_start_time = time.time()
+        # Per-turn STT/LLM/TTS spans; the voice layer marks speech and audio events
+        self.latency = CallLatency()
+        # Timeline of this call when sampled for tracing; set by the voice layer
+        self.trace = NULL_TRACE
+
+    @property
+    def greeting(self) -> str:
+        """Opening line for this call."""
+        return self.prof_config.get("greeting", DEFAULT_GREETING)
+
+    def add_caller_message(self, msg: str) -> None:
+        """Record a committed caller utterance."""
+        self.conversation_history.append(f"Caller: {msg}")
+        if self.context is not None:
+            self.context.add_turn("caller", msg)
+
+    def add_agent_message(self, msg: str) -> None:
+        """Record a committed agent utterance."""
+        self.conversation_history.append(f"Agent: {msg}")
+        if self.context is not None:
+            self.context.add_turn("agent", msg)
+
+    async def detect_intent(self, text: str) -> Tuple[str, float]:
+        """
+        Detect the intent of an utterance (or partial utterance).
+
+        A keyword hit resolves immediately; otherwise the text is scored
+        against this call's intent snapshot (off the event loop, batched
+        with other encodes in flight).
+
+        Returns:
+            (Intent Label, Confidence Score)
+        """
+        label, score, _ = await self._detect(text)
+        return label, score
+
+    async def _detect(self, text: str) -> Tuple[str, float, str]:
+        if self.keywords is not None:
+            match = self.keywords.match(text)
+            if match is not None:
+                label, keyword = match
+                logger.debug(f"Keyword hit: {label} ({keyword!r})")
+                return label, KEYWORD_MATCH_SCORE, "keyword"
+
+        label, score = await self.scoring.score(text, EMERGENCY_THRESHOLD, snapshot=self.intents)
+        return label, score, "embedding" if label != "None" else "none"
+
+    async def _detect_interim(self, text: str) -> Tuple[str, float]:
+        # Interim text is partial, so only high-precision phrase hits fire early;
+        # the committed utterance still goes through every stage
+        if self.keywords is not None:
+            for label, keyword in self.keywords.find_all(text):
+                if " " in keyword:
+                    return label, KEYWORD_MATCH_SCORE
+        return "None", 0.0
+
+    async def classify(self, text: str) -> Tuple[str, float]:
+        """
+        Detect the intent of a committed utterance, counting which
+        stage resolved it.
+
+        Returns:
+            (Intent Label, Confidence Score)
+        """
+        start = self.trace.now()
+        label, score, stage = await self._detect(text)
+        get_metrics().inc(f"intent.resolved.{stage}")
+        self.trace.complete("scoring", "classify", start, label=label, score=round(score, 3), stage=stage)
+        return label, score
+
+    async def respond(self, user_msg: str) -> AsyncIterator[str]:
+        """
+        Produce the agent's reply to a caller utterance.
+
+        Args:
+            user_msg: Committed caller utterance
+
+        Yields:
+            Whole clauses and sentences of the reply
+        """
+        self.turns += 1
+        monitor = self.interim_monitor
+        early = monitor.end_turn() if monitor is not None else None
+        answered_early = early is not None and monitor.on_trigger is not None
+
+        # 🧠 Micro-Model Semantic Check (Sub-second)
+        intent_label, score = await self.classify(user_msg)
+
+        if answered_early:
+            if intent_label == early[0] and score > EMERGENCY_THRESHOLD:
+                # Already answered while the caller was still speaking
+                logger.info(f"Turn handled on interim transcript: {early[0]}")
+                self._cancel_speculation()
+                if early[0] == "EMERGENCY":
+                    self.priority = "emergency"
+                return
+            # The full utterance says otherwise: answer what the caller asked
+            logger.warning(f"Early {early[0]} not confirmed by final transcript ({intent_label})")
+            get_metrics().inc("intent.interim.unconfirmed")
+
+        if intent_label == "EMERGENCY" and score > EMERGENCY_THRESHOLD:
+            logger.info(f"🚨 SEMANTIC TRIGGER: {intent_label} ({score:.2f})")
+            self._cancel_speculation()
+            self.priority = "emergency"
+            self.latency.mark(FIRST_TOKEN)
+            self.trace.instant("llm", "reply.emergency")
+            # Immediate response
+            if self.speak_fixed is not None:
+                self.spawn(self.speak_fixed(self.emergency_response))
+                return
+            yield self.emergency_response
+            return
+
+        template = self.templates.get(intent_label)
+        if template is not None:
+            logger.info(f"📋 Answered from template: {intent_label} ({score:.2f})")
+            self._cancel_speculation()
+            self.template_turns += 1
+            get_metrics().inc("templates.turns_served")
+            self.latency.mark(FIRST_TOKEN)
+            self.trace.instant("llm", "reply.template", intent=intent_label)
+            if self.speak_fixed is not None:
+                # Template text is fixed, so it can play from cached audio
+                self.spawn(self.speak_fixed(template))
+                return
+            for segment in split_sentences(template):
+                yield segment
+            return
+
+        question_vec = None
+        if self.response_cache is not None and intent_label in self.cache_intents:
+            question_vec = await self.scoring.encode(user_msg)
+            cached = self.response_cache.lookup(self.tenant, self.cache_fingerprint, question_vec)
+            if cached is not None:
+                logger.info(f"💾 Answered from response cache: {cached.question!r}")
+                self._cancel_speculation()
+                self.latency.mark(FIRST_TOKEN)
+                self.trace.instant("llm", "reply.cache", hits=cached.hits)
+                for segment in split_sentences(cached.answer):
+                    yield segment
+                return
+
+        stream = None
+        if question_vec is not None:
+            # A cacheable answer may be replayed to other callers, so it is
+            # generated from the question alone, not this caller's conversation
+            self._cancel_speculation()
+        elif self.speculator is not None:
+            stream = self.speculator.take(user_msg)
+        speculative = stream is not None
+        if stream is None:
+            stream = self._start_llm_stream(user_msg, caller_context=question_vec is None)
+        reply = self._begin_reply()
+        stream = reply.track(stream)
+        self.trace.instant("llm", "llm.request", priority=self.priority, speculative=speculative)
+        llm_start = self.trace.now()
+
+        use_filler = self.play_filler is not None and self.filler_phrases
+        if use_filler and self.filler_deadline_ms is not None:
+            stream = mask_first_token(
+                stream,
+                self.filler_deadline_ms,
+                self._play_next_filler,
+                metric_prefix=f"filler.{self.profession}",
+            )
+
+        spoken: List[str] = []
+        try:
+            async for segment in segment_stream(
+                stream,
+                max_sentences=self.max_sentences,
+                max_wait_ms=self.segment_max_wait_ms,
+            ):
+                if reply.cancelled:
+                    return
+                spoken.append(segment)
+                yield segment
+        except Exception as e:
+            # Stream failed mid-reply: never cached, and the caller is not left in silence
+            reply.degraded = True
+            get_metrics().inc("llm.reply.errors")
+            logger.error(f"❌ LLM reply failed after {len(spoken)} segments: {e}")
+            if not spoken:
+                yield REPLY_ERROR_RESPONSE
+        finally:
+            self.trace.complete(
+                "llm", "llm.reply", llm_start,
+                tokens=reply.tokens_generated, cancelled=reply.cancelled, degraded=reply.degraded,
+            )
+
+        if question_vec is not None and spoken and not reply.cancelled and not reply.degraded:
+            answer = " ".join(spoken)
+            if mentions_personal_facts(answer, self._caller_facts()):
+                get_metrics().inc("response_cache.personal_skipped")
+                logger.info("💾 Not caching an answer that mentions the caller")
+            else:
+                # Cached once the caller has heard it in full
+                self._unapproved = (reply, user_msg, question_vec, answer)
+
+    @property
+    def current_reply(self) -> Optional[ReplyTracker]:
+        """The most recent LLM reply, if any."""
+        return self.replies[-1] if self.replies else None
+
+    def interrupt(self, spoken_text: str = "") -> bool:
+        """
+        Handle a caller barge-in: stop generating the current reply.
+
+        Args:
+            spoken_text: Part of the reply played before the interruption
+
+        Returns:
+            True if LLM generation was still running and got cancelled
+        """
+        reply = self.current_reply
+        if reply is None:
+            return False
+        cancelled = reply.cancel()
+        self._unapproved = None
+        if reply.tokens_spoken is None:
+            spoken = reply.mark_spoken(spoken_text)
+            metrics = get_metrics()
+            metrics.inc("llm.barge_in.interruptions")
+            metrics.observe("llm.barge_in.unspoken_tokens", reply.tokens_generated - spoken)
+        if cancelled:
+            get_metrics().inc("llm.barge_in.cancelled")
+            logger.info(f"✋ Barge-in: stopped LLM after {reply.tokens_generated} tokens")
+        return cancelled
+
+    def reply_spoken(self) -> None:
+        """The current reply played to the end."""
+        reply = self.current_reply
+        if reply is None:
+            return
+        reply.mark_spoken()
+        if self._unapproved is not None and self._unapproved[0] is reply:
+            _, question, vector, answer = self._unapproved
+            self._unapproved = None
+            if reply.tokens_spoken == reply.tokens_generated:
+                self.response_cache.store(self.tenant, self.cache_fingerprint, question, vector, answer)
+
+    def token_usage(self) -> Dict[str, int]:
+        """LLM tokens generated for this call vs tokens the caller heard."""
+        return {
+            "generated": sum(r.tokens_generated for r in self.replies),
+            "spoken": sum(r.tokens_spoken or 0 for r in self.replies),
+        }
+
+    async def on_interim_transcript(self, text: str) -> None:
+        """
+        Handle an interim STT transcript for the current utterance.
+
+        Args:
+            text: Interim transcript so far
+        """
+        if self.speculator is not None:
+            self.speculator.on_interim(text)
+        if self.interim_monitor is not None:
+            await self.interim_monitor.on_interim(text)
+
+    def _caller_facts(self) -> Dict[str, str]:
+        """Key facts the caller has given so far on this call."""
+        facts: Dict[str, str] = {}
+        for line in self.conversation_history:
+            if line.startswith("Caller: "):
+                facts.update(extract_facts(line[len("Caller: "):]))
+        return facts
+
+    def _context_fingerprint(self, user_msg: str) -> Hashable:
+        """Identity of the conversation context sent with a caller utterance."""
+        return self.context.fingerprint(user_msg) if self.context is not None else None
+
+    def _start_llm_stream(self, user_msg: str, caller_context: bool = True) -> AsyncIterator[str]:
+        """
+        Open the LLM token stream for a caller utterance.
+
+        Args:
+            user_msg: Caller utterance to answer
+            caller_context: Send the call's conversation so far (off for
+                answers other callers may be given from the response cache)
+        """
+        if self.context is None or not caller_context:
+            return self.llm_provider.stream_response(
+                prompt=user_msg,
+                system_prompt=self.system_prompt,
+                tenant=self.tenant,
+                priority=self.priority,
+            )
+        return self.llm_provider.stream_response(
+            prompt=user_msg,
+            system_prompt=self.system_prompt,
+            context=self.context.build(self.system_prompt, user_msg),
+            tenant=self.tenant,
+            priority=self.priority,
+        )
+
+    async def _play_next_filler(self) -> None:
+        # Rotate phrases so repeat fillers in one call don't sound canned
+        phrase = self.filler_phrases[self._filler_turns % len(self.filler_phrases)]
+        self._filler_turns += 1
+        await self.play_filler(phrase)
+
+    def _begin_reply(self) -> ReplyTracker:
+        previous = self.current_reply
+        if previous is not None:
+            # A new turn supersedes a reply still generating
+            previous.cancel()
+        reply = ReplyTracker(on_first_token=self._on_first_token)
+        self.replies.append(reply)
+        return reply
+
+    def _on_first_token(self) -> None:
+        self.latency.mark(FIRST_TOKEN)
+        self.trace.instant("llm", "llm.first_token")
+
+    def _cancel_speculation(self) -> None:
+        if self.speculator is not None:
+            self.speculator.cancel()
+
+    def spawn(self, coro: Awaitable) -> asyncio.Task:
+        """
+        Run a background task owned by this call.
+        Outstanding tasks are cancelled when the call closes.
+        """
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def close(self) -> None:
+        """Cancel this call's outstanding background tasks."""
+        self._cancel_speculation()
+        if self.current_reply is not None:
+            self.current_reply.cancel()
+        usage = self.token_usage()
+        metrics = get_metrics()
+        metrics.inc("llm.tokens.generated", usage["generated"])
+        metrics.inc("llm.tokens.spoken", usage["spoken"])
+        self.latency.close()
+        for task in list(self._tasks):
+            task.cancel()
+
+    def duration(self) -> float:
+        """Seconds since the call started."""
+        return time.time() - self.call_start_time
+
+    def transcript(self) -> str:
+        """Full call transcript."""
+        return "\n".join(self.conversation_history)
@@ -0,0 +1,209 @@
+"""
+Speculative LLM generation on stable interim transcripts.
+Starts the LLM request before the caller's speech is committed, and
+reuses the in-flight stream when the final transcript matches.
+"""
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Callable, Hashable, List, Optional
+
+from services.logic.embedding_cache import normalize_utterance
+from services.metrics import get_metrics
+
+logger = logging.getLogger("speculative-llm")
+
+StreamFactory = Callable[[str], AsyncIterator[str]]
+ContextKey = Callable[[str], Hashable]
+
+
+class Speculation:
+    """One in-flight LLM stream, buffered so it can be replayed from the start."""
+
+    def __init__(self, text: str, start_stream: StreamFactory, context_key: Hashable = None):
+        """
+        Start generating for an interim transcript.
+
+        Args:
+            text: Interim transcript used as the prompt
+            start_stream: Opens the LLM token stream for a caller utterance
+            context_key: Fingerprint of the call context the stream was built from
+        """
+        self.text = text
+        self.key = normalize_utterance(text)
+        self.context_key = context_key
+        self.chunks: List[str] = []
+        self.done = False
+        self.started_at = time.monotonic()
+        self.first_token_at: Optional[float] = None
+        self._updated = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run(start_stream(text)))
+
+    async def _run(self, stream: AsyncIterator[str]) -> None:
+        try:
+            async for chunk in stream:
+                if self.first_token_at is None:
+                    self.first_token_at = time.monotonic()
+                self.chunks.append(chunk)
+                self._updated.set()
+        finally:
+            self.done = True
+            self._updated.set()
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def replay(self) -> AsyncIterator[str]:
+        """Yield every chunk generated so far, then follow the live stream."""
+        sent = 0
+        try:
+            while True:
+                while sent < len(self.chunks):
+                    yield self.chunks[sent]
+                    sent += 1
+                if self.done:
+                    return
+                self._updated.clear()
+                if sent == len(self.chunks) and not self.done:
+                    await self._updated.wait()
+        finally:
+            # Consumer stopped early (e.g. reply cut off): stop generating
+            self._task.cancel()
+
+    def cancel(self) -> int:
+        """
+        Abandon this speculation.
+
+        Returns:
+            Number of tokens generated for nothing
+        """
+        self._task.cancel()
+        return len(self.chunks)
+
+
+class SpeculativeGenerator:
+    """
+    Per-call speculation driver.
+
+    An interim transcript that stays unchanged for stable_window_ms starts a
+    speculative LLM stream. At commit, a matching final transcript takes over
+    the stream, unless the call context changed since it started (e.g. the
+    previous reply was committed meanwhile); any other outcome cancels it
+    and counts the wasted tokens.
+    """
+
+    def __init__(
+        self,
+        start_stream: StreamFactory,
+        profession: str,
+        stable_window_ms: float = 300.0,
+        context_key: Optional[ContextKey] = None,
+    ):
+        """
+        Initialize generator.
+
+        Args:
+            start_stream: Opens the LLM token stream for a caller utterance
+            profession: Profession name, used to key tuning metrics
+            stable_window_ms: How long an interim must stay unchanged
+            context_key: Fingerprints the context a stream for an utterance
+                would be built from (None: context never goes stale)
+        """
+        self.start_stream = start_stream
+        self.context_key = context_key
+        self.stable_window = stable_window_ms / 1000.0
+        self.metric_prefix = f"speculative.{profession}"
+        self._pending_key = ""
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._speculation: Optional[Speculation] = None
+
+    def on_interim(self, text: str) -> None:
+        """
+        Feed an interim transcript.
+
+        Args:
+            text: Interim transcript of the current utterance so far
+        """
+        key = normalize_utterance(text)
+        if not key or key == self._pending_key:
+            return
+        self._pending_key = key
+
+        if self._speculation is not None and self._speculation.key != key:
+            self._discard("superseded")
+        if self._timer is not None:
+            self._timer.cancel()
+
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(self.stable_window, self._start, text)
+
+    def _start(self, text: str) -> None:
+        self._timer = None
+        if self._speculation is None:
+            get_metrics().inc(f"{self.metric_prefix}.started")
+            self._speculation = Speculation(text, self.start_stream, self._context_key(text))
+
+    def take(self, final_text: str) -> Optional[AsyncIterator[str]]:
+        """
+        Claim the speculative stream for a committed utterance.
+
+        Args:
+            final_text: Final transcript
+
+        Returns:
+            Replaying stream if the speculation matches, else None
+        """
+        speculation = self._reset()
+        if speculation is None:
+            return None
+
+        if speculation.key != normalize_utterance(final_text):
+            self._record_waste(speculation, "mismatch")
+            return None
+
+        if speculation.context_key != self._context_key(final_text):
+            self._record_waste(speculation, "stale")
+            return None
+
+        now = time.monotonic()
+        ttft = (
+            speculation.first_token_at - speculation.started_at
+            if speculation.first_token_at is not None
+            else now - speculation.started_at
+        )
+        saved_ms = min(ttft, now - speculation.started_at) * 1000
+
+        metrics = get_metrics()
+        metrics.inc(f"{self.metric_prefix}.hits")
+        metrics.observe(f"{self.metric_prefix}.ttfa_saved_ms", saved_ms)
+        logger.info(f"🔮 Reusing speculative stream (saved ~{saved_ms:.0f}ms)")
+        return speculation.replay()
+
+    def cancel(self) -> None:
+        """Drop any speculation for the current turn (e.g. fast-path answer)."""
+        speculation = self._reset()
+        if speculation is not None:
+            self._record_waste(speculation, "unused")
+
+    def _context_key(self, text: str) -> Hashable:
+        return self.context_key(text) if self.context_key is not None else None
+
+    def _reset(self) -> Optional[Speculation]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending_key = ""
+        speculation, self._speculation = self._speculation, None
+        return speculation
+
+    def _discard(self, reason: str) -> None:
+        speculation, self._speculation = self._speculation, None
+        if speculation is not None:
+            self._record_waste(speculation, reason)
+
+    def _record_waste(self, speculation: Speculation, reason: str) -> None:
+        wasted = speculation.cancel()
+        metrics = get_metrics()
+        metrics.inc(f"{self.metric_prefix}.{reason}")
+        metrics.inc(f"{self.metric_prefix}.wasted_tokens", wasted)
+        logger.debug(f"Speculation {reason}: {wasted} tokens wasted")
@@ -0,0 +1,84 @@
+"""
+Caller-response templates from client onboarding.
+Compiles a business's caller_responses into intents, so turns that match
+one are answered from the template without calling the LLM.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+TEMPLATE_PREFIX = "TEMPLATE:"
+
+# Example caller phrasings for the template keys onboarding creates
+TEMPLATE_INTENT_PHRASES: Dict[str, List[str]] = {
+    "appointment_request": [
+        "I'd like to make an appointment",
+        "Can I schedule a visit?",
+        "I need to book an appointment",
+        "Do you have any openings this week?",
+        "Can I come in to see someone?",
+    ],
+    "pricing_inquiry": [
+        "How much does it cost?",
+        "What are your prices?",
+        "How much do you charge?",
+        "Can you give me a price quote?",
+        "What's the rate for that service?",
+    ],
+}
+
+# Keys that are not standalone answers
+EMERGENCY_KEY = "emergency"  # Replaces the emergency line instead
+CATCH_ALL_KEY = "other"  # Generic opener; nothing to match it against
+
+
+def _template_text(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get("response")
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return None
+
+
+def compile_templates(
+    caller_responses: Optional[Dict[str, Any]],
+) -> Tuple[Dict[str, List[str]], Dict[str, str], Optional[str]]:
+    """
+    Turn onboarding caller_responses into scorer intents.
+
+    A template is either the response text, or
+    {"response": "...", "phrases": ["caller phrasing", ...]} for custom keys.
+    Custom keys without phrases match on their own name
+    ("insurance_question" -> "insurance question").
+
+    Args:
+        caller_responses: Template key -> template
+
+    Returns:
+        (intents for build_snapshot, intent label -> response text,
+        emergency line override or None)
+    """
+    intents: Dict[str, List[str]] = {}
+    responses: Dict[str, str] = {}
+    emergency = None
+    for key, value in (caller_responses or {}).items():
+        text = _template_text(value)
+        if text is None or key == CATCH_ALL_KEY:
+            continue
+        if key == EMERGENCY_KEY:
+            emergency = text
+            continue
+
+        phrases = value.get("phrases") if isinstance(value, dict) else None
+        phrases = phrases or TEMPLATE_INTENT_PHRASES.get(key) or [key.replace("_", " ")]
+        label = f"{TEMPLATE_PREFIX}{key}"
+        intents[label] = list(phrases)
+        responses[label] = text
+    return intents, responses, emergency
+
+
+def template_phrases(caller_responses: Optional[Dict[str, Any]]) -> List[str]:
+    """Template texts a client speaks verbatim, worth pre-synthesizing."""
+    _, responses, emergency = compile_templates(caller_responses)
+    phrases = list(responses.values())
+    if emergency:
+        phrases.append(emergency)
+    return phrases
@@ -0,0 +1,171 @@
+"""
+Per-call timeline traces in Chrome Trace Event format.
+A sampled call records VAD, STT, scoring, LLM, TTS and DB events and is
+written to one JSON file, viewable in chrome://tracing or Perfetto.
+"""
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("call-trace")
+
+# Timeline lanes (Chrome trace "threads"), top to bottom
+LANES = ["vad", "stt", "scoring", "llm", "tts", "db"]
+
+
+class CallTrace:
+    """
+    Timeline of one call.
+
+    Events are kept in memory and written once when the call ends.
+    Arguments should be sizes and labels, not transcript text: trace
+    files sit on local disk outside the analytics database.
+    """
+
+    enabled = True
+
+    def __init__(self, call_id: str, clock: Callable[[], float] = time.perf_counter):
+        """
+        Initialize trace.
+
+        Args:
+            call_id: Call the trace belongs to (file name)
+            clock: Time source in seconds (injectable for tests)
+        """
+        self.call_id = call_id
+        self.clock = clock
+        self.metadata: Dict[str, Any] = {"call_id": call_id}
+        self.events: List[Dict[str, Any]] = []
+        self._origin = clock()
+        self._pid = os.getpid()
+
+    def now(self) -> float:
+        """Current time on the trace clock, for complete()."""
+        return self.clock()
+
+    def instant(self, lane: str, name: str, **args: Any) -> None:
+        """
+        Record a point-in-time event.
+
+        Args:
+            lane: One of LANES
+            name: Event name
+            **args: Event details
+        """
+        self._add({"ph": "i", "s": "t", "name": name, "ts": self._us(self.clock())}, lane, args)
+
+    def complete(self, lane: str, name: str, start: float, end: Optional[float] = None, **args: Any) -> None:
+        """
+        Record a span that started at a time taken from now().
+
+        Args:
+            lane: One of LANES
+            name: Event name
+            start: Span start (from now())
+            end: Span end (default now)
+            **args: Event details
+        """
+        end = self.clock() if end is None else end
+        self._add(
+            {"ph": "X", "name": name, "ts": self._us(start), "dur": max(0.0, (end - start) * 1e6)},
+            lane,
+            args,
+        )
+
+    @contextmanager
+    def span(self, lane: str, name: str, **args: Any) -> Iterator[None]:
+        """Record the block as a span (works across awaits)."""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.complete(lane, name, start, **args)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Chrome Trace Event document.
+
+        Returns:
+            {"traceEvents": [...], "displayTimeUnit": "ms", "otherData": metadata}
+        """
+        lanes = [
+            {"ph": "M", "name": "thread_name", "pid": self._pid, "tid": tid, "args": {"name": lane}}
+            for tid, lane in enumerate(LANES)
+        ]
+        return {
+            "traceEvents": lanes + sorted(self.events, key=lambda e: e["ts"]),
+            "displayTimeUnit": "ms",
+            "otherData": self.metadata,
+        }
+
+    def write(self, directory: str) -> Path:
+        """
+        Write the trace file.
+
+        Args:
+            directory: Trace directory (created if missing)
+
+        Returns:
+            Path of the written file
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        path = path / f"{self.call_id}.trace.json"
+        path.write_text(json.dumps(self.to_dict()))
+        logger.info(f"🧵 Call trace written: {path} ({len(self.events)} events)")
+        return path
+
+    def _us(self, t: float) -> float:
+        return (t - self._origin) * 1e6
+
+    def _add(self, event: Dict[str, Any], lane: str, args: Dict[str, Any]) -> None:
+        event["pid"] = self._pid
+        event["tid"] = LANES.index(lane)
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+
+class NullTrace:
+    """Trace of an unsampled call: every method is a no-op."""
+
+    enabled = False
+
+    def now(self) -> float:
+        return 0.0
+
+    def instant(self, lane: str, name: str, **args: Any) -> None:
+        pass
+
+    def complete(self, lane: str, name: str, start: float, end: Optional[float] = None, **args: Any) -> None:
+        pass
+
+    def span(self, lane: str, name: str, **args: Any):
+        return nullcontext()
+
+
+NULL_TRACE = NullTrace()
+
+
+def start_trace(
+    call_id: str, sample_rate: float, rng: Callable[[], float] = random.random
+) -> Any:
+    """
+    Decide whether to trace a call.
+
+    Args:
+        call_id: Call to trace
+        sample_rate: Fraction of calls traced (0 = off, 1 = every call)
+        rng: Uniform [0, 1) source (injectable for tests)
+
+    Returns:
+        A CallTrace for sampled calls, otherwise NULL_TRACE
+    """
+    if sample_rate > 0 and rng() < sample_rate:
+        return CallTrace(call_id)
+    return NULL_TRACE
@@ -0,0 +1,353 @@
+"""
+Worker load reporting and call admission.
+Combines active calls, event-loop lag and CPU into the load figure
+LiveKit uses to pick a worker, so a worker reports itself full before
+call quality degrades.
+
+LiveKit runs calls in job processes but asks the main worker process for
+its load, so each job process publishes its loop lag to a report file
+the main process reads (see publish() and collect()).
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("worker-load")
+
+PROC_STAT = "/proc/stat"
+# Set by the main worker process; job processes publish their load here
+LOAD_DIR_ENV = "WORKER_LOAD_DIR"
+
+
+def read_cpu_times(path: str = PROC_STAT) -> Optional[Tuple[float, float]]:
+    """
+    Host-wide CPU time counters.
+
+    Args:
+        path: Kernel CPU statistics file (Linux)
+
+    Returns:
+        (busy, total) jiffies since boot, or None where /proc is unavailable
+    """
+    try:
+        with open(path) as f:
+            fields = [float(v) for v in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0.0)  # idle + iowait
+    total = sum(fields[:8])  # guest time is already counted in user
+    return total - idle, total
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class WorkerLoad:
+    """
+    Load of one worker process, from 0.0 (idle) to 1.0 (full).
+
+    Each signal is divided by its limit and the largest ratio is the load,
+    so the worker is full as soon as any one resource reaches its limit.
+    Limits should sit below the point where turn latency degrades (see
+    scripts/load_test_calls.py). A draining worker always reports full.
+
+    The LLM backend is not a signal: every worker shares it, so its queue
+    does not say which worker should take a call. Backend overload is
+    handled per request by the LLM scheduler and circuit breaker.
+
+    With LiveKit's process executor, the main worker process collect()s
+    the reports that job processes publish(): the worst loop lag across
+    jobs counts towards its load, and a report that has stopped updating
+    counts its age as loop lag.
+    """
+
+    def __init__(
+        self,
+        max_calls: int = 20,
+        max_loop_lag_ms: float = 50.0,
+        max_cpu_percent: float = 80.0,
+        load_threshold: float = 1.0,
+        lag_window_seconds: float = 5.0,
+        lag_interval_ms: float = 100.0,
+        report_interval_ms: float = 500.0,
+        clock: Callable[[], float] = time.monotonic,
+        cpu_reader: Callable[[], Optional[Tuple[float, float]]] = read_cpu_times,
+    ):
+        """
+        Initialize worker load.
+
+        Args:
+            max_calls: Active calls at which the worker is full (0 = no limit)
+            max_loop_lag_ms: Recent event-loop lag at which the worker is full (0 = no limit)
+            max_cpu_percent: Host CPU use at which the worker is full (0 = no limit)
+            load_threshold: Load at which new calls are refused
+            lag_window_seconds: Lag samples older than this are forgotten
+            lag_interval_ms: Sleep between event-loop lag samples
+            report_interval_ms: How often a job process publishes its load
+            clock: Time source (injectable for tests)
+            cpu_reader: (busy, total) CPU counter source (injectable for tests)
+        """
+        self.limits = {
+            "calls": max_calls,
+            "loop_lag_ms": max_loop_lag_ms,
+            "cpu_percent": max_cpu_percent,
+        }
+        self.load_threshold = load_threshold
+        self.lag_window_seconds = lag_window_seconds
+        self.lag_interval = lag_interval_ms / 1000.0
+        self.clock = clock
+        self.cpu_reader = cpu_reader
+        self.active_calls = 0
+        self.draining = False
+        self._lags: Deque[Tuple[float, float]] = deque()
+        self._cpu_sample = cpu_reader()
+        self._cpu_percent = 0.0
+        self.report_interval = report_interval_ms / 1000.0
+        # Job process: where to publish; main process: where to collect from
+        self.publish_dir: Optional[Path] = None
+        self.collect_dir: Optional[Path] = None
+        self._sampler: Optional[asyncio.Task] = None
+        self._publisher: Optional[asyncio.Task] = None
+
+    def call_started(self) -> None:
+        """Count a call that began in this process."""
+        self.active_calls += 1
+        get_metrics().set_gauge("worker.active_calls", self.active_calls)
+
+    def call_finished(self) -> None:
+        """Count a call that ended in this process."""
+        self.active_calls = max(0, self.active_calls - 1)
+        get_metrics().set_gauge("worker.active_calls", self.active_calls)
+
+    def drain(self) -> None:
+        """Stop taking calls; calls already running are left to finish."""
+        if not self.draining:
+            self.draining = True
+            logger.info(f"🚰 Worker draining with {self.active_calls} active calls")
+
+    def record_lag(self, lag_ms: float) -> None:
+        """
+        Record one event-loop lag sample.
+
+        Args:
+            lag_ms: How late a timer fired, in milliseconds
+        """
+        self._lags.append((self.clock(), lag_ms))
+        get_metrics().observe("worker.loop_lag_ms", lag_ms)
+
+    def loop_lag_ms(self) -> float:
+        """Worst event-loop lag within the lag window."""
+        cutoff = self.clock() - self.lag_window_seconds
+        while self._lags and self._lags[0][0] < cutoff:
+            self._lags.popleft()
+        return max((lag for _, lag in self._lags), default=0.0)
+
+    def cpu_percent(self) -> float:
+        """Host CPU use since the previous reading (the last value if too soon)."""
+        sample = self.cpu_reader()
+        if sample is None:
+            # No /proc: 1-minute load average as a share of the cores
+            try:
+                return os.getloadavg()[0] / (os.cpu_count() or 1) * 100
+            except OSError:
+                return 0.0
+        if self._cpu_sample is not None and sample[1] > self._cpu_sample[1]:
+            busy = sample[0] - self._cpu_sample[0]
+            self._cpu_percent = busy / (sample[1] - self._cpu_sample[1]) * 100
+            self._cpu_sample = sample
+        elif self._cpu_sample is None:
+            self._cpu_sample = sample
+        return self._cpu_percent
+
+    def signals(self) -> Dict[str, float]:
+        """Current value of every load signal, including collected job reports."""
+        loop_lag_ms = self.loop_lag_ms()
+        now = time.time()
+        for report in self.job_reports():
+            stale = now - report["time"] - self.report_interval
+            loop_lag_ms = max(loop_lag_ms, report["loop_lag_ms"], stale * 1000)
+        return {
+            "calls": float(self.active_calls),
+            "loop_lag_ms": loop_lag_ms,
+            "cpu_percent": self.cpu_percent(),
+        }
+
+    def load(self, active_calls: Optional[int] = None) -> float:
+        """
+        Current load, for LiveKit's load_fnc.
+
+        Args:
+            active_calls: Calls running on the worker, when known better than
+                this process's own count (e.g. LiveKit's active jobs);
+                replaces the count until the next call starts or ends
+
+        Returns:
+            Load from 0.0 to 1.0
+        """
+        self.ensure_sampler()
+        if active_calls is not None:
+            self.active_calls = active_calls
+        signals = self.signals()
+
+        metrics = get_metrics()
+        load = 1.0 if self.draining else 0.0
+        for name, value in signals.items():
+            limit = self.limits[name]
+            metrics.set_gauge(f"worker.load.{name}", value)
+            if limit > 0:
+                load = max(load, value / limit)
+        load = min(load, 1.0)
+        metrics.set_gauge("worker.load", load)
+        return load
+
+    def accepting(self) -> bool:
+        """
+        Whether a new call should be admitted.
+
+        Returns:
+            False while draining or at the load threshold
+        """
+        return not self.draining and self.load() < self.load_threshold
+
+    def ensure_sampler(self) -> None:
+        """Start sampling event-loop lag on the running loop, once per process."""
+        if self._sampler is not None and not self._sampler.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._sampler = loop.create_task(self._sample_lag())
+
+    async def _sample_lag(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            late = time.perf_counter() - started - self.lag_interval
+            self.record_lag(max(0.0, late * 1000))
+
+    def collect(self, base_dir: str) -> Path:
+        """
+        Read job process reports into this (main worker) process's load.
+
+        Creates a report directory for this worker and exports it in
+        LOAD_DIR_ENV, so it must run before job processes are started.
+        Directories left by workers that have exited are removed.
+
+        Args:
+            base_dir: Directory holding one report directory per worker
+
+        Returns:
+            This worker's report directory
+        """
+        base = Path(base_dir)
+        if base.is_dir():
+            for old in base.iterdir():
+                if old.is_dir() and old.name.isdigit() and not pid_alive(int(old.name)):
+                    shutil.rmtree(old, ignore_errors=True)
+        self.collect_dir = base / str(os.getpid())
+        self.collect_dir.mkdir(parents=True, exist_ok=True)
+        os.environ[LOAD_DIR_ENV] = str(self.collect_dir)
+        return self.collect_dir
+
+    def job_reports(self) -> List[Dict[str, Any]]:
+        """
+        Latest load report of every live job process.
+
+        Returns:
+            Reports with loop_lag_ms and time (epoch seconds);
+            empty unless collecting
+        """
+        if self.collect_dir is None:
+            return []
+        reports = []
+        for path in self.collect_dir.glob("*.json"):
+            if not pid_alive(int(path.stem)):
+                # The job process exited; its calls are gone with it
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                reports.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue  # Replaced or removed while reading
+        return reports
+
+    def publish(self, report_dir: Optional[str]) -> None:
+        """
+        Publish this job process's loop lag for the main process.
+
+        Starts the lag sampler and a report writer on the running loop,
+        once per process. Does nothing without a report directory (no
+        collecting main process, e.g. the thread executor or a script).
+
+        Args:
+            report_dir: Main process's report directory (LOAD_DIR_ENV)
+        """
+        self.ensure_sampler()
+        if not report_dir or (self._publisher is not None and not self._publisher.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.publish_dir = Path(report_dir)
+        self._publisher = loop.create_task(self._publish_reports())
+
+    def write_report(self) -> None:
+        """Replace this process's report file with its current signals."""
+        report = {
+            "loop_lag_ms": self.loop_lag_ms(),
+            "time": time.time(),
+        }
+        path = self.publish_dir / f"{os.getpid()}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(report))
+        # Atomic: the main process never reads a half-written report
+        os.replace(tmp, path)
+
+    async def _publish_reports(self) -> None:
+        while True:
+            try:
+                self.write_report()
+            except OSError as e:
+                logger.warning(f"Could not publish worker load: {e}")
+            await asyncio.sleep(self.report_interval)
+
+
+_worker_load: Optional[WorkerLoad] = None
+
+
+def get_worker_load() -> WorkerLoad:
+    """
+    Get the process's worker load, creating it from settings on first use.
+
+    Returns:
+        Process-wide WorkerLoad
+    """
+    global _worker_load
+    if _worker_load is None:
+        from config.settings import settings
+
+        _worker_load = WorkerLoad(
+            max_calls=settings.worker_max_calls,
+            max_loop_lag_ms=settings.worker_max_loop_lag_ms,
+            max_cpu_percent=settings.worker_max_cpu_percent,
+            load_threshold=settings.worker_load_threshold,
+        )
+    return _worker_load
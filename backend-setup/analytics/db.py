@@ -6,13 +6,34 @@ import sqlite3
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 logger = logging.getLogger("analytics-db")
 
 DB_PATH = Path("./data/analytics.db")
 
 
+# Columns added after the first release: (name, type)
+CALL_COLUMNS = [
+    ("turns", "INTEGER DEFAULT 0"),
+    ("template_turns", "INTEGER DEFAULT 0"),
+    ("stt_latency_ms", "REAL"),
+    ("llm_latency_ms", "REAL"),
+    ("tts_latency_ms", "REAL"),
+]
+
+# Per-turn latency spans (agent.latency.SPANS)
+TURN_SPANS = ["stt_ms", "llm_ms", "tts_ms", "response_ms", "playout_ms"]
+
+
+def _add_missing_columns(c: sqlite3.Cursor, table: str, columns: List[Tuple[str, str]]) -> None:
+    """Add columns that an existing database predates."""
+    existing = {row[1] for row in c.execute(f"PRAGMA table_info({table})")}
+    for name, column_type in columns:
+        if name not in existing:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+
 def init_db() -> None:
     """Initialize analytics database."""
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -33,7 +54,31 @@ def init_db() -> None:
             profession TEXT,
             sentiment TEXT,
             success INTEGER DEFAULT 1,
-            revenue_value REAL DEFAULT 0
+            revenue_value REAL DEFAULT 0,
+            turns INTEGER DEFAULT 0,
+            template_turns INTEGER DEFAULT 0,
+            stt_latency_ms REAL,
+            llm_latency_ms REAL,
+            tts_latency_ms REAL
+        )
+    """
+    )
+    _add_missing_columns(c, "calls", CALL_COLUMNS)
+
+    # Turn latencies table
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS turn_latencies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            call_id INTEGER NOT NULL,
+            client_name TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            turn INTEGER NOT NULL,
+            stt_ms REAL,
+            llm_ms REAL,
+            tts_ms REAL,
+            response_ms REAL,
+            playout_ms REAL
         )
     """
     )
@@ -68,6 +113,12 @@ async def log_call_to_db(
     success: bool = True,
     phone_number: str = None,
     revenue_value: float = 0,
+    turns: int = 0,
+    template_turns: int = 0,
+    stt_latency_ms: Optional[float] = None,
+    llm_latency_ms: Optional[float] = None,
+    tts_latency_ms: Optional[float] = None,
+    turn_latencies: Optional[List[Dict[str, Optional[float]]]] = None,
 ) -> None:
     """
     Log a call to the analytics database.
@@ -80,29 +131,56 @@ async def log_call_to_db(
         success: Whether call was successful
         phone_number: Caller's phone number
         revenue_value: Estimated revenue from this call
+        turns: Caller turns the agent answered
+        template_turns: Turns answered from caller_responses templates
+        stt_latency_ms: Mean end-of-speech to final transcript
+        llm_latency_ms: Mean final transcript to first LLM token
+        tts_latency_ms: Mean first LLM token to first agent audio
+        turn_latencies: Per-turn spans (CallLatency.turn_records)
     """
     try:
         conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
+        timestamp = datetime.utcnow().isoformat()
 
         c.execute(
             """
             INSERT INTO calls 
-            (client_name, phone_number, timestamp, duration, transcript, profession, success, revenue_value)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            (client_name, phone_number, timestamp, duration, transcript, profession, success, revenue_value,
+             turns, template_turns, stt_latency_ms, llm_latency_ms, tts_latency_ms)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
             (
                 client_name,
                 phone_number,
-                datetime.utcnow().isoformat(),
+                timestamp,
                 duration,
                 transcript,
                 profession,
                 int(success),
                 revenue_value,
+                turns,
+                template_turns,
+                stt_latency_ms,
+                llm_latency_ms,
+                tts_latency_ms,
             ),
         )
 
+        if turn_latencies:
+            call_id = c.lastrowid
+            c.executemany(
+                f"""
+                INSERT INTO turn_latencies
+                (call_id, client_name, timestamp, turn, {", ".join(TURN_SPANS)})
+                VALUES (?, ?, ?, ?, {", ".join("?" for _ in TURN_SPANS)})
+            """,
+                [
+                    (call_id, client_name, timestamp, record["turn"], *(record.get(span) for span in TURN_SPANS))
+                    for record in turn_latencies
+                ],
+            )
+
         # Update client stats
         c.execute(
             """
@@ -212,5 +290,104 @@ def get_recent_calls(client_name: str, limit: int = 50) -> List[Dict[str, Any]]:
         return []
 
 
+def get_template_report(since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Share of turns answered from caller_responses templates, per client.
+
+    Args:
+        since: Only count calls at or after this ISO timestamp
+
+    Returns:
+        One row per client: calls, turns, template_turns and template_share
+    """
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+
+        c.execute(
+            """
+            SELECT
+                client_name,
+                COUNT(*),
+                COALESCE(SUM(turns), 0),
+                COALESCE(SUM(template_turns), 0)
+            FROM calls
+            WHERE timestamp >= ?
+            GROUP BY client_name
+            ORDER BY client_name
+        """,
+            (since or "",),
+        )
+
+        rows = c.fetchall()
+        conn.close()
+
+        return [
+            {
+                "client_name": row[0],
+                "calls": row[1],
+                "turns": row[2],
+                "template_turns": row[3],
+                "template_share": row[3] / row[2] if row[2] else 0.0,
+            }
+            for row in rows
+        ]
+
+    except Exception as e:
+        logger.error(f"Error building template report: {e}")
+        return []
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = int(round(pct / 100.0 * (len(ordered) - 1)))
+    return ordered[max(0, min(rank, len(ordered) - 1))]
+
+
+def get_latency_report(
+    client_name: Optional[str] = None, since: Optional[str] = None
+) -> Dict[str, Dict[str, float]]:
+    """
+    Percentiles of per-turn latency spans.
+
+    Args:
+        client_name: Only this client's turns (None = every client)
+        since: Only turns at or after this ISO timestamp
+
+    Returns:
+        Span (stt_ms, llm_ms, ...) -> count, p50, p95 and p99 in milliseconds
+    """
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+
+        c.execute(
+            f"""
+            SELECT {", ".join(TURN_SPANS)}
+            FROM turn_latencies
+            WHERE timestamp >= ? AND (? IS NULL OR client_name = ?)
+        """,
+            (since or "", client_name, client_name),
+        )
+
+        rows = c.fetchall()
+        conn.close()
+
+        report = {}
+        for i, span in enumerate(TURN_SPANS):
+            values = sorted(row[i] for row in rows if row[i] is not None)
+            report[span] = {
+                "count": len(values),
+                "p50": _percentile(values, 50) if values else 0.0,
+                "p95": _percentile(values, 95) if values else 0.0,
+                "p99": _percentile(values, 99) if values else 0.0,
+            }
+        return report
+
+    except Exception as e:
+        logger.error(f"Error building latency report: {e}")
+        return {}
+
+
 # Initialize on import
 init_db()
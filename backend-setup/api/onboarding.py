@@ -8,6 +8,8 @@ from sqlalchemy import create_engine
 from backend_setup.db.models import User, OnboardingState, PayPalOrder
 from backend_setup.services.email_service import EmailService
 from backend_setup.services.analytics_service import AnalyticsService
+from backend_setup.agent.router import ClientRouter
+from backend_setup.config.settings import settings
 import os
 import uuid
 from datetime import datetime
@@ -234,6 +236,12 @@ def update_caller_responses(customer_id):
         onboarding.updated_at = datetime.utcnow()
         session.commit()
         
+        # The call agent reads templates from clients.json, not the DB
+        ClientRouter(settings.clients_db_path).set_caller_responses(
+            [onboarding.business_phone, onboarding.forwarding_number],
+            onboarding.caller_responses,
+        )
+        
         # Log analytics event
         analytics_service.log_event(
             user_id=customer_id,
@@ -16,7 +16,33 @@ class Settings(BaseSettings):
 
     # Hugging Face Inference (Remote)
     huggingface_api_url: str = "https://your-hf-vps-ip:8000"  # Your HF VPS endpoint
+    huggingface_api_urls: str = ""  # Comma-separated endpoint pool (overrides the single URL)
     huggingface_api_key: str = ""  # If needed for auth
+    llm_http2: bool = True  # Needs httpx[http2]; falls back to HTTP/1.1
+    llm_max_connections: int = 32  # Pool limit per job process to the inference VPS
+    llm_max_keepalive_connections: int = 16
+    llm_max_concurrent_streams: int = 100  # Per HTTP/2 connection (server SETTINGS_MAX_CONCURRENT_STREAMS)
+    llm_keepalive_expiry: float = 60.0  # Seconds an idle connection stays open
+    llm_connect_timeout: float = 5.0
+    llm_read_timeout: float = 30.0
+    llm_prewarm_connections: int = 2  # Opened as each call's job process starts (HTTP/1.1)
+    llm_stream_schema: Literal["auto", "tgwui", "tgi", "openai"] = "auto"  # Token stream payload format
+    llm_ewma_alpha: float = 0.3  # Weight of the newest first-token sample per endpoint
+    llm_hedge_enabled: bool = True  # Duplicate requests that pass the p95 first-token deadline
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_min_ms: float = 150.0
+    llm_breaker_failure_threshold: int = 3  # Consecutive failures that open the circuit
+    llm_breaker_recovery_seconds: float = 30.0  # Open time before a half-open probe
+    llm_fallback_model_path: str = ""  # Local GGUF model for outages (needs llama-cpp-python)
+    llm_fallback_threads: int = 4
+    llm_fallback_max_tokens: int = 96
+    llm_fallback_port: int = 8095  # Where the worker's main process serves the fallback to its job processes
+    llm_fallback_url: str = ""  # Fallback sidecar to use instead (python -m services.llm.fallback_server)
+    llm_max_concurrency: int = 16  # LLM requests in flight per job process; the rest queue by priority
+    llm_tenant_max_concurrency: int = 4  # Slots one client may hold at once
+    llm_max_queue: int = 64  # Queued requests before new turns are shed (background at half)
+    llm_queue_timeout_ms: float = 2000.0  # Longest a non-emergency turn waits for a slot
+    llm_stop_path: str = ""  # e.g. /api/v1/stop-stream; only for servers running one generation at a time
 
     # STT (Cloud - cheap and fast)
     deepgram_api_key: str
@@ -25,9 +51,51 @@ class Settings(BaseSettings):
     # TTS (Cloud - ultra-low latency)
     cartesia_api_key: str
     tts_provider: Literal["cartesia"] = "cartesia"
+    tts_voice: str = "sonic-english"
+    phrase_cache_enabled: bool = True  # Replay fixed phrases from pre-synthesized audio
+    phrase_cache_dir: str = "./data/phrase_audio"
+
+    # Worker metrics export
+    metrics_log_interval_seconds: float = 60.0  # Structured "📊 metrics" log line per job process (0 = off)
+
+    # Call tracing (Chrome Trace Event JSON per sampled call)
+    trace_sample_rate: float = 0.0  # Fraction of calls traced; e.g. 0.01 in production
+    trace_dir: str = "./data/traces"
+
+    # Worker load (LiveKit dispatch); a worker reports full when any signal reaches its limit
+    worker_max_calls: int = 20  # Size from scripts/load_test_calls.py capacity (0 = no limit)
+    worker_max_loop_lag_ms: float = 50.0  # Worst event-loop lag over the last 5s
+    worker_max_cpu_percent: float = 80.0  # Host CPU use
+    worker_load_threshold: float = 1.0  # New calls are refused at this load (0-1)
+    worker_drain_timeout_seconds: int = 1800  # SIGTERM: longest wait for active calls to finish
+    worker_load_dir: str = "./data/worker_load"  # Job processes report loop lag here
 
     # Agent Configuration
     agent_name: str = "AI Receptionist"
+    semantic_model_name: str = "all-MiniLM-L6-v2"  # Intent embedding model
+    semantic_backend: Literal["torch", "int8", "onnx"] = "torch"  # CPU encode backend
+    semantic_onnx_file: str = ""  # e.g. onnx/model_qint8_avx2.onnx
+    semantic_max_seq_length: int = 0  # Truncate utterances (0 = model default)
+    embedding_cache_mb: float = 16.0  # Utterance embedding LRU per job process (0 = off)
+    interim_intent_enabled: bool = True  # Fire emergency fast path on interim STT
+    speculative_enabled: bool = False  # Start LLM on stable interim transcripts
+    speculative_stable_ms: float = 300.0  # Per-profession override in profession JSON
+    scoring_batch_window_ms: float = 3.0  # Coalesce concurrent encodes (interim and final transcripts)
+    scoring_max_batch_size: int = 32
+    reply_max_sentences: int = 3  # Cut LLM replies off; profession JSON "max_sentences" overrides
+    segment_max_wait_ms: float = 400.0  # Flush reply text to TTS if no sentence closes
+    filler_enabled: bool = True  # Mask a slow first LLM token with cached filler audio
+    filler_deadline_ms: float = 800.0  # Per-profession override in profession JSON
+    context_max_tokens: int = 1536  # Prompt budget per turn; 0 sends the latest utterance only
+    context_recent_turns: int = 6  # Turns kept verbatim; older ones fold into a summary
+    context_summary_max_tokens: int = 160
+    context_tokenizer: str = ""  # HF tokenizer id for exact counts (needs transformers); "" estimates
+    response_cache_enabled: bool = True  # Reuse approved FAQ answers; intents per profession JSON
+    response_cache_threshold: float = 0.92
+    response_cache_ttl_seconds: float = 86400.0
+    response_cache_max_entries: int = 200  # Per client
+    response_cache_dir: str = "./data/response_cache"  # Answers outlive the call's job process here
+    templates_enabled: bool = True  # Answer matching turns from the client's caller_responses
 
     # Multi-tenant
     clients_db_path: str = "./data/clients.json"
@@ -2,12 +2,20 @@
 Main entrypoint for LiveKit voice agent.
 Handles incoming calls and routes to correct client.
 """
+import asyncio
 import logging
+import os
 import sys
-from livekit.agents import AutoSubscribe, JobContext, WorkerOptions, cli
+from livekit.agents import (
+    AutoSubscribe, JobContext, JobExecutorType, JobProcess, JobRequest, Worker, WorkerOptions, cli,
+)
 
 from agent.base_agent import AIReceptionistAgent
+from agent.prewarm import get_worker_resources, prewarm
+from agent.worker_load import LOAD_DIR_ENV, get_worker_load
 from config.settings import settings
+from services.llm.fallback_server import fallback_model, serve_in_background
+from services.metrics import MetricsReporter
 
 # Configure logging
 logging.basicConfig(
@@ -17,6 +25,76 @@ logging.basicConfig(
 logger = logging.getLogger("entrypoint")
 
 
+def get_agent(proc: JobProcess) -> AIReceptionistAgent:
+    """
+    Get the job process's agent, creating it for the process's call.
+
+    LiveKit gives each job process a single call, so the agent and
+    everything it holds in memory serve that call only.
+
+    Args:
+        proc: LiveKit job process
+
+    Returns:
+        Agent of this process
+    """
+    agent = proc.userdata.get("agent")
+    if agent is None:
+        agent = proc.userdata["agent"] = AIReceptionistAgent(
+            resources=get_worker_resources(proc)
+        )
+        # Open inference connections on the job event loop, alongside this call
+        proc.userdata["llm_warmup"] = asyncio.ensure_future(agent.llm_provider.warm_up())
+        # This is a job process: hand loop lag to the main process's load_fnc
+        get_worker_load().publish(os.environ.get(LOAD_DIR_ENV))
+        # Export latency, batching, pool, breaker and queue metrics as log lines
+        reporter = proc.userdata["metrics_reporter"] = MetricsReporter(settings.metrics_log_interval_seconds)
+        reporter.add_source("scoring", agent.engine.scoring.get_stats)
+        reporter.add_source("llm_tenants", agent.llm_provider.scheduler.get_stats)
+        reporter.start()
+    return agent
+
+
+def report_load(worker: Worker) -> float:
+    """
+    LiveKit load function: how busy this worker is, from 0.0 to 1.0.
+
+    Runs in the main worker process; job processes' loop lag arrives
+    through their load reports.
+
+    Args:
+        worker: Running LiveKit worker
+
+    Returns:
+        Worker load; LiveKit stops dispatching at settings.worker_load_threshold
+    """
+    load = get_worker_load()
+    if worker.draining:
+        load.drain()
+    return load.load(active_calls=len(worker.active_jobs))
+
+
+async def admit_call(req: JobRequest) -> None:
+    """
+    Accept a dispatched call, or hand it back if the worker is full.
+
+    Load is reported to LiveKit periodically, so a burst of calls can
+    arrive between reports; rejected calls are dispatched to another worker.
+
+    Args:
+        req: LiveKit job request
+    """
+    load = get_worker_load()
+    if not load.accepting():
+        logger.warning(
+            f"🚦 Rejecting call for room {req.room.name}: worker "
+            f"{'draining' if load.draining else 'full'} ({load.signals()})"
+        )
+        await req.reject()
+        return
+    await req.accept()
+
+
 async def entrypoint(ctx: JobContext):
     """
     Main entrypoint called by LiveKit when a new call comes in.
@@ -30,8 +108,10 @@ async def entrypoint(ctx: JobContext):
 
     logger.info(f"🔵 New call received - Room: {ctx.room.name}, From: {incoming_number}")
 
-    # Initialize and run agent
-    agent = AIReceptionistAgent()
+    # Run the call on this job process's agent; state is kept per call session
+    agent = get_agent(ctx.proc)
+    load = get_worker_load()
+    load.call_started()
 
     try:
         await agent.handle_call(ctx, incoming_number)
@@ -39,6 +119,8 @@ async def entrypoint(ctx: JobContext):
     except Exception as e:
         logger.error(f"❌ Error handling call: {e}", exc_info=True)
         raise
+    finally:
+        load.call_finished()
 
 
 def main():
@@ -48,11 +130,32 @@ def main():
     logger.info(f"🤖 LLM: Hugging Face ({settings.huggingface_api_url})")
     logger.info(f"🎤 STT: Deepgram")
     logger.info(f"🔊 TTS: Cartesia")
+    logger.info(
+        f"🚦 Full at {settings.worker_max_calls} calls, {settings.worker_max_loop_lag_ms:.0f}ms loop lag "
+        f"or {settings.worker_max_cpu_percent:.0f}% CPU"
+    )
+
+    # Before any job process starts, so they inherit the report directory
+    get_worker_load().collect(settings.worker_load_dir)
+
+    if settings.llm_fallback_model_path and not settings.llm_fallback_url:
+        # One fallback model per host, not per job process; jobs stream from it over localhost
+        serve_in_background(fallback_model(), "127.0.0.1", settings.llm_fallback_port)
 
     # Run the worker
     cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            request_fnc=admit_call,
+            load_fnc=report_load,
+            load_threshold=settings.worker_load_threshold,
+            # SIGTERM drains: running calls finish, new ones go to other workers
+            drain_timeout=settings.worker_drain_timeout_seconds,
+            # Calls run in job processes; worker_load reports bridge their load to
+            # load_fnc/request_fnc here. Threads would share the scheduler and HTTP
+            # client across event loops, which they are not safe for.
+            job_executor_type=JobExecutorType.PROCESS,
             api_key=settings.livekit_api_key,
             api_secret=settings.livekit_api_secret,
             ws_url=settings.livekit_url,
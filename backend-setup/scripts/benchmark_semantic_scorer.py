@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark intent scoring: legacy sklearn cosine_similarity vs the
+pre-normalized float32 IntentSnapshot.
+Uses random 384-dim embeddings, so only the scoring step is measured.
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.logic.semantic_scorer import IntentSnapshot
+
+DIM = 384
+NUM_INTENTS = 5
+PHRASE_COUNTS = (10, 100, 1000)
+ITERATIONS = 2000
+BATCH_SIZE = 32
+
+
+def legacy_score(input_vec, intent_embeddings, intent_labels, threshold=0.75):
+    """Previous SemanticIntentScorer.score hot path (after encode)."""
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    sim_scores = cosine_similarity(input_vec, intent_embeddings)[0]
+    best_idx = np.argmax(sim_scores)
+    best_score = float(sim_scores[best_idx])
+    if best_score >= threshold:
+        return intent_labels[best_idx], best_score
+    return "None", best_score
+
+
+def time_per_call(fn, iterations=ITERATIONS) -> float:
+    """Mean microseconds per call."""
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    rng = np.random.default_rng(0)
+    try:
+        import sklearn  # noqa: F401
+        has_sklearn = True
+    except ImportError:
+        has_sklearn = False
+        print("⚠️  scikit-learn not installed; skipping legacy baseline")
+
+    print(f"\n📊 Intent scoring benchmark (dim={DIM}, {NUM_INTENTS} intents)\n")
+    print(f"{'phrases':>8} {'legacy us':>10} {'snapshot us':>12} {'speedup':>8} {'batch us/utt':>13}")
+
+    for count in PHRASE_COUNTS:
+        embeddings = rng.standard_normal((count, DIM)).astype(np.float32)
+        labels = [f"INTENT_{i % NUM_INTENTS}" for i in range(count)]
+        snapshot = IntentSnapshot(labels=tuple(labels), embeddings=embeddings)
+        query = rng.standard_normal((1, DIM)).astype(np.float32)
+        batch = rng.standard_normal((BATCH_SIZE, DIM)).astype(np.float32)
+
+        new_us = time_per_call(lambda: snapshot.score_vector(query))
+        batch_us = time_per_call(lambda: snapshot.score_vectors(batch), ITERATIONS // 10) / BATCH_SIZE
+
+        if has_sklearn:
+            legacy_us = time_per_call(lambda: legacy_score(query, embeddings, labels))
+            speedup = f"{legacy_us / new_us:.1f}x"
+            legacy = f"{legacy_us:.1f}"
+        else:
+            legacy, speedup = "-", "-"
+
+        print(f"{count:>8} {legacy:>10} {new_us:>12.1f} {speedup:>8} {batch_us:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
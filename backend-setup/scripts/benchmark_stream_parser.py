@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark LLM stream parsing: legacy string-split extraction vs the
+incremental TokenStreamParser, in tokens parsed per second.
+Streams are synthesized in each supported server schema.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.llm.stream_parser import TokenStreamParser
+
+NUM_TOKENS = 20000
+CHUNK_SIZE = 4096
+WORDS = ["Sure", ",", " we", " have", " a", ' "same-day"', " opening", " on", " Friday", " at", " 3", "."]
+
+
+def make_stream(schema: str) -> bytes:
+    """A recorded-style SSE body of NUM_TOKENS events."""
+    events = []
+    for i in range(NUM_TOKENS):
+        text = WORDS[i % len(WORDS)]
+        if schema == "tgwui":
+            payload = {"event": "text_stream", "message_num": i, "text": text}
+        elif schema == "tgi":
+            payload = {"index": i, "token": {"id": i, "text": text, "logprob": -0.1, "special": False},
+                       "generated_text": None, "details": None}
+        else:
+            payload = {"id": "cmpl-1", "object": "chat.completion.chunk",
+                       "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]}
+        events.append(f"data: {json.dumps(payload, separators=(',', ':'))}\n\n")
+    events.append("data: [DONE]\n\n")
+    return "".join(events).encode("utf-8")
+
+
+def legacy_parse(body: bytes):
+    """Previous HuggingFaceLLMProvider.stream_response extraction."""
+    tokens = []
+    for line in body.decode("utf-8").splitlines():
+        if line.startswith("data:"):
+            try:
+                data = line[5:].strip()
+                if data:
+                    tokens.append(data.split('"text":"')[1].split('"')[0])
+            except (IndexError, ValueError):
+                continue
+    return tokens
+
+
+def new_parse(body: bytes):
+    parser = TokenStreamParser()
+    tokens = []
+    for offset in range(0, len(body), CHUNK_SIZE):
+        tokens.extend(parser.feed(body[offset:offset + CHUNK_SIZE]))
+    tokens.extend(parser.flush())
+    return tokens
+
+
+def tokens_per_second(fn, body, repeats=5) -> float:
+    fn(body)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(body)
+    return NUM_TOKENS * repeats / (time.perf_counter() - start)
+
+
+def main():
+    print(f"\n📊 Stream parser benchmark ({NUM_TOKENS} tokens, {CHUNK_SIZE}-byte chunks)\n")
+    print(f"{'schema':>8} {'legacy tok/s':>13} {'parser tok/s':>13} {'legacy correct':>15}")
+    for schema in ("tgwui", "tgi", "openai"):
+        body = make_stream(schema)
+        expected = new_parse(body)
+        legacy_ok = legacy_parse(body) == expected
+        legacy = tokens_per_second(legacy_parse, body)
+        new = tokens_per_second(new_parse, body)
+        print(f"{schema:>8} {legacy:>13,.0f} {new:>13,.0f} {str(legacy_ok):>15}")
+
+
+if __name__ == "__main__":
+    main()
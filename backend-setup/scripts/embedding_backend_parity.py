@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Encode speed and accuracy parity of the semantic scorer's CPU backends.
+Compares int8 / ONNX backends against the full-precision torch reference
+on the profession intent phrases in agent/professions/.
+
+Usage:
+    python scripts/embedding_backend_parity.py [--onnx-file onnx/model_qint8_avx2.onnx] [--max-seq-length 32]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent.engine import build_profession_intents
+from services.logic.embedding_backends import BACKENDS, load_backend_model
+from services.logic.semantic_scorer import DEFAULT_MODEL_NAME, IntentSnapshot, l2_normalize
+
+PROFESSIONS_DIR = Path(__file__).parent.parent / "agent" / "professions"
+
+# Typical caller turns, scored against every profession's intents
+PROBE_UTTERANCES = [
+    "yes",
+    "I'm in a lot of pain",
+    "my tooth is bleeding and it won't stop",
+    "what are your hours",
+    "do you take my insurance",
+    "I'd like to book a cleaning next week",
+    "it's an emergency, my crown broke",
+    "can I reschedule my appointment",
+    "how much does a filling cost",
+    "I'm a new patient",
+]
+ENCODE_REPEATS = 50
+
+
+def load_profession_phrases():
+    """Collect (label, phrase) pairs and probe texts from every profession."""
+    labels, phrases, probes = [], [], list(PROBE_UTTERANCES)
+    for path in sorted(PROFESSIONS_DIR.glob("*.json")):
+        prof_config = json.loads(path.read_text())
+        for label, intent_phrases in build_profession_intents(prof_config).items():
+            labels.extend([label] * len(intent_phrases))
+            phrases.extend(intent_phrases)
+        probes.extend(prof_config.get("questions", []))
+    return labels, phrases, probes
+
+
+def time_single_encodes(model, texts) -> float:
+    """Mean milliseconds to encode one utterance at a time."""
+    model.encode(texts[:1])  # warm up
+    start = time.perf_counter()
+    for _ in range(ENCODE_REPEATS):
+        for text in texts:
+            model.encode([text])
+    return (time.perf_counter() - start) / (ENCODE_REPEATS * len(texts)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--onnx-file", default="")
+    parser.add_argument("--max-seq-length", type=int, default=0)
+    parser.add_argument("--threshold", type=float, default=0.75)
+    args = parser.parse_args()
+
+    labels, phrases, probes = load_profession_phrases()
+    print(f"\n📊 Backend parity: {args.model}")
+    print(f"   {len(phrases)} intent phrases, {len(probes)} probe utterances\n")
+
+    results = {}
+    for backend in BACKENDS:
+        try:
+            model = load_backend_model(args.model, backend, args.max_seq_length, args.onnx_file)
+        except Exception as e:
+            print(f"⚠️  {backend}: failed to load ({e})")
+            continue
+
+        snapshot = IntentSnapshot(
+            labels=tuple(labels), embeddings=np.asarray(model.encode(phrases))
+        )
+        probe_vecs = np.asarray(model.encode(probes), dtype=np.float32)
+        results[backend] = {
+            "ms_per_utterance": time_single_encodes(model, probes),
+            "phrase_vecs": l2_normalize(model.encode(phrases)),
+            "probe_vecs": l2_normalize(probe_vecs),
+            "predictions": snapshot.score_vectors(probe_vecs, args.threshold),
+        }
+
+    reference = results.get("torch")
+    if reference is None:
+        print("❌ torch reference backend unavailable")
+        return
+
+    print(f"{'backend':>8} {'ms/utt':>8} {'speedup':>8} {'cos mean':>9} {'cos min':>8} {'label agree':>12} {'max |dscore|':>13}")
+    for backend, result in results.items():
+        cos = np.concatenate([
+            np.sum(result["phrase_vecs"] * reference["phrase_vecs"], axis=1),
+            np.sum(result["probe_vecs"] * reference["probe_vecs"], axis=1),
+        ])
+        agree = sum(
+            label == ref_label
+            for (label, _), (ref_label, _) in zip(result["predictions"], reference["predictions"])
+        )
+        score_delta = max(
+            abs(score - ref_score)
+            for (_, score), (_, ref_score) in zip(result["predictions"], reference["predictions"])
+        )
+        speedup = reference["ms_per_utterance"] / result["ms_per_utterance"]
+        print(
+            f"{backend:>8} {result['ms_per_utterance']:>8.2f} {speedup:>7.1f}x "
+            f"{cos.mean():>9.4f} {cos.min():>8.4f} {agree:>6}/{len(probes):<5} {score_delta:>13.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
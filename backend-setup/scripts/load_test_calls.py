@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Synthetic call load test for one worker host.
+Runs scripted callers through the per-call core (engine sessions, scoring,
+LLM provider, reply segmentation) at rising concurrency and reports how
+many simultaneous calls fit within the turn-latency budget.
+
+Like LiveKit's process executor, every call runs in its own process,
+prewarmed (engine, embedding model, warm LLM connections) before the call
+starts; CPU is the host's share and memory is per call process.
+
+The LLM is a FakeInferenceEndpoint served over HTTP from a separate
+process, so its cost is not charged to the worker. STT (Deepgram) is
+simulated in-process as interim transcripts at speaking pace plus a final
+transcript delay; TTS (Cartesia) is FakeTTS with a sampled synthesis
+delay, and the caller then listens for the length of the reply.
+Latencies are MEDIAN:P95 milliseconds, drawn from a log-normal.
+
+Usage:
+    python scripts/load_test_calls.py --levels 10,25,50,100
+    python scripts/load_test_calls.py --llm-ttft 500:1500 --stt 200:500 --tts 150:400 --turns 6
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Credentials the per-call core never uses
+for name in ("LIVEKIT_API_KEY", "LIVEKIT_API_SECRET", "DEEPGRAM_API_KEY", "CARTESIA_API_KEY", "FLASK_SECRET_KEY"):
+    os.environ.setdefault(name, "load-test")
+
+import numpy as np
+
+from agent.engine import engine_from_settings
+from agent.latency import END_OF_SPEECH, FINAL_TRANSCRIPT, FIRST_AUDIO, LAST_AUDIO
+from config.settings import settings
+from services.llm.fake_endpoint import FakeInferenceEndpoint
+from services.logic.semantic_scorer import SemanticIntentScorer, load_embedding_model
+from services.metrics import get_metrics, percentile
+from services.tts.fake_tts import FakeTTS
+
+# One caller's side of the conversation, used in order
+CALLER_SCRIPT = [
+    "Hi, I'd like to book a cleaning for next week",
+    "Do you have anything on Tuesday afternoon?",
+    "What are your hours on Saturday?",
+    "Do you take Delta Dental insurance?",
+    "Great, my name is Sam Lee and my number is 555 0100",
+    "Thanks, that's all I needed",
+]
+
+WORD_MS = 300  # Caller speaking pace
+SPEECH_MS_PER_CHAR = 60  # Agent speaking pace, for playout time
+PAUSE_MS = 500  # Caller pause after the agent finishes
+
+
+class Latency:
+    """Log-normal latency given its median and p95 in milliseconds."""
+
+    def __init__(self, median_ms: float, p95_ms: float, seed: Optional[int] = None):
+        self.mu = math.log(max(median_ms, 1e-3))
+        self.sigma = max(0.0, (math.log(max(p95_ms, median_ms, 1e-3)) - self.mu) / 1.645)
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "Latency":
+        median, _, p95 = spec.partition(":")
+        return cls(float(median), float(p95 or median), seed)
+
+    def sample(self) -> float:
+        """One latency in milliseconds."""
+        return self.rng.lognormvariate(self.mu, self.sigma)
+
+
+class HashEmbeddingModel:
+    """Bag-of-words hash embeddings: scoring without loading a model."""
+
+    dim = 384
+
+    def encode(self, texts, **kwargs):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[i, hash(word) % self.dim] += 1.0
+        return vectors
+
+
+def serve_fake_llm(conn, ttft_spec: str, token_ms: float) -> None:
+    """Child process: serve the fake inference endpoint until told to stop."""
+
+    async def serve():
+        endpoint = FakeInferenceEndpoint(
+            token_delay_ms=token_ms,
+            ttft_sampler=Latency.parse(ttft_spec, seed=1).sample,
+        )
+        async with endpoint:
+            conn.send(endpoint.url)
+            await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+
+    asyncio.run(serve())
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class LoopMonitor:
+    """Samples event-loop lag and RSS while a call runs."""
+
+    def __init__(self, interval_ms: float = 10.0):
+        self.interval = interval_ms / 1000.0
+        self.lags_ms: List[float] = []
+        self.peak_rss_mb = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags_ms.append(max(0.0, (time.perf_counter() - started - self.interval) * 1000))
+            self.peak_rss_mb = max(self.peak_rss_mb, rss_mb())
+
+
+async def simulate_call(engine, number: str, args, stt: Latency, tts_latency: Latency) -> List[Dict[str, Any]]:
+    """One scripted call; returns its per-turn latency records."""
+    session = await engine.start_session(number)
+    tts = FakeTTS(sample_rate=8000)
+    try:
+        for turn in range(args.turns):
+            utterance = CALLER_SCRIPT[turn % len(CALLER_SCRIPT)]
+            words = utterance.split()
+            for i in range(1, len(words) + 1):
+                await asyncio.sleep(WORD_MS / 1000.0)
+                session.spawn(session.on_interim_transcript(" ".join(words[:i])))
+            session.latency.mark(END_OF_SPEECH)
+            await asyncio.sleep(stt.sample() / 1000.0)
+            session.latency.mark(FINAL_TRANSCRIPT)
+            session.add_caller_message(utterance)
+
+            reply = []
+            async for segment in session.respond(utterance):
+                tts.delay = tts_latency.sample() / 1000.0
+                await tts.synthesize(segment)
+                if not reply:
+                    session.latency.mark(FIRST_AUDIO)
+                reply.append(segment)
+
+            text = " ".join(reply)
+            await asyncio.sleep(len(text) * SPEECH_MS_PER_CHAR / 1000.0 * args.playout_scale)
+            session.latency.mark(LAST_AUDIO)
+            session.add_agent_message(text)
+            session.reply_spoken()
+            await asyncio.sleep(PAUSE_MS / 1000.0 * args.playout_scale)
+    finally:
+        session.close()
+    return session.latency.turn_records()
+
+
+def embedding_model(args):
+    """The configured embedding model, or hash embeddings."""
+    if not args.real_embeddings:
+        return HashEmbeddingModel()
+    return load_embedding_model(
+        settings.semantic_model_name,
+        backend=settings.semantic_backend,
+        max_seq_length=settings.semantic_max_seq_length,
+        onnx_file=settings.semantic_onnx_file,
+    )
+
+
+def run_call_process(conn, index: int, llm_url: str, clients_db: str, args) -> None:
+    """Child process: prewarm like a job process, then run one call when told to."""
+    settings.huggingface_api_urls = llm_url
+
+    async def run():
+        from services.llm.huggingface_provider import HuggingFaceLLMProvider
+
+        llm_provider = HuggingFaceLLMProvider()
+        scorer = SemanticIntentScorer(settings.semantic_model_name, model=embedding_model(args))
+        engine = engine_from_settings(settings, llm_provider, scorer, clients_db_path=clients_db)
+        await llm_provider.warm_up()
+        loop = asyncio.get_running_loop()
+        conn.send("ready")
+        await loop.run_in_executor(None, conn.recv)
+
+        monitor = LoopMonitor()
+        cpu_before = cpu_seconds()
+        monitor.start()
+        try:
+            turns = await simulate_call(
+                engine,
+                f"+1555{index % args.tenants:07d}",
+                args,
+                Latency.parse(args.stt, seed=index),
+                Latency.parse(args.tts, seed=index + 1),
+            )
+            error = None
+        except Exception as e:
+            turns, error = [], repr(e)
+        await monitor.stop()
+        await llm_provider.client.aclose()
+
+        metrics = get_metrics()
+        conn.send({
+            "turns": turns,
+            "error": error,
+            "cpu": cpu_seconds() - cpu_before,
+            "rss_mb": monitor.peak_rss_mb,
+            "lags_ms": monitor.lags_ms,
+            "llm_queue_p95_ms": metrics.histogram("llm.scheduler.wait_ms.normal")["p95"],
+            "llm_shed": metrics.counter("llm.scheduler.rejected.normal"),
+        })
+
+    asyncio.run(run())
+
+
+def receive(conn, proc) -> Any:
+    """Next message from a call process, or an error record if it died."""
+    try:
+        return conn.recv()
+    except EOFError:
+        proc.join(timeout=5)
+        return {"error": f"call process exited with code {proc.exitcode}"}
+
+
+def run_level(calls: int, llm_url: str, clients_db: str, args) -> Dict[str, Any]:
+    """Run `calls` simultaneous calls, one process each, and summarize the host's behaviour."""
+    ctx = multiprocessing.get_context("spawn")
+    jobs = []
+    for i in range(calls):
+        conn, child_conn = ctx.Pipe()
+        proc = ctx.Process(target=run_call_process, args=(child_conn, i, llm_url, clients_db, args), daemon=True)
+        proc.start()
+        jobs.append((proc, conn))
+
+    # LiveKit keeps prewarmed processes ready, so setup is not part of the call
+    ready = [receive(conn, proc) == "ready" for proc, conn in jobs]
+
+    wall_before = time.perf_counter()
+    for i, (proc, conn) in enumerate(jobs):
+        if ready[i]:
+            time.sleep(max(0.0, wall_before + args.ramp_seconds * i / calls - time.perf_counter()))
+            conn.send("start")
+    results = [receive(conn, proc) if ready[i] else {"error": "call process failed to start"}
+               for i, (proc, conn) in enumerate(jobs)]
+    wall = time.perf_counter() - wall_before
+    for proc, _ in jobs:
+        proc.join(timeout=5)
+
+    done = [r for r in results if isinstance(r, dict) and not r.get("error")]
+    errors = sorted({r["error"] for r in results if isinstance(r, dict) and r.get("error")})
+    turns = [t for r in done for t in r["turns"]]
+    response = [t["response_ms"] for t in turns if t["response_ms"] is not None]
+    llm = [t["llm_ms"] for t in turns if t["llm_ms"] is not None]
+    lags = [lag for r in done for lag in r["lags_ms"]]
+    cpu = sum(r["cpu"] for r in done)
+    return {
+        "calls": calls,
+        "failed": calls - len(done),
+        "errors": errors[:3],
+        "turns": len(turns),
+        "turn_p50_ms": percentile(response, 50),
+        "turn_p95_ms": percentile(response, 95),
+        "turn_p99_ms": percentile(response, 99),
+        "llm_p95_ms": percentile(llm, 95),
+        "loop_lag_p99_ms": percentile(lags, 99),
+        "loop_lag_max_ms": max(lags, default=0.0),
+        "cpu_ms_per_call": cpu / calls * 1000,
+        "cpu_percent": cpu / wall / (os.cpu_count() or 1) * 100,
+        "rss_mb_per_call": sum(r["rss_mb"] for r in done) / max(len(done), 1),
+        "llm_queue_p95_ms": max((r["llm_queue_p95_ms"] for r in done), default=0.0),
+        "llm_shed": sum(r["llm_shed"] for r in done),
+    }
+
+
+def write_clients(directory: str, tenants: int) -> str:
+    clients = {
+        f"load-tenant-{i}": {
+            "name": f"load-tenant-{i}",
+            "phone_numbers": [f"+1555{i:07d}"],
+            "profession": "dentist",
+        }
+        for i in range(tenants)
+    }
+    path = Path(directory) / "clients.json"
+    path.write_text(json.dumps(clients))
+    return str(path)
+
+
+def print_level(r: Dict[str, Any]) -> None:
+    print(
+        f"{r['calls']:>6} {r['failed']:>5} {r['turn_p50_ms']:>7.0f} {r['turn_p95_ms']:>7.0f} "
+        f"{r['turn_p99_ms']:>7.0f} {r['llm_p95_ms']:>7.0f} {r['loop_lag_p99_ms']:>8.1f} "
+        f"{r['cpu_ms_per_call']:>8.1f} {r['cpu_percent']:>5.0f}% {r['rss_mb_per_call']:>7.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--levels", default="5,10,25,50", help="concurrent calls per step")
+    parser.add_argument("--turns", type=int, default=4, help="caller turns per call")
+    parser.add_argument("--tenants", type=int, default=10, help="clients the calls are spread over")
+    parser.add_argument("--llm-ttft", default="350:900", help="LLM first-token latency MEDIAN:P95 ms")
+    parser.add_argument("--llm-token-ms", type=float, default=20.0, help="LLM delay between tokens")
+    parser.add_argument("--stt", default="150:400", help="end of speech to final transcript MEDIAN:P95 ms")
+    parser.add_argument("--tts", default="120:300", help="TTS first-audio latency MEDIAN:P95 ms")
+    parser.add_argument("--ramp-seconds", type=float, default=2.0, help="spread call starts over this long")
+    parser.add_argument("--playout-scale", type=float, default=1.0, help="scale agent playout and caller pauses")
+    parser.add_argument("--slo-ms", type=float, default=1500.0, help="p95 end of speech to first audio budget")
+    parser.add_argument("--max-lag-ms", type=float, default=50.0, help="p99 event-loop lag budget")
+    parser.add_argument("--real-embeddings", action="store_true", help="load the configured embedding model")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    server = multiprocessing.Process(
+        target=serve_fake_llm, args=(child_conn, args.llm_ttft, args.llm_token_ms), daemon=True
+    )
+    server.start()
+    llm_url = parent_conn.recv()
+
+    print(
+        f"\n📞 Call load test: {args.turns} turns/call, LLM ttft {args.llm_ttft} ms, "
+        f"STT {args.stt} ms, TTS {args.tts} ms, {'real' if args.real_embeddings else 'hash'} embeddings\n"
+    )
+    print(
+        f"{'calls':>6} {'fail':>5} {'p50':>7} {'p95':>7} {'p99':>7} {'llm p95':>7} "
+        f"{'lag p99':>8} {'cpu ms':>8} {'cpu':>6} {'MB/call':>7}"
+    )
+
+    results = []
+    capacity = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            clients_db = write_clients(tmp, args.tenants)
+            for calls in (int(level) for level in args.levels.split(",")):
+                result = run_level(calls, llm_url, clients_db, args)
+                results.append(result)
+                print_level(result)
+                for error in result["errors"]:
+                    print(f"       ⚠️  {error}")
+                within = (
+                    not result["failed"]
+                    and result["turn_p95_ms"] <= args.slo_ms
+                    and result["loop_lag_p99_ms"] <= args.max_lag_ms
+                )
+                if within:
+                    capacity = calls
+    finally:
+        parent_conn.send("stop")
+        server.join(timeout=5)
+
+    print(
+        f"\n✅ Capacity: {capacity} concurrent calls "
+        f"(p95 turn <= {args.slo_ms:.0f} ms, loop lag p99 <= {args.max_lag_ms:.0f} ms)"
+    )
+    if args.json:
+        Path(args.json).write_text(json.dumps({"capacity": capacity, "levels": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
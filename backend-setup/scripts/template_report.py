@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Report the share of caller turns answered from caller_responses templates
+(without the LLM), per client, from the analytics database.
+
+Usage:
+    python scripts/template_report.py [--since 2026-01-01]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analytics.db import get_template_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--since", help="only calls at or after this ISO date")
+    args = parser.parse_args()
+
+    rows = get_template_report(args.since)
+    if not rows:
+        print("No calls logged yet.")
+        return
+
+    print(f"\n📋 Template fast-path share{f' since {args.since}' if args.since else ''}\n")
+    print(f"{'client':<32} {'calls':>7} {'turns':>7} {'template':>9} {'share':>7}")
+    for row in rows:
+        print(
+            f"{row['client_name']:<32} {row['calls']:>7} {row['turns']:>7} "
+            f"{row['template_turns']:>9} {row['template_share']:>7.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
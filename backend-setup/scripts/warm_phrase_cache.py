@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Pre-synthesize the fixed phrases of every profession, and every client's
+caller_responses templates, at deploy time.
+Fills PHRASE_CACHE_DIR so the first call of each worker plays cached audio.
+
+Usage:
+    python scripts/warm_phrase_cache.py [--fake]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent.router import ClientRouter
+from agent.session import fixed_phrases
+from agent.templates import template_phrases
+from config.settings import settings
+from services.tts.phrase_cache import PhraseAudioCache
+
+PROFESSIONS_DIR = Path(__file__).parent.parent / "agent" / "professions"
+
+
+def load_phrases():
+    """Fixed phrases of every profession config and client."""
+    phrases = []
+    for path in sorted(PROFESSIONS_DIR.glob("*.json")):
+        phrases.extend(fixed_phrases(json.loads(path.read_text())))
+    for client_config in ClientRouter(settings.clients_db_path).clients.values():
+        phrases.extend(template_phrases(client_config.get("caller_responses")))
+    return phrases
+
+
+def create_synthesizer(fake: bool):
+    """Cartesia through its LiveKit plugin, or the offline fake TTS."""
+    if fake:
+        from services.tts.fake_tts import FakeTTS
+
+        return FakeTTS(voice_id=settings.tts_voice)
+
+    from livekit.plugins import cartesia
+    from agent.phrase_player import LiveKitSynthesizer
+
+    tts = cartesia.TTS(api_key=settings.cartesia_api_key, voice=settings.tts_voice)
+    return LiveKitSynthesizer(tts, settings.tts_voice)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fake", action="store_true", help="use the offline fake TTS")
+    args = parser.parse_args()
+
+    cache = PhraseAudioCache(settings.phrase_cache_dir, create_synthesizer(args.fake))
+    phrases = load_phrases()
+    synthesized = await cache.warm(phrases)
+    print(f"✅ {len(set(phrases))} phrases cached in {cache.cache_dir} ({synthesized} synthesized)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,85 +1,93 @@
-"""
-Services module for the AI Receptionist SaaS.
-Exports all service classes for easy importing.
-"""
-
-from .auth_service import (
-    hash_password,
-    verify_password,
-    create_jwt_token,
-    verify_jwt_token,
-    register_user,
-    login_user,
-    get_user_by_id,
-    get_user_by_email,
-    create_oauth_user,
-)
-from .billing_service import (
-    BillingService,
-    InvoiceStatus,
-    InvoiceData,
-    BillingHistoryFilters,
-)
-from .usage_service import (
-    UsageService,
-    UsageMetrics,
-    PlanTier,
-    UsageThreshold,
-    PlanLimits,
-)
-from .subscription_service import (
-    SubscriptionService,
-    SubscriptionStatus,
-    SubscriptionData,
-)
-from .cache import get_cache, SubscriptionCache
-from .payment_service import (
-    PaymentService,
-    PaymentMethodType,
-    PaymentMethodData,
-    PaymentUpdateResult,
-)
-from .plan_service import (
-    PlanService,
-    PlanTier as PlanTierEnum,
-    PlanChangeType,
-    PlanConfig,
-    PricingCalculation,
-    PlanChangeResult,
-)
-
-__all__ = [
-    "hash_password",
-    "verify_password",
-    "create_jwt_token",
-    "verify_jwt_token",
-    "register_user",
-    "login_user",
-    "get_user_by_id",
-    "get_user_by_email",
-    "create_oauth_user",
-    "BillingService",
-    "InvoiceStatus",
-    "InvoiceData",
-    "BillingHistoryFilters",
-    "UsageService",
-    "UsageMetrics",
-    "PlanTier",
-    "UsageThreshold",
-    "PlanLimits",
-    "SubscriptionService",
-    "SubscriptionStatus",
-    "SubscriptionData",
-    "get_cache",
-    "SubscriptionCache",
-    "PaymentService",
-    "PaymentMethodType",
-    "PaymentMethodData",
-    "PaymentUpdateResult",
-    "PlanService",
-    "PlanTierEnum",
-    "PlanChangeType",
-    "PlanConfig",
-    "PricingCalculation",
-    "PlanChangeResult",
-]
+"""
+Services module for the AI Receptionist SaaS.
+Exports all service classes for easy importing.
+
+Exports are imported on first access, so the call agent can import
+services.metrics, services.llm and friends without pulling in the
+auth/billing stack and its database models.
+"""
+import importlib
+
+# Exported name -> (submodule, name in submodule)
+_EXPORTS = {
+    "hash_password": ("auth_service", "hash_password"),
+    "verify_password": ("auth_service", "verify_password"),
+    "create_jwt_token": ("auth_service", "create_jwt_token"),
+    "verify_jwt_token": ("auth_service", "verify_jwt_token"),
+    "register_user": ("auth_service", "register_user"),
+    "login_user": ("auth_service", "login_user"),
+    "get_user_by_id": ("auth_service", "get_user_by_id"),
+    "get_user_by_email": ("auth_service", "get_user_by_email"),
+    "create_oauth_user": ("auth_service", "create_oauth_user"),
+    "BillingService": ("billing_service", "BillingService"),
+    "InvoiceStatus": ("billing_service", "InvoiceStatus"),
+    "InvoiceData": ("billing_service", "InvoiceData"),
+    "BillingHistoryFilters": ("billing_service", "BillingHistoryFilters"),
+    "UsageService": ("usage_service", "UsageService"),
+    "UsageMetrics": ("usage_service", "UsageMetrics"),
+    "PlanTier": ("usage_service", "PlanTier"),
+    "UsageThreshold": ("usage_service", "UsageThreshold"),
+    "PlanLimits": ("usage_service", "PlanLimits"),
+    "SubscriptionService": ("subscription_service", "SubscriptionService"),
+    "SubscriptionStatus": ("subscription_service", "SubscriptionStatus"),
+    "SubscriptionData": ("subscription_service", "SubscriptionData"),
+    "get_cache": ("cache", "get_cache"),
+    "SubscriptionCache": ("cache", "SubscriptionCache"),
+    "PaymentService": ("payment_service", "PaymentService"),
+    "PaymentMethodType": ("payment_service", "PaymentMethodType"),
+    "PaymentMethodData": ("payment_service", "PaymentMethodData"),
+    "PaymentUpdateResult": ("payment_service", "PaymentUpdateResult"),
+    "PlanService": ("plan_service", "PlanService"),
+    "PlanTierEnum": ("plan_service", "PlanTier"),
+    "PlanChangeType": ("plan_service", "PlanChangeType"),
+    "PlanConfig": ("plan_service", "PlanConfig"),
+    "PricingCalculation": ("plan_service", "PricingCalculation"),
+    "PlanChangeResult": ("plan_service", "PlanChangeResult"),
+}
+
+
+__all__ = [
+    "hash_password",
+    "verify_password",
+    "create_jwt_token",
+    "verify_jwt_token",
+    "register_user",
+    "login_user",
+    "get_user_by_id",
+    "get_user_by_email",
+    "create_oauth_user",
+    "BillingService",
+    "InvoiceStatus",
+    "InvoiceData",
+    "BillingHistoryFilters",
+    "UsageService",
+    "UsageMetrics",
+    "PlanTier",
+    "UsageThreshold",
+    "PlanLimits",
+    "SubscriptionService",
+    "SubscriptionStatus",
+    "SubscriptionData",
+    "get_cache",
+    "SubscriptionCache",
+    "PaymentService",
+    "PaymentMethodType",
+    "PaymentMethodData",
+    "PaymentUpdateResult",
+    "PlanService",
+    "PlanTierEnum",
+    "PlanChangeType",
+    "PlanConfig",
+    "PricingCalculation",
+    "PlanChangeResult",
+]
+
+
+def __getattr__(name):
+    try:
+        module_name, attr = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module_name}", __name__), attr)
+    globals()[name] = value
+    return value
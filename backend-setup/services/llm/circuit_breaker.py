@@ -0,0 +1,115 @@
+"""
+Circuit breaker for the remote LLM.
+Stops sending calls' requests to an inference backend that keeps failing,
+and probes it with single requests until it recovers.
+"""
+import logging
+import time
+from typing import Callable
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("llm-breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gauge values for llm.breaker.state
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class DegradedText(str):
+    """Reply text not produced by the primary LLM (local fallback or error message)."""
+
+    degraded = True
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failures.
+    Open -> half-open after recovery_timeout seconds, letting one probe
+    request through; the probe's outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        name: str = "llm",
+        failure_threshold: int = 3,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize breaker.
+
+        Args:
+            name: Metric name prefix (metrics go to <name>.breaker.*)
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds open before a probe is allowed
+            clock: Time source (injectable for tests)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._publish()
+
+    def allow_request(self) -> bool:
+        """
+        Whether a request may go to the backend now.
+
+        Every allowed request must be followed by record_success,
+        record_failure or record_abandoned.
+
+        Returns:
+            True to send the request, False to use the fallback
+        """
+        if self.state == OPEN and self.clock() - self._opened_at >= self.recovery_timeout:
+            self._transition(HALF_OPEN)
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            get_metrics().inc(f"{self.name}.breaker.probes")
+            return True
+
+        get_metrics().inc(f"{self.name}.breaker.rejected")
+        return False
+
+    def record_success(self) -> None:
+        """The backend answered."""
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        """The backend failed a request."""
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._opened_at = self.clock()
+            self._transition(OPEN)
+
+    def record_abandoned(self) -> None:
+        """The request was dropped before an outcome (e.g. caller hung up)."""
+        self._probe_in_flight = False
+
+    def _transition(self, state: str) -> None:
+        previous, self.state = self.state, state
+        if state == OPEN:
+            get_metrics().inc(f"{self.name}.breaker.opened")
+            logger.warning(f"🔌 {self.name} circuit OPEN after {self.consecutive_failures} failures")
+        else:
+            logger.info(f"{self.name} circuit {previous} -> {state}")
+        self._publish()
+
+    def _publish(self) -> None:
+        get_metrics().set_gauge(f"{self.name}.breaker.state", STATE_VALUES[self.state])
@@ -0,0 +1,147 @@
+"""
+Local fake inference endpoint.
+A minimal streaming HTTP server with injectable latency and failures, for
+exercising LLM routing, hedging and cancellation offline.
+"""
+import asyncio
+import json
+import logging
+from typing import Callable, List, Optional
+
+logger = logging.getLogger("fake-llm-endpoint")
+
+DEFAULT_REPLY = "Sure, we have an opening on Friday at 3. Would that work for you?"
+
+
+class FakeInferenceEndpoint:
+    """
+    Streams a canned reply as SSE (text-generation-webui schema) for any
+    POST, after ttft_ms, with token_delay_ms between tokens.
+
+    Latency and failure are plain attributes so tests can change them
+    between requests.
+    """
+
+    def __init__(
+        self,
+        ttft_ms: float = 0.0,
+        token_delay_ms: float = 0.0,
+        reply: str = DEFAULT_REPLY,
+        status: int = 200,
+        ttft_sampler: Optional[Callable[[], float]] = None,
+    ):
+        """
+        Initialize endpoint.
+
+        Args:
+            ttft_ms: Delay before the first token
+            token_delay_ms: Delay between subsequent tokens
+            reply: Text streamed back, one token per word
+            status: HTTP status to answer with (e.g. 503 to simulate an outage)
+            ttft_sampler: Draws each request's first-token delay in ms
+                (overrides ttft_ms, e.g. for load tests)
+        """
+        self.ttft_ms = ttft_ms
+        self.token_delay_ms = token_delay_ms
+        self.reply = reply
+        self.status = status
+        self.ttft_sampler = ttft_sampler
+        self.requests = 0
+        self.stop_requests = 0
+        self.tokens_sent = 0
+        self.disconnects = 0
+        self.prompts: List[str] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._stopped = asyncio.Event()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self) -> "FakeInferenceEndpoint":
+        """Listen on a free localhost port."""
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def close(self) -> None:
+        """Stop listening."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "FakeInferenceEndpoint":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, path = request_line.decode("latin-1").split()[:2]
+            content_length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    content_length = int(value.strip())
+            body = await reader.readexactly(content_length) if content_length else b""
+
+            if path.rsplit("/", 1)[-1].startswith("stop"):
+                self.stop_requests += 1
+                self._stopped.set()
+                await self._respond(writer, 200, b'{"results": "success"}', "application/json")
+            elif method == "POST":
+                await self._stream(writer, body)
+            else:
+                await self._respond(writer, 200, b"ok", "text/plain")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.disconnects += 1
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status: int, body: bytes, content_type: str) -> None:
+        writer.write(
+            f"HTTP/1.1 {status} FAKE\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    async def _stream(self, writer: asyncio.StreamWriter, body: bytes) -> None:
+        self.requests += 1
+        self._stopped.clear()
+        try:
+            self.prompts.append(json.loads(body).get("prompt", ""))
+        except ValueError:
+            self.prompts.append("")
+
+        if self.status != 200:
+            await asyncio.sleep(self.ttft_ms / 1000.0)
+            await self._respond(writer, self.status, b"unavailable", "text/plain")
+            return
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+        )
+        await writer.drain()
+
+        delay = self.ttft_sampler() if self.ttft_sampler is not None else self.ttft_ms
+        for i, word in enumerate(self.reply.split(" ")):
+            await asyncio.sleep(delay / 1000.0)
+            if self._stopped.is_set():
+                break
+            token = word if i == 0 else " " + word
+            event = {"event": "text_stream", "message_num": i, "text": token}
+            writer.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            await writer.drain()
+            self.tokens_sent += 1
+            delay = self.token_delay_ms
+
+        writer.write(b'data: {"event": "stream_end"}\n\n')
+        await writer.drain()
@@ -0,0 +1,305 @@
+"""
+Host-wide local fallback model.
+LiveKit runs every call in its own job process, so a LocalFallbackModel
+started per process would load the GGUF model once per call. Instead one
+model is loaded per host (by the worker's main process, or a sidecar run
+with `python -m services.llm.fallback_server`) and served over localhost;
+job processes stream from it through RemoteFallbackModel.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+
+from services.llm.http_client import SharedHTTPClient, get_http_client
+from services.llm.local_fallback import LocalFallbackModel
+from services.llm.stream_parser import StreamError, TokenStreamParser
+from services.metrics import get_metrics
+
+logger = logging.getLogger("llm-fallback")
+
+GENERATE_PATH = "/api/v1/generate"
+HEALTH_PATH = "/health"
+
+
+class FallbackServer:
+    """
+    Streams LocalFallbackModel replies as SSE (text-generation-webui schema).
+
+    POST /api/v1/generate takes {"prompt", "system_prompt", "context"};
+    GET /health answers 200 once the model is loaded, else 503. A client
+    that disconnects mid-reply cancels its generation in the model process.
+    """
+
+    def __init__(self, model: LocalFallbackModel, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize server (does not listen yet).
+
+        Args:
+            model: Fallback model handle, started by the caller
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+        """
+        self.model = model
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self) -> "FallbackServer":
+        """
+        Start listening.
+
+        Raises:
+            OSError: The port is taken (e.g. another worker on this host serves it)
+        """
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        return self
+
+    async def serve_forever(self) -> None:
+        """Serve until cancelled."""
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop listening."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, path = request_line.decode("latin-1").split()[:2]
+            content_length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    content_length = int(value.strip())
+            body = await reader.readexactly(content_length) if content_length else b""
+
+            if method == "POST" and path == GENERATE_PATH:
+                await self._stream(writer, body)
+            elif path == HEALTH_PATH:
+                ready = self.model.available
+                await self._respond(writer, 200 if ready else 503, b"ok" if ready else b"loading")
+            else:
+                await self._respond(writer, 404, b"not found")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, body: bytes) -> None:
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'ERROR'}\r\nContent-Type: text/plain\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    async def _stream(self, writer: asyncio.StreamWriter, body: bytes) -> None:
+        try:
+            request = json.loads(body)
+        except ValueError:
+            await self._respond(writer, 400, b"invalid JSON")
+            return
+        if not self.model.available:
+            await self._respond(writer, 503, b"loading")
+            return
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+        )
+        stream = self.model.stream_response(
+            request.get("prompt", ""), request.get("system_prompt", ""), request.get("context", "")
+        )
+        try:
+            i = 0
+            async for token in stream:
+                event = {"event": "text_stream", "message_num": i, "text": token}
+                writer.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                await writer.drain()
+                i += 1
+            writer.write(b'data: {"event": "stream_end"}\n\n')
+        except RuntimeError as e:
+            writer.write(f"data: {json.dumps({'error': str(e)})}\n\n".encode("utf-8"))
+        finally:
+            # On disconnect this cancels the generation in the model process
+            await stream.aclose()
+        await writer.drain()
+
+
+class RemoteFallbackModel:
+    """
+    Job-process handle on the host's fallback server (LocalFallbackModel interface).
+
+    A failed request marks the fallback unavailable for retry_seconds, so
+    a server that is down or still loading costs one localhost round trip
+    per retry window rather than one per turn.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        client: Optional[SharedHTTPClient] = None,
+        retry_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize handle.
+
+        Args:
+            url: Fallback server base URL
+            client: Pooled HTTP client (defaults to the worker's shared client)
+            retry_seconds: How long a failed server is skipped
+            clock: Monotonic time source
+        """
+        self.url = url.rstrip("/")
+        self.client = client or get_http_client()
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        """False for retry_seconds after the server could not be reached."""
+        return self._clock() >= self._down_until
+
+    async def stream_response(
+        self, prompt: str, system_prompt: str = "", context: str = ""
+    ) -> AsyncIterator[str]:
+        """
+        Stream a reply from the host's fallback model.
+
+        Args:
+            prompt: User message
+            system_prompt: System instructions
+            context: Earlier conversation
+
+        Yields:
+            Token text
+
+        Raises:
+            RuntimeError: The server is unavailable or generation failed
+        """
+        if not self.available:
+            raise RuntimeError("local fallback server unavailable")
+
+        metrics = get_metrics()
+        metrics.inc("llm.fallback.requests")
+        started = time.monotonic()
+        count = 0
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.url}{GENERATE_PATH}",
+                json={"prompt": prompt, "system_prompt": system_prompt, "context": context},
+            ) as response:
+                response.raise_for_status()
+                parser = TokenStreamParser(schema="tgwui")
+                async for chunk in response.aiter_bytes():
+                    for token in parser.feed(chunk):
+                        if count == 0:
+                            metrics.observe("llm.fallback.ttft_ms", (time.monotonic() - started) * 1000)
+                        count += 1
+                        yield token
+                    if parser.done:
+                        return
+        except httpx.HTTPError as e:
+            self._down_until = self._clock() + self.retry_seconds
+            raise RuntimeError(f"local fallback server unreachable: {e}") from e
+        except StreamError as e:
+            raise RuntimeError(f"local fallback failed: {e}") from e
+        finally:
+            metrics.inc("llm.fallback.tokens", count)
+
+
+async def serve(model: LocalFallbackModel, host: str, port: int) -> None:
+    """
+    Claim the port, then load the model and serve it until cancelled.
+
+    If the port is taken another worker on this host already serves the
+    fallback, and the model is not loaded a second time.
+
+    Args:
+        model: Fallback model handle (not started)
+        host: Interface to listen on
+        port: Port to listen on
+    """
+    server = FallbackServer(model, host, port)
+    try:
+        await server.start()
+    except OSError as e:
+        logger.warning(f"🧯 Fallback port {port} in use ({e}); using the server already running")
+        return
+    model.start()
+    logger.info(f"🧯 Serving local fallback model on {server.url}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+        model.close()
+
+
+def serve_in_background(model: LocalFallbackModel, host: str, port: int) -> threading.Thread:
+    """
+    Serve the fallback model from a daemon thread with its own event loop.
+
+    Used by the worker's main process, whose own loop belongs to LiveKit.
+
+    Args:
+        model: Fallback model handle (not started)
+        host: Interface to listen on
+        port: Port to listen on
+
+    Returns:
+        The serving thread
+    """
+    thread = threading.Thread(
+        target=asyncio.run, args=(serve(model, host, port),), name="llm-fallback-server", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def fallback_url() -> Optional[str]:
+    """Fallback server job processes use (LLM_FALLBACK_URL, else this host's), or None if disabled."""
+    from config.settings import settings
+
+    if settings.llm_fallback_url:
+        return settings.llm_fallback_url
+    if settings.llm_fallback_model_path:
+        return f"http://127.0.0.1:{settings.llm_fallback_port}"
+    return None
+
+
+def fallback_model() -> LocalFallbackModel:
+    """Fallback model handle built from settings (not started)."""
+    from config.settings import settings
+
+    return LocalFallbackModel(
+        settings.llm_fallback_model_path,
+        n_threads=settings.llm_fallback_threads,
+        max_tokens=settings.llm_fallback_max_tokens,
+    )
+
+
+if __name__ == "__main__":
+    # Sidecar: one fallback per host; point workers at it with LLM_FALLBACK_URL
+    from config.settings import settings
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    asyncio.run(serve(fallback_model(), "0.0.0.0", settings.llm_fallback_port))
@@ -0,0 +1,227 @@
+"""
+Process-wide pooled HTTP client for LLM inference endpoints.
+One keep-alive (HTTP/2 when available) connection pool per job process,
+opened as its call starts, so the call's turns reuse warm connections
+instead of paying TCP+TLS per request.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("llm-http")
+
+# First httpcore event once a request holds a connection: a new connection
+# starts connecting, or a pooled one starts sending
+_ACQUIRED_EVENTS = frozenset({
+    "connection.connect_tcp.started",
+    "http11.send_request_headers.started",
+    "http2.send_request_headers.started",
+})
+
+
+def http2_available() -> bool:
+    """True if the optional h2 package (httpx[http2]) is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class SharedHTTPClient:
+    """
+    Pooled httpx.AsyncClient shared by everything in the job process.
+
+    Tracks in-flight requests against the pool's capacity, the time each
+    request waits to acquire a connection, and the time spent opening new
+    connections (TCP connect + TLS handshake).
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        max_connections: int = 32,
+        max_keepalive_connections: int = 16,
+        keepalive_expiry: float = 60.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        max_concurrent_streams: int = 100,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            http2: Negotiate HTTP/2 (falls back to HTTP/1.1 without h2)
+            max_connections: Pool limit across all hosts
+            max_keepalive_connections: Idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept
+            connect_timeout: Seconds allowed to open a connection
+            read_timeout: Seconds allowed between response bytes
+            max_concurrent_streams: Requests one HTTP/2 connection carries at
+                once (the server's SETTINGS_MAX_CONCURRENT_STREAMS)
+        """
+        if http2 and not http2_available():
+            logger.warning("h2 not installed (pip install httpx[http2]); using HTTP/1.1")
+            http2 = False
+
+        self.http2 = http2
+        self.max_connections = max_connections
+        # HTTP/2 multiplexes requests, so a connection is not a request slot
+        self.capacity = max_connections * (max_concurrent_streams if http2 else 1)
+        self.in_flight = 0
+        self.client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        )
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """
+        Stream a request through the shared pool (see httpx.AsyncClient.stream).
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed to httpx
+
+        Yields:
+            Streaming response
+        """
+        kwargs["extensions"] = {**kwargs.get("extensions", {}), "trace": self._trace()}
+        self._acquire()
+        try:
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+        except httpx.PoolTimeout:
+            get_metrics().inc("llm.http.pool_timeouts")
+            raise
+        finally:
+            self._release()
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request through the shared pool (see httpx.AsyncClient.request).
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed to httpx
+
+        Returns:
+            Response with its body read
+        """
+        kwargs["extensions"] = {**kwargs.get("extensions", {}), "trace": self._trace()}
+        self._acquire()
+        try:
+            return await self.client.request(method, url, **kwargs)
+        except httpx.PoolTimeout:
+            get_metrics().inc("llm.http.pool_timeouts")
+            raise
+        finally:
+            self._release()
+
+    async def warm(self, url: str, connections: int = 1) -> int:
+        """
+        Open connections to an endpoint ahead of the first call.
+
+        Any HTTP response (even an error status) leaves a warm connection
+        in the pool. With HTTP/2 one connection is multiplexed, so a single
+        request is enough.
+
+        Args:
+            url: Any URL on the endpoint's host
+            connections: Connections to open (HTTP/1.1)
+
+        Returns:
+            Number of connections successfully opened
+        """
+        count = 1 if self.http2 else max(1, connections)
+        results = await asyncio.gather(
+            *(self.request("GET", url) for _ in range(count)), return_exceptions=True
+        )
+        opened = sum(not isinstance(result, Exception) for result in results)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Connection pre-warm to {url} failed: {result}")
+        logger.info(f"🔥 Pre-warmed {opened}/{count} connections to {url}")
+        return opened
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        await self.client.aclose()
+
+    def _acquire(self) -> None:
+        self.in_flight += 1
+        metrics = get_metrics()
+        metrics.set_gauge("llm.http.in_flight", self.in_flight)
+        metrics.set_gauge("llm.http.pool_saturation", self.in_flight / self.capacity)
+        if self.in_flight > self.capacity:
+            # No connection (or HTTP/2 stream) is free: this request queues in the pool
+            metrics.inc("llm.http.pool_waits")
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        metrics = get_metrics()
+        metrics.set_gauge("llm.http.in_flight", self.in_flight)
+        metrics.set_gauge("llm.http.pool_saturation", self.in_flight / self.capacity)
+
+    def _trace(self):
+        started: Dict[str, float] = {"request": time.perf_counter()}
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            # httpcore events: connection.connect_tcp.started/complete,
+            # connection.start_tls.started/complete, ...
+            if "request" in started and event_name in _ACQUIRED_EVENTS:
+                # First use of a connection: the pool handed one over
+                wait_ms = (time.perf_counter() - started.pop("request")) * 1000
+                get_metrics().observe("llm.http.pool_wait_ms", wait_ms)
+            if event_name in ("connection.connect_tcp.started", "connection.start_tls.started"):
+                started[event_name.rsplit(".", 1)[0]] = time.perf_counter()
+            elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                stage = event_name.rsplit(".", 1)[0]
+                elapsed_ms = (time.perf_counter() - started.pop(stage, time.perf_counter())) * 1000
+                metrics = get_metrics()
+                if stage == "connection.connect_tcp":
+                    metrics.inc("llm.http.connections_opened")
+                    metrics.observe("llm.http.connect_ms", elapsed_ms)
+                else:
+                    metrics.observe("llm.http.tls_ms", elapsed_ms)
+
+        return trace
+
+
+_client: Optional[SharedHTTPClient] = None
+
+
+def get_http_client() -> SharedHTTPClient:
+    """
+    Get the worker's shared HTTP client, creating it from settings on first use.
+
+    Returns:
+        Process-wide SharedHTTPClient
+    """
+    global _client
+    if _client is None:
+        from config.settings import settings
+
+        _client = SharedHTTPClient(
+            http2=settings.llm_http2,
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+            connect_timeout=settings.llm_connect_timeout,
+            read_timeout=settings.llm_read_timeout,
+            max_concurrent_streams=settings.llm_max_concurrent_streams,
+        )
+    return _client
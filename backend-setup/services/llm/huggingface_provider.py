@@ -2,10 +2,19 @@
 Hugging Face LLM provider.
 Calls your remote HF VPS for inference (Llama3, Mistral, etc).
 """
-import httpx
+import asyncio
 import logging
-from typing import AsyncIterator
+from typing import AsyncIterator, List, Optional, Set, Union
 from config.settings import settings
+from services.llm.circuit_breaker import CircuitBreaker, DegradedText
+from services.llm.http_client import SharedHTTPClient, get_http_client
+from services.llm.load_balancer import LLMLoadBalancer
+from services.llm.fallback_server import RemoteFallbackModel
+from services.llm.local_fallback import LocalFallbackModel
+from services.llm.prompt import format_prompt
+from services.llm.scheduler import BACKGROUND, NORMAL, LLMScheduler, SchedulerRejected
+from services.llm.stream_parser import TokenStreamParser
+from services.metrics import get_metrics
 
 logger = logging.getLogger("hf-llm")
 
@@ -13,15 +22,70 @@ logger = logging.getLogger("hf-llm")
 class HuggingFaceLLMProvider:
     """LLM provider that calls Hugging Face inference endpoint."""
 
-    def __init__(self):
-        """Initialize HF provider with remote endpoint."""
-        self.api_url = settings.huggingface_api_url
+    def __init__(
+        self,
+        client: Optional[SharedHTTPClient] = None,
+        fallback: Optional[Union[LocalFallbackModel, RemoteFallbackModel]] = None,
+        scheduler: Optional[LLMScheduler] = None,
+    ):
+        """
+        Initialize HF provider with remote endpoint.
+
+        Args:
+            client: Pooled HTTP client (defaults to the worker's shared client)
+            fallback: Local CPU model used while the circuit is open (in-process,
+                or the host's fallback server)
+            scheduler: Admission to the remote endpoints (defaults to one built from settings)
+        """
         self.api_key = settings.huggingface_api_key
-        self.client = httpx.AsyncClient(timeout=30.0)
-        logger.info(f"HF LLM Provider initialized: {self.api_url}")
+        self.client = client or get_http_client()
+        self.balancer = LLMLoadBalancer(
+            endpoint_urls(),
+            ewma_alpha=settings.llm_ewma_alpha,
+            hedge_enabled=settings.llm_hedge_enabled,
+            hedge_percentile=settings.llm_hedge_percentile,
+            hedge_min_ms=settings.llm_hedge_min_ms,
+        )
+        self.api_url = self.balancer.endpoints[0].url
+        self.breaker = CircuitBreaker(
+            "llm",
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            recovery_timeout=settings.llm_breaker_recovery_seconds,
+        )
+        self.fallback = fallback
+        self.scheduler = scheduler or LLMScheduler(
+            max_concurrency=settings.llm_max_concurrency,
+            per_tenant_limit=settings.llm_tenant_max_concurrency,
+            max_queue=settings.llm_max_queue,
+            queue_timeout_ms=settings.llm_queue_timeout_ms,
+        )
+        self._stop_tasks: Set[asyncio.Task] = set()
+        logger.info(f"HF LLM Provider initialized: {[e.url for e in self.balancer.endpoints]}")
+
+    def _headers(self) -> dict:
+        """Request headers (auth only when an API key is configured)."""
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    async def warm_up(self) -> int:
+        """
+        Open pooled connections to every inference endpoint before the first call.
+
+        Returns:
+            Number of connections opened
+        """
+        opened = await asyncio.gather(*(
+            self.client.warm(endpoint.url, connections=settings.llm_prewarm_connections)
+            for endpoint in self.balancer.endpoints
+        ))
+        return sum(opened)
 
     async def generate_response(
-        self, prompt: str, system_prompt: str = "", max_tokens: int = 256
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        max_tokens: int = 256,
+        tenant: str = "",
+        priority: str = BACKGROUND,
     ) -> str:
         """
         Generate response from Hugging Face inference.
@@ -30,31 +94,31 @@ class HuggingFaceLLMProvider:
             prompt: User message
             system_prompt: System instructions
             max_tokens: Max response length
+            tenant: Client the request is for
+            priority: Scheduler priority class (not on a live turn by default)
 
         Returns:
             Generated text response
         """
         try:
             # Build the full prompt with system instructions
-            full_prompt = f"{system_prompt}\n\nUser: {prompt}\n\nAssistant:"
+            full_prompt = format_prompt(prompt, system_prompt)
 
             # Call your HF VPS endpoint
             # Assumes you're running text-generation-webui or similar
-            response = await self.client.post(
-                f"{self.api_url}/api/v1/generate",
-                json={
-                    "prompt": full_prompt,
-                    "max_new_tokens": max_tokens,
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "repetition_penalty": 1.1,
-                },
-                headers={
-                    "Authorization": f"Bearer {self.api_key}"
-                    if self.api_key
-                    else None
-                },
-            )
+            async with self.scheduler.slot(tenant, priority):
+                response = await self.client.request(
+                    "POST",
+                    f"{self.balancer.pick().url}/api/v1/generate",
+                    json={
+                        "prompt": full_prompt,
+                        "max_new_tokens": max_tokens,
+                        "temperature": 0.7,
+                        "top_p": 0.9,
+                        "repetition_penalty": 1.1,
+                    },
+                    headers=self._headers(),
+                )
 
             if response.status_code == 200:
                 data = response.json()
@@ -70,46 +134,125 @@ class HuggingFaceLLMProvider:
             return "I encountered an error. Please try again."
 
     async def stream_response(
-        self, prompt: str, system_prompt: str = ""
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        context: str = "",
+        tenant: str = "",
+        priority: str = NORMAL,
     ) -> AsyncIterator[str]:
         """
         Stream response tokens from Hugging Face.
 
+        Requests shed by the scheduler are answered like an open circuit.
+
         Args:
             prompt: User message
             system_prompt: System instructions
+            context: Earlier conversation (rolling summary and recent turns)
+            tenant: Client the request is for
+            priority: Scheduler priority class (EMERGENCY, NORMAL, BACKGROUND)
 
         Yields:
             Text chunks as they're generated
         """
+        full_prompt = format_prompt(prompt, system_prompt, context)
+        if self.breaker.allow_request():
+            produced = False
+            outcome_recorded = False
+            try:
+                async with self.scheduler.slot(tenant, priority):
+                    async for token in self.balancer.stream(
+                        lambda endpoint: self._stream_from(endpoint.url, full_prompt)
+                    ):
+                        if not produced:
+                            produced = outcome_recorded = True
+                            self.breaker.record_success()
+                        yield token
+                if not outcome_recorded:
+                    outcome_recorded = True
+                    self.breaker.record_success()
+                return
+
+            except SchedulerRejected:
+                # Overloaded, not failing: the breaker keeps its state
+                pass
+            except Exception as e:
+                logger.error(f"HF Stream Error: {e}")
+                if not outcome_recorded:
+                    outcome_recorded = True
+                    self.breaker.record_failure()
+                if produced:
+                    # Mid-reply failure: what was said stands, a restart would repeat it
+                    return
+            finally:
+                if not outcome_recorded:
+                    self.breaker.record_abandoned()
+
+        if self.fallback is not None and self.fallback.available:
+            try:
+                async for token in self.fallback.stream_response(prompt, system_prompt, context):
+                    yield DegradedText(token)
+                return
+            except Exception as e:
+                logger.error(f"Local fallback error: {e}")
+
+        get_metrics().inc("llm.unanswered")
+        yield DegradedText("Error streaming response.")
+
+    async def _stream_from(self, api_url: str, full_prompt: str) -> AsyncIterator[str]:
+        """
+        Stream tokens from one endpoint, raising on any failure.
+
+        Closing the stream early (barge-in, hedge loser) drops the HTTP
+        request, and also asks the server to stop when llm_stop_path is set.
+        """
+        stream = self._generate(api_url, full_prompt)
         try:
-            full_prompt = f"{system_prompt}\n\nUser: {prompt}\n\nAssistant:"
-
-            async with self.client.stream(
-                "POST",
-                f"{self.api_url}/api/v1/generate",
-                json={
-                    "prompt": full_prompt,
-                    "max_new_tokens": 256,
-                    "temperature": 0.7,
-                    "stream": True,
-                },
-                headers={
-                    "Authorization": f"Bearer {self.api_key}"
-                    if self.api_key
-                    else None
-                },
-            ) as response:
-                async for line in response.aiter_lines():
-                    if line.startswith("data:"):
-                        try:
-                            data = line[5:].strip()
-                            if data:
-                                chunk = data.split('"text":"')[1].split('"')[0]
-                                yield chunk
-                        except (IndexError, ValueError):
-                            continue
+            async for token in stream:
+                yield token
+        except (asyncio.CancelledError, GeneratorExit):
+            get_metrics().inc("llm.stream.cancelled")
+            if settings.llm_stop_path:
+                task = asyncio.ensure_future(self._request_stop(api_url))
+                self._stop_tasks.add(task)
+                task.add_done_callback(self._stop_tasks.discard)
+            raise
+        finally:
+            await stream.aclose()
 
+    async def _request_stop(self, api_url: str) -> None:
+        """Tell the inference server to stop the abandoned generation."""
+        try:
+            await self.client.request("POST", f"{api_url}{settings.llm_stop_path}", headers=self._headers())
+            get_metrics().inc("llm.stream.stop_requests")
         except Exception as e:
-            logger.error(f"HF Stream Error: {e}")
-            yield "Error streaming response."
+            logger.debug(f"Stop request to {api_url} failed: {e}")
+
+    async def _generate(self, api_url: str, full_prompt: str) -> AsyncIterator[str]:
+        async with self.client.stream(
+            "POST",
+            f"{api_url}/api/v1/generate",
+            json={
+                "prompt": full_prompt,
+                "max_new_tokens": 256,
+                "temperature": 0.7,
+                "stream": True,
+            },
+            headers=self._headers(),
+        ) as response:
+            response.raise_for_status()
+            parser = TokenStreamParser(schema=settings.llm_stream_schema)
+            async for chunk in response.aiter_bytes():
+                for token in parser.feed(chunk):
+                    yield token
+                if parser.done:
+                    return
+            for token in parser.flush():
+                yield token
+
+
+def endpoint_urls() -> List[str]:
+    """Inference endpoint pool from settings (HUGGINGFACE_API_URLS, else the single URL)."""
+    urls = settings.huggingface_api_urls or settings.huggingface_api_url
+    return [url.strip() for url in urls.split(",") if url.strip()]
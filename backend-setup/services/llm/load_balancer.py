@@ -0,0 +1,268 @@
+"""
+Latency-aware load balancing across LLM inference endpoints.
+Routes each request to the endpoint with the best live time-to-first-token
+and load, and hedges requests that blow past the p95 first-token deadline.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from services.metrics import get_metrics, percentile
+
+logger = logging.getLogger("llm-balancer")
+
+StreamOpener = Callable[["LLMEndpoint"], AsyncIterator[str]]
+
+# Recent first-token samples used for the hedge deadline
+TTFT_WINDOW = 256
+MIN_HEDGE_SAMPLES = 20
+
+
+class NoHealthyEndpoint(Exception):
+    """Every endpoint failed the request."""
+
+
+class LLMEndpoint:
+    """One inference endpoint and its live latency/load estimate."""
+
+    def __init__(self, url: str, ewma_alpha: float = 0.3, initial_ttft_ms: float = 500.0):
+        """
+        Initialize endpoint.
+
+        Args:
+            url: Base URL of the inference server
+            ewma_alpha: Weight of the newest first-token sample
+            initial_ttft_ms: Estimate used until the first sample arrives
+        """
+        self.url = url.rstrip("/")
+        self.name = (urlparse(self.url).netloc or self.url).replace(".", "_").replace(":", "_")
+        self.ewma_alpha = ewma_alpha
+        self.ewma_ttft_ms = initial_ttft_ms
+        self.in_flight = 0
+        self.consecutive_failures = 0
+
+    def load_score(self) -> float:
+        """Expected wait for a new request here (lower is better)."""
+        # Back off exponentially from failing endpoints without excluding them,
+        # so a recovered endpoint is eventually retried
+        penalty = 2 ** min(self.consecutive_failures, 8)
+        return self.ewma_ttft_ms * (1 + self.in_flight) * penalty
+
+    def observe_ttft(self, ttft_ms: float) -> None:
+        """Fold a first-token latency sample into the EWMA."""
+        self.ewma_ttft_ms += self.ewma_alpha * (ttft_ms - self.ewma_ttft_ms)
+        self.consecutive_failures = 0
+        get_metrics().set_gauge(f"llm.endpoint.{self.name}.ewma_ttft_ms", self.ewma_ttft_ms)
+
+    def observe_cancelled(self, elapsed_ms: float) -> None:
+        """
+        Record an attempt cancelled before its first token (a hedge loser).
+
+        Kept apart from the EWMA: the endpoint never produced a token, so
+        this is neither a first-token latency nor a success.
+        """
+        metrics = get_metrics()
+        metrics.inc(f"llm.endpoint.{self.name}.cancelled")
+        metrics.observe(f"llm.endpoint.{self.name}.cancelled_ms", elapsed_ms)
+
+    def observe_failure(self) -> None:
+        """Record a request that failed before its first token."""
+        self.consecutive_failures += 1
+        get_metrics().inc(f"llm.endpoint.{self.name}.failures")
+
+    def _set_in_flight(self, delta: int) -> None:
+        self.in_flight += delta
+        get_metrics().set_gauge(f"llm.endpoint.{self.name}.in_flight", self.in_flight)
+
+
+class LLMLoadBalancer:
+    """
+    Routes LLM streams across a pool of endpoints.
+
+    Each request goes to the endpoint with the lowest EWMA first-token
+    latency scaled by its in-flight count. If no token has arrived by the
+    pool's p95 first-token latency, a hedged duplicate goes to the next
+    best endpoint; the first to produce a token wins and the other is
+    cancelled. Endpoints that fail before their first token are failed
+    over immediately.
+
+    Latency estimates live in the job process, so each call starts from
+    initial_ttft_ms and learns from its own requests.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        ewma_alpha: float = 0.3,
+        initial_ttft_ms: float = 500.0,
+        hedge_enabled: bool = True,
+        hedge_percentile: float = 95.0,
+        hedge_min_ms: float = 150.0,
+        hedge_default_ms: float = 1000.0,
+    ):
+        """
+        Initialize balancer.
+
+        Args:
+            urls: Endpoint base URLs
+            ewma_alpha: Weight of the newest first-token sample
+            initial_ttft_ms: Per-endpoint estimate before any sample
+            hedge_enabled: Send hedged duplicates for slow requests
+            hedge_percentile: First-token percentile used as the hedge deadline
+            hedge_min_ms: Floor of the hedge deadline
+            hedge_default_ms: Hedge deadline until enough samples exist
+        """
+        self.endpoints: List[LLMEndpoint] = [
+            LLMEndpoint(url, ewma_alpha, initial_ttft_ms) for url in urls if url.strip()
+        ]
+        if not self.endpoints:
+            raise ValueError("LLMLoadBalancer needs at least one endpoint URL")
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_ms = hedge_min_ms
+        self.hedge_default_ms = hedge_default_ms
+        self._ttft_samples: Deque[float] = deque(maxlen=TTFT_WINDOW)
+
+    def pick(self, exclude: Iterable[LLMEndpoint] = ()) -> Optional[LLMEndpoint]:
+        """
+        Best endpoint for a new request.
+
+        Args:
+            exclude: Endpoints already tried for this request
+
+        Returns:
+            Endpoint with the lowest load score, or None if all are excluded
+        """
+        excluded = set(map(id, exclude))
+        candidates = [e for e in self.endpoints if id(e) not in excluded]
+        if not candidates:
+            return None
+        return min(candidates, key=LLMEndpoint.load_score)
+
+    def hedge_delay_ms(self) -> float:
+        """Current hedge deadline: p95 of recent first-token latencies."""
+        if len(self._ttft_samples) < MIN_HEDGE_SAMPLES:
+            return self.hedge_default_ms
+        return max(self.hedge_min_ms, percentile(self._ttft_samples, self.hedge_percentile))
+
+    async def stream(self, open_stream: StreamOpener) -> AsyncIterator[str]:
+        """
+        Stream a request from the best endpoint(s).
+
+        Args:
+            open_stream: Opens the token stream for a request on one endpoint
+
+        Yields:
+            Token text from the winning endpoint
+
+        Raises:
+            NoHealthyEndpoint: Every endpoint failed before its first token
+        """
+        metrics = get_metrics()
+        attempts: Dict[asyncio.Future, Tuple[LLMEndpoint, AsyncIterator[str], float]] = {}
+        tried: List[LLMEndpoint] = []
+
+        def launch(endpoint: LLMEndpoint) -> None:
+            iterator = open_stream(endpoint).__aiter__()
+            endpoint._set_in_flight(1)
+            tried.append(endpoint)
+            first = asyncio.ensure_future(iterator.__anext__())
+            attempts[first] = (endpoint, iterator, time.monotonic())
+
+        launch(self.pick())
+        started = time.monotonic()
+        hedge_deadline = self.hedge_delay_ms() / 1000.0
+        hedged = False
+        winner: Optional[Tuple[LLMEndpoint, AsyncIterator[str]]] = None
+        first_token: Optional[str] = None
+        last_error: Optional[BaseException] = None
+
+        try:
+            while winner is None:
+                if not attempts:
+                    metrics.inc("llm.lb.exhausted")
+                    raise NoHealthyEndpoint(f"all {len(tried)} endpoints failed: {last_error}")
+
+                timeout = None
+                if self.hedge_enabled and not hedged and len(self.endpoints) > 1:
+                    timeout = max(0.0, started + hedge_deadline - time.monotonic())
+                done, _ = await asyncio.wait(
+                    attempts.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    hedged = True
+                    backup = self.pick(exclude=tried)
+                    if backup is not None:
+                        metrics.inc("llm.lb.hedged")
+                        logger.info(f"⏱️ No first token after {hedge_deadline * 1000:.0f}ms, hedging to {backup.url}")
+                        launch(backup)
+                    continue
+
+                for task in done:
+                    endpoint, iterator, launched = attempts.pop(task)
+                    if winner is not None:
+                        # Both produced a token in the same tick; keep the first
+                        attempts[task] = (endpoint, iterator, launched)
+                        continue
+                    try:
+                        first_token = task.result()
+                    except StopAsyncIteration:
+                        first_token = None
+                    except Exception as e:
+                        last_error = e
+                        endpoint._set_in_flight(-1)
+                        endpoint.observe_failure()
+                        metrics.inc("llm.lb.failovers")
+                        logger.warning(f"LLM endpoint {endpoint.url} failed: {e}")
+                        await _aclose(iterator)
+                        backup = self.pick(exclude=tried)
+                        if backup is not None:
+                            launch(backup)
+                        continue
+
+                    ttft_ms = (time.monotonic() - launched) * 1000
+                    endpoint.observe_ttft(ttft_ms)
+                    self._ttft_samples.append(ttft_ms)
+                    metrics.observe("llm.lb.ttft_ms", ttft_ms)
+                    winner = (endpoint, iterator)
+
+            if hedged:
+                metrics.inc("llm.lb.hedge_wins" if winner[0] is not tried[0] else "llm.lb.hedge_losses")
+            await self._cancel_attempts(attempts)
+
+            if first_token is None:
+                return
+            yield first_token
+            async for chunk in winner[1]:
+                yield chunk
+        finally:
+            await self._cancel_attempts(attempts)
+            if winner is not None:
+                winner[0]._set_in_flight(-1)
+                await _aclose(winner[1])
+
+    async def _cancel_attempts(self, attempts: Dict) -> None:
+        """Cancel losing (or abandoned) attempts."""
+        for task, (endpoint, iterator, launched) in list(attempts.items()):
+            del attempts[task]
+            task.cancel()
+            await asyncio.wait([task])
+            if not task.cancelled():
+                task.exception()  # retrieved; a late failure doesn't matter now
+            endpoint.observe_cancelled((time.monotonic() - launched) * 1000)
+            endpoint._set_in_flight(-1)
+            await _aclose(iterator)
+            get_metrics().inc("llm.lb.cancelled")
+
+
+async def _aclose(iterator: AsyncIterator[str]) -> None:
+    aclose = getattr(iterator, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception as e:
+            logger.debug(f"Error closing LLM stream: {e}")
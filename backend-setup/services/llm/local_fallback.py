@@ -0,0 +1,255 @@
+"""
+Local CPU fallback model.
+Runs a small quantized GGUF model (llama.cpp) in a background process so
+calls keep getting answers, at reduced quality, while the remote LLM is down.
+"""
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+from services.llm.prompt import format_prompt
+from services.metrics import get_metrics
+
+logger = logging.getLogger("llm-fallback")
+
+Generator = Callable[[str, int], Iterator[str]]
+
+# Stop sequences for the "User: ... Assistant:" prompt format
+STOP_SEQUENCES = ["\nUser:", "\n\n"]
+
+
+def load_llama(model_path: str, n_ctx: int, n_threads: int) -> Generator:
+    """
+    Load a GGUF model with llama-cpp-python (runs in the fallback process).
+
+    Args:
+        model_path: Path to the .gguf file
+        n_ctx: Context window
+        n_threads: CPU threads used for inference
+
+    Returns:
+        generate(prompt, max_tokens) yielding token text
+    """
+    from llama_cpp import Llama
+
+    llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads, verbose=False)
+
+    def generate(prompt: str, max_tokens: int) -> Iterator[str]:
+        for chunk in llm(prompt, max_tokens=max_tokens, stop=STOP_SEQUENCES, stream=True):
+            yield chunk["choices"][0]["text"]
+
+    return generate
+
+
+def _worker_main(factory: Callable[..., Generator], factory_args: Tuple, requests, responses) -> None:
+    """Fallback process: load the model, then serve generate requests one at a time."""
+    try:
+        generate = factory(*factory_args)
+    except Exception as e:
+        responses.put((None, "error", f"{type(e).__name__}: {e}"))
+        return
+    responses.put((None, "ready", None))
+
+    pending: deque = deque()
+    cancelled = set()
+
+    def handle(message) -> bool:
+        kind = message[0]
+        if kind == "stop":
+            return False
+        if kind == "cancel":
+            cancelled.add(message[1])
+        elif kind == "generate":
+            pending.append(message[1:])
+        return True
+
+    while True:
+        if not pending and not handle(requests.get()):
+            return
+        while pending:
+            request_id, prompt, max_tokens = pending.popleft()
+            if request_id in cancelled:
+                cancelled.discard(request_id)
+                continue
+            try:
+                for token in generate(prompt, max_tokens):
+                    # Pick up cancels (barge-in, hang-up) between tokens
+                    while True:
+                        try:
+                            if not handle(requests.get_nowait()):
+                                return
+                        except queue.Empty:
+                            break
+                    if request_id in cancelled:
+                        break
+                    responses.put((request_id, "token", token))
+                responses.put((request_id, "done", None))
+            except Exception as e:
+                responses.put((request_id, "error", f"{type(e).__name__}: {e}"))
+            cancelled.discard(request_id)
+
+
+class LocalFallbackModel:
+    """
+    Parent-side handle of the fallback process.
+
+    The model loads in the background at worker start; until it reports
+    ready (or if it fails to load) the fallback is unavailable.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        n_ctx: int = 2048,
+        n_threads: int = 4,
+        max_tokens: int = 96,
+        factory: Callable[..., Generator] = load_llama,
+        factory_args: Optional[Tuple] = None,
+        mp_context: str = "spawn",
+    ):
+        """
+        Initialize (does not start the process).
+
+        Args:
+            model_path: Path to the quantized .gguf model
+            n_ctx: Context window
+            n_threads: CPU threads for inference
+            max_tokens: Reply length cap (short replies keep CPU latency down)
+            factory: Builds generate(prompt, max_tokens) inside the process
+            factory_args: Arguments for factory (default: model_path, n_ctx, n_threads)
+            mp_context: multiprocessing start method
+        """
+        self.model_path = model_path
+        self.max_tokens = max_tokens
+        self._factory = factory
+        self._factory_args = factory_args if factory_args is not None else (model_path, n_ctx, n_threads)
+        self._ctx = multiprocessing.get_context(mp_context)
+        self._process = None
+        self._requests = None
+        self._responses = None
+        self._ready = threading.Event()
+        self._settled = threading.Event()  # loaded or failed to load
+        self.load_error: Optional[str] = None
+        self._streams: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = {}
+        self._ids = itertools.count()
+        self._started_at = 0.0
+
+    @property
+    def available(self) -> bool:
+        """True once the model has loaded and the process is alive."""
+        return self._ready.is_set() and self._process is not None and self._process.is_alive()
+
+    def start(self) -> None:
+        """Start the fallback process; the model loads in the background."""
+        self._requests = self._ctx.Queue()
+        self._responses = self._ctx.Queue()
+        self._started_at = time.monotonic()
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(self._factory, self._factory_args, self._requests, self._responses),
+            name="llm-fallback",
+            daemon=True,
+        )
+        self._process.start()
+        threading.Thread(target=self._read_responses, name="llm-fallback-reader", daemon=True).start()
+        logger.info(f"🧯 Loading local fallback model in background: {self.model_path}")
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the model is loaded (or failed to load)."""
+        self._settled.wait(timeout)
+        return self.available
+
+    def close(self) -> None:
+        """Stop the fallback process."""
+        if self._process is None:
+            return
+        self._requests.put(("stop",))
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._responses.put((None, "closed", None))
+        self._ready.clear()
+
+    async def stream_response(
+        self, prompt: str, system_prompt: str = "", context: str = ""
+    ) -> AsyncIterator[str]:
+        """
+        Stream a reply from the local model.
+
+        Args:
+            prompt: User message
+            system_prompt: System instructions
+            context: Earlier conversation
+
+        Yields:
+            Token text
+
+        Raises:
+            RuntimeError: The fallback is unavailable or generation failed
+        """
+        if not self.available:
+            raise RuntimeError(f"local fallback unavailable ({self.load_error or 'not loaded'})")
+
+        request_id = next(self._ids)
+        tokens: asyncio.Queue = asyncio.Queue()
+        self._streams[request_id] = (asyncio.get_running_loop(), tokens)
+        full_prompt = format_prompt(prompt, system_prompt, context)
+        self._requests.put(("generate", request_id, full_prompt, self.max_tokens))
+
+        metrics = get_metrics()
+        metrics.inc("llm.fallback.requests")
+        started = time.monotonic()
+        count = 0
+        finished = False
+        try:
+            while True:
+                kind, data = await tokens.get()
+                if kind == "token":
+                    if count == 0:
+                        metrics.observe("llm.fallback.ttft_ms", (time.monotonic() - started) * 1000)
+                    count += 1
+                    yield data
+                elif kind == "done":
+                    finished = True
+                    return
+                else:
+                    finished = True
+                    raise RuntimeError(f"local fallback failed: {data}")
+        finally:
+            metrics.inc("llm.fallback.tokens", count)
+            self._streams.pop(request_id, None)
+            if not finished:
+                self._requests.put(("cancel", request_id))
+
+    def _read_responses(self) -> None:
+        while True:
+            request_id, kind, data = self._responses.get()
+            if request_id is None:
+                if kind == "ready":
+                    get_metrics().set_gauge(
+                        "llm.fallback.load_seconds", time.monotonic() - self._started_at
+                    )
+                    logger.info("🧯 Local fallback model ready")
+                    self._ready.set()
+                    self._settled.set()
+                    continue
+                if kind == "error":
+                    self.load_error = data
+                    logger.error(f"Local fallback model failed to load: {data}")
+                self._settled.set()
+                return
+
+            stream = self._streams.get(request_id)
+            if stream is not None:
+                loop, tokens = stream
+                try:
+                    loop.call_soon_threadsafe(tokens.put_nowait, (kind, data))
+                except RuntimeError:
+                    # The call's event loop is gone
+                    self._streams.pop(request_id, None)
@@ -0,0 +1,79 @@
+"""
+Prompt formatting and token counting.
+Every LLM backend gets the same prompt layout, with the system prompt as
+a byte-stable prefix so server-side prefix/KV caches can reuse it.
+"""
+import logging
+import re
+from functools import lru_cache
+from typing import Callable, Optional
+
+logger = logging.getLogger("llm-prompt")
+
+# Word pieces for the fallback estimate: words, numbers, single punctuation
+_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def format_prompt(prompt: str, system_prompt: str = "", context: str = "") -> str:
+    """
+    Build the completion prompt for one turn.
+
+    Args:
+        prompt: Caller's latest utterance
+        system_prompt: System instructions (kept first and unchanged)
+        context: Earlier conversation (summary and recent turns)
+
+    Returns:
+        Full prompt ending in the assistant cue
+    """
+    history = f"{context}\n\n" if context else ""
+    return f"{system_prompt}\n\n{history}User: {prompt}\n\nAssistant:"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count (long words split into several tokens)."""
+    return sum(1 + len(piece) // 6 for piece in _PIECES.findall(text))
+
+
+class TokenCounter:
+    """
+    Memoized token counting for a job process's call.
+
+    Uses the model's Hugging Face tokenizer when one is configured and
+    transformers is installed, otherwise a fast estimate. Conversation
+    turns are re-counted on every turn, so counts are cached per string.
+    """
+
+    def __init__(self, tokenizer_name: str = "", cache_size: int = 4096):
+        """
+        Initialize counter.
+
+        Args:
+            tokenizer_name: Hugging Face tokenizer id ("" = estimate)
+            cache_size: Distinct strings whose counts are cached
+        """
+        self.tokenizer_name = tokenizer_name
+        encode = self._load(tokenizer_name)
+        self._count: Callable[[str], int] = lru_cache(maxsize=cache_size)(encode)
+
+    @staticmethod
+    def _load(tokenizer_name: str) -> Callable[[str], int]:
+        if not tokenizer_name:
+            return estimate_tokens
+        try:
+            from transformers import AutoTokenizer
+
+            tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+        except Exception as e:
+            logger.warning(f"Tokenizer {tokenizer_name} unavailable ({e}), estimating token counts")
+            return estimate_tokens
+        logger.info(f"Token counts from tokenizer: {tokenizer_name}")
+        return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+
+    def count(self, text: Optional[str]) -> int:
+        """Tokens in text."""
+        return self._count(text) if text else 0
+
+    def cache_info(self):
+        """Hit/miss statistics of the count cache."""
+        return self._count.cache_info()
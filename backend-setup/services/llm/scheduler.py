@@ -0,0 +1,233 @@
+"""
+Priority-aware admission to the remote LLM.
+Orders a process's LLM requests by priority class (emergency calls, then
+normal turns, then background work), shares slots fairly between tenants
+and sheds requests that would queue too long to be useful on a live call.
+
+Under LiveKit each job process runs one call, so there the classes order
+that call's own requests (a live turn ahead of background work); tenant
+limits only bind where one process runs several calls (tests, scripts).
+"""
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("llm-scheduler")
+
+# Priority classes, most urgent first
+EMERGENCY = "emergency"
+NORMAL = "normal"
+BACKGROUND = "background"
+PRIORITIES = (EMERGENCY, NORMAL, BACKGROUND)
+
+
+class SchedulerRejected(Exception):
+    """The request was shed by admission control."""
+
+
+class _Waiter:
+    """A request queued for a slot."""
+
+    def __init__(self, tenant: str, priority: str, seq: int):
+        self.tenant = tenant
+        self.priority = priority
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class LLMScheduler:
+    """
+    Bounded pool of LLM request slots shared by everything in a process.
+
+    A freed slot goes to the most urgent priority class with a runnable
+    waiter. Within a class, the tenant with the fewest requests in flight
+    goes first (oldest request on ties), and no tenant holds more than
+    per_tenant_limit slots, so one busy tenant cannot take the whole pool.
+    Emergency requests skip the tenant limit and are never shed.
+
+    Admission control: normal requests are rejected when max_queue
+    requests are already waiting, background requests at half of that,
+    and any non-emergency request that waits longer than queue_timeout_ms
+    is rejected rather than answered late.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        per_tenant_limit: int = 4,
+        max_queue: int = 64,
+        queue_timeout_ms: Optional[float] = 2000.0,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            max_concurrency: Requests sent to the inference backend at once
+            per_tenant_limit: Slots one tenant may hold at once
+            max_queue: Waiting requests before new normal requests are rejected
+            queue_timeout_ms: Longest a non-emergency request waits (None = no limit)
+        """
+        self.max_concurrency = max_concurrency
+        self.per_tenant_limit = per_tenant_limit
+        self.max_queue = max_queue
+        self.queue_timeout_ms = queue_timeout_ms
+        self.in_flight = 0
+        self._tenant_in_flight: Dict[str, int] = {}
+        # Priority -> tenant -> waiters in arrival order
+        self._queues: Dict[str, Dict[str, Deque[_Waiter]]] = {p: {} for p in PRIORITIES}
+        self._queued = 0
+        self._seq = itertools.count()
+        self._publish()
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting for a slot."""
+        return self._queued
+
+    @asynccontextmanager
+    async def slot(self, tenant: str, priority: str = NORMAL) -> AsyncIterator[None]:
+        """
+        Hold an LLM request slot for the duration of the block.
+
+        Args:
+            tenant: Client the request is for
+            priority: EMERGENCY, NORMAL or BACKGROUND
+
+        Raises:
+            SchedulerRejected: The request was shed before getting a slot
+        """
+        await self.acquire(tenant, priority)
+        try:
+            yield
+        finally:
+            self.release(tenant)
+
+    async def acquire(self, tenant: str, priority: str = NORMAL) -> None:
+        """
+        Wait for a slot. Every successful acquire must be paired with release().
+
+        Args:
+            tenant: Client the request is for
+            priority: EMERGENCY, NORMAL or BACKGROUND
+
+        Raises:
+            SchedulerRejected: The request was shed before getting a slot
+        """
+        limit = self.max_queue if priority == NORMAL else self.max_queue // 2
+        if priority != EMERGENCY and self._queued >= limit and not self._runnable(tenant, priority):
+            self._reject(tenant, priority, "queue full")
+
+        waiter = _Waiter(tenant, priority, next(self._seq))
+        self._queues[priority].setdefault(tenant, deque()).append(waiter)
+        self._queued += 1
+        self._dispatch()
+        self._publish()
+
+        timeout = None
+        if priority != EMERGENCY and self.queue_timeout_ms is not None:
+            timeout = self.queue_timeout_ms / 1000.0
+        try:
+            if not waiter.future.done():
+                await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            # Granted just as the deadline passed: keep the slot
+            if self._dequeue(waiter):
+                self._reject(tenant, priority, "queue timeout")
+        except asyncio.CancelledError:
+            if not self._dequeue(waiter):
+                self.release(tenant)
+            raise
+
+        wait_ms = (time.monotonic() - waiter.enqueued_at) * 1000
+        get_metrics().observe(f"llm.scheduler.wait_ms.{priority}", wait_ms)
+
+    def release(self, tenant: str) -> None:
+        """Return a slot and hand it to the next waiter."""
+        self.in_flight -= 1
+        remaining = self._tenant_in_flight.get(tenant, 1) - 1
+        if remaining > 0:
+            self._tenant_in_flight[tenant] = remaining
+        else:
+            self._tenant_in_flight.pop(tenant, None)
+        self._dispatch()
+        self._publish()
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get per-tenant scheduler state.
+
+        Returns:
+            Dictionary of tenant -> in_flight and queued requests
+        """
+        stats: Dict[str, Dict[str, int]] = {
+            tenant: {"in_flight": count, "queued": 0}
+            for tenant, count in self._tenant_in_flight.items()
+        }
+        for tenants in self._queues.values():
+            for tenant, waiters in tenants.items():
+                stats.setdefault(tenant, {"in_flight": 0, "queued": 0})["queued"] += len(waiters)
+        return stats
+
+    def _runnable(self, tenant: str, priority: str) -> bool:
+        if self.in_flight >= self.max_concurrency:
+            return False
+        return priority == EMERGENCY or self._tenant_in_flight.get(tenant, 0) < self.per_tenant_limit
+
+    def _grant(self, tenant: str) -> None:
+        self.in_flight += 1
+        self._tenant_in_flight[tenant] = self._tenant_in_flight.get(tenant, 0) + 1
+
+    def _dispatch(self) -> None:
+        while self._queued and self.in_flight < self.max_concurrency:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self._dequeue(waiter)
+            self._grant(waiter.tenant)
+            waiter.future.set_result(None)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        for priority in PRIORITIES:
+            candidates = [
+                waiters[0]
+                for tenant, waiters in self._queues[priority].items()
+                if self._runnable(tenant, priority)
+            ]
+            if candidates:
+                return min(
+                    candidates,
+                    key=lambda w: (self._tenant_in_flight.get(w.tenant, 0), w.seq),
+                )
+        return None
+
+    def _dequeue(self, waiter: _Waiter) -> bool:
+        """Remove a waiter from its queue; False if it was already granted."""
+        waiters = self._queues[waiter.priority].get(waiter.tenant)
+        if not waiters or waiter not in waiters:
+            return False
+        waiters.remove(waiter)
+        if not waiters:
+            del self._queues[waiter.priority][waiter.tenant]
+        self._queued -= 1
+        self._publish()
+        return True
+
+    def _reject(self, tenant: str, priority: str, reason: str) -> None:
+        get_metrics().inc(f"llm.scheduler.rejected.{priority}")
+        logger.warning(f"⏳ Shed {priority} LLM request for {tenant}: {reason}")
+        raise SchedulerRejected(reason)
+
+    def _publish(self) -> None:
+        metrics = get_metrics()
+        metrics.set_gauge("llm.scheduler.in_flight", self.in_flight)
+        metrics.set_gauge("llm.scheduler.queue_depth", self._queued)
+        for priority in PRIORITIES:
+            depth = sum(len(w) for w in self._queues[priority].values())
+            metrics.set_gauge(f"llm.scheduler.queue_depth.{priority}", depth)
@@ -0,0 +1,264 @@
+"""
+Incremental SSE parser for streamed LLM tokens.
+Decodes Server-Sent Events from raw response bytes and extracts token text
+from text-generation-webui, TGI and OpenAI-compatible payloads.
+"""
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("llm-stream")
+
+DONE_SENTINEL = b"[DONE]"
+
+TokenExtractor = Callable[[Dict[str, Any]], Optional[str]]
+
+# raw_decode skips json.loads' encoding detection and type checks per call
+_decode_json = json.JSONDecoder().raw_decode
+
+
+class StreamError(Exception):
+    """The inference server reported an error inside the stream."""
+
+
+class SSEDecoder:
+    """
+    Incremental Server-Sent Events decoder (WHATWG event-stream format).
+
+    Accepts arbitrary byte chunks and returns (event, data) pairs for every
+    event completed by the chunk. Data stays as bytes so JSON payloads can
+    be decoded without an intermediate str copy.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._event = b""
+        self._data: List[bytes] = []
+
+    def feed(self, chunk: bytes) -> List[Tuple[bytes, bytes]]:
+        """
+        Add received bytes.
+
+        Args:
+            chunk: Next chunk of the response body
+
+        Returns:
+            (event type, data) for each completed event, in order
+        """
+        if b"\n" not in chunk:
+            self._buffer += chunk
+            return []
+
+        # Common case: the buffer is empty and the chunk holds whole lines
+        data = bytes(self._buffer) + chunk if self._buffer else chunk
+        lines = data.split(b"\n")
+        self._buffer = bytearray(lines.pop())
+
+        events = []
+        for line in lines:
+            if line[-1:] == b"\r":
+                line = line[:-1]
+            event = self._process_line(line)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def flush(self) -> List[Tuple[bytes, bytes]]:
+        """
+        End of stream: dispatch a final event missing its blank line.
+
+        Returns:
+            The pending event, if any
+        """
+        events = []
+        if self._buffer:
+            event = self._process_line(bytes(self._buffer.rstrip(b"\r")))
+            self._buffer.clear()
+            if event is not None:
+                events.append(event)
+        event = self._process_line(b"")
+        if event is not None:
+            events.append(event)
+        return events
+
+    def _process_line(self, line: bytes) -> Optional[Tuple[bytes, bytes]]:
+        if not line:
+            if not self._data:
+                self._event = b""
+                return None
+            data = self._data[0] if len(self._data) == 1 else b"\n".join(self._data)
+            event = (self._event or b"message", data)
+            self._event = b""
+            self._data = []
+            return event
+
+        if line.startswith(b"data: "):
+            # Fast path: nearly every line of an LLM stream
+            self._data.append(line[6:])
+            return None
+        if line[0] == 0x3A:  # ":" comment / keep-alive
+            return None
+
+        field, sep, value = line.partition(b":")
+        if sep and value[:1] == b" ":
+            value = value[1:]
+        if field == b"data":
+            self._data.append(value)
+        elif field == b"event":
+            self._event = value
+        # id / retry are not used for LLM streams
+        return None
+
+
+def _tgwui_token(payload: Dict[str, Any]) -> Optional[str]:
+    # {"event": "text_stream", "message_num": 0, "text": "..."}
+    return payload.get("text")
+
+
+def _tgi_token(payload: Dict[str, Any]) -> Optional[str]:
+    # {"token": {"id": 1, "text": "...", "special": false}, "generated_text": null}
+    token = payload["token"]
+    if token.get("special"):
+        return None
+    return token.get("text")
+
+
+def _openai_token(payload: Dict[str, Any]) -> Optional[str]:
+    # chat: {"choices": [{"delta": {"content": "..."}}]}
+    # completions: {"choices": [{"text": "..."}]}
+    choices = payload.get("choices")
+    if not choices:
+        return None
+    choice = choices[0]
+    delta = choice.get("delta")
+    if delta is not None:
+        return delta.get("content")
+    return choice.get("text")
+
+
+SCHEMAS: Dict[str, TokenExtractor] = {
+    "openai": _openai_token,
+    "tgi": _tgi_token,
+    "tgwui": _tgwui_token,
+}
+
+
+def detect_schema(payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Identify the streaming schema of a decoded payload.
+
+    Args:
+        payload: First JSON event of a stream
+
+    Returns:
+        Key into SCHEMAS, or None if unrecognized
+    """
+    if "choices" in payload:
+        return "openai"
+    if isinstance(payload.get("token"), dict):
+        return "tgi"
+    if "text" in payload:
+        return "tgwui"
+    return None
+
+
+class TokenStreamParser:
+    """
+    Turns raw streamed response bytes into token text.
+
+    The schema is detected from the first event and then fixed for the
+    stream, so each token costs one slice of the receive buffer, one
+    UTF-8 decode, one C-level JSON scan and a couple of dict lookups.
+    """
+
+    def __init__(self, schema: str = "auto"):
+        """
+        Initialize parser.
+
+        Args:
+            schema: "auto", or a key of SCHEMAS to skip detection
+        """
+        self._decoder = SSEDecoder()
+        self._extract: Optional[TokenExtractor] = None if schema == "auto" else SCHEMAS[schema]
+        self.schema = None if schema == "auto" else schema
+        self.done = False
+        self.malformed = 0
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """
+        Add received bytes.
+
+        Args:
+            chunk: Next chunk of the response body
+
+        Returns:
+            Token texts completed by this chunk
+
+        Raises:
+            StreamError: The server sent an error event
+        """
+        return self._tokens(self._decoder.feed(chunk))
+
+    def flush(self) -> List[str]:
+        """
+        End of stream.
+
+        Returns:
+            Tokens of a final unterminated event
+        """
+        return self._tokens(self._decoder.flush())
+
+    def _tokens(self, events: Iterable[Tuple[bytes, bytes]]) -> List[str]:
+        tokens = []
+        for event, data in events:
+            if self.done:
+                break
+            if data == DONE_SENTINEL:
+                self.done = True
+                break
+            token = self._parse(event, data)
+            if token:
+                tokens.append(token)
+        return tokens
+
+    def _parse(self, event: bytes, data: bytes) -> Optional[str]:
+        try:
+            text = data.decode("utf-8")
+            payload, end = _decode_json(text)
+            if end != len(text) and text[end:].strip():
+                raise ValueError("trailing data")
+        except ValueError:  # includes UnicodeDecodeError / JSONDecodeError
+            self._malformed(data, "invalid JSON")
+            return None
+        if not isinstance(payload, dict):
+            self._malformed(data, "not an object")
+            return None
+
+        if event == b"error" or payload.get("error"):
+            error = payload.get("error", payload)
+            if isinstance(error, dict):
+                error = error.get("message", error)
+            raise StreamError(str(error))
+        if payload.get("event") == "stream_end":
+            self.done = True
+            return None
+
+        if self._extract is None:
+            self.schema = detect_schema(payload)
+            if self.schema is None:
+                self._malformed(data, "unknown schema")
+                return None
+            self._extract = SCHEMAS[self.schema]
+
+        try:
+            return self._extract(payload)
+        except (KeyError, IndexError, TypeError, AttributeError):
+            self._malformed(data, f"unexpected {self.schema} payload")
+            return None
+
+    def _malformed(self, data: bytes, reason: str) -> None:
+        self.malformed += 1
+        get_metrics().inc("llm.stream.malformed_events")
+        logger.warning(f"Skipping malformed stream event ({reason}): {data[:200]!r}")
@@ -0,0 +1,78 @@
+"""
+CPU embedding backends for the semantic scorer.
+Full-precision PyTorch, int8 dynamic quantization, and ONNX Runtime,
+all exposing the SentenceTransformer encode() interface.
+"""
+import logging
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger("embedding-backends")
+
+
+def _load_torch(model_name: str, onnx_file: str = "") -> Any:
+    """Full-precision SentenceTransformer (reference path)."""
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def _load_int8(model_name: str, onnx_file: str = "") -> Any:
+    """SentenceTransformer with Linear layers dynamically quantized to int8."""
+    import torch
+
+    model = _load_torch(model_name)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(model_name: str, onnx_file: str = "") -> Any:
+    """
+    SentenceTransformer running on ONNX Runtime.
+
+    onnx_file selects a pre-exported variant from the model repo, e.g.
+    "onnx/model_qint8_avx2.onnx" for the int8-quantized graph.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    model_kwargs = {"file_name": onnx_file} if onnx_file else None
+    return SentenceTransformer(
+        model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs
+    )
+
+
+BACKENDS: Dict[str, Callable[..., Any]] = {
+    "torch": _load_torch,
+    "int8": _load_int8,
+    "onnx": _load_onnx,
+}
+
+
+def load_backend_model(
+    model_name: str,
+    backend: str = "torch",
+    max_seq_length: int = 0,
+    onnx_file: str = "",
+) -> Any:
+    """
+    Load an embedding model on the requested backend.
+
+    Args:
+        model_name: HuggingFace model name
+        backend: One of BACKENDS
+        max_seq_length: Truncate inputs to this many tokens (0 = model default).
+            Caller utterances are short, so a small limit cuts padding work.
+        onnx_file: ONNX graph file within the model repo (onnx backend only)
+
+    Returns:
+        Model with a SentenceTransformer-compatible encode()
+
+    Raises:
+        ValueError: Unknown backend
+        Exception: Whatever the backend raises while loading
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    model = BACKENDS[backend](model_name, onnx_file=onnx_file)
+    if max_seq_length:
+        model.max_seq_length = max_seq_length
+    return model
@@ -0,0 +1,124 @@
+"""
+LRU cache of utterance embeddings.
+Callers repeat the same short phrases constantly, and interim transcripts
+repeat the final one, so a per-process cache lets repeats within a call
+skip the embedding model entirely.
+"""
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger("embedding-cache")
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,!?;:\"'"
+
+
+def normalize_utterance(text: str) -> str:
+    """
+    Canonical cache key for an utterance.
+
+    Lowercases, collapses whitespace and strips edge punctuation, so
+    "Yes." and "yes" share an entry.
+    """
+    return _WHITESPACE.sub(" ", text.lower()).strip(_EDGE_PUNCTUATION)
+
+
+class EmbeddingLRUCache:
+    """
+    Thread-safe, memory-bounded LRU map of utterance -> embedding.
+    One per job process, so it lasts one call under LiveKit.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget for cached vectors
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Look up an utterance's embedding.
+
+        Args:
+            text: Raw utterance
+
+        Returns:
+            Cached embedding (read-only, shape (dim,)), or None on a miss
+        """
+        key = normalize_utterance(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        """
+        Store an utterance's embedding, evicting least recently used entries.
+
+        Args:
+            text: Raw utterance
+            vector: Embedding, shape (dim,)
+        """
+        key = normalize_utterance(text)
+        vector = np.array(vector, dtype=np.float32).reshape(-1)
+        vector.setflags(write=False)
+        if vector.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = vector
+            self._bytes += vector.nbytes
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss counters, hit rate and memory use
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
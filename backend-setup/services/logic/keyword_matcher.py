@@ -0,0 +1,135 @@
+"""
+Multi-pattern keyword matcher (Aho-Corasick).
+First stage of intent detection: obvious keywords like "bleeding" resolve
+an intent in one linear pass, before any transformer encode.
+"""
+import re
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from services.logic.embedding_cache import normalize_utterance
+
+# Words that cancel a keyword shortly after them ("I'm not in any pain").
+# "can't"/"won't" are left out: "it won't stop bleeding" is still an emergency.
+NEGATIONS = frozenset({
+    "not", "no", "never", "without", "nothing",
+    "don't", "dont", "doesn't", "doesnt", "didn't", "didnt",
+    "isn't", "isnt", "aren't", "arent", "wasn't", "wasnt",
+})
+
+_CLAUSE_BREAK = re.compile(r"[.,;:!?]")
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over normalized keywords.
+    Immutable once built, so one instance is shared per profession.
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]], negation_window: int = 3):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Dict mapping IntentLabel -> [List of keywords/phrases]
+            Example: {"EMERGENCY": ["bleeding", "severe pain"]}
+            negation_window: Words before a hit checked for a negation
+                in the same clause (0 = no negation guard)
+        """
+        self.negation_window = negation_window
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, str]]] = [[]]
+        self.size = 0
+
+        for label, phrases in keywords.items():
+            for phrase in phrases:
+                keyword = normalize_utterance(phrase)
+                if keyword:
+                    self._insert(keyword, label)
+                    self.size += 1
+
+        self._build_failure_links()
+
+    def _insert(self, keyword: str, label: str) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((keyword, label))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[str, str]]:
+        """
+        Find every whole-word keyword occurrence in an utterance.
+
+        Hits negated within the negation window are skipped.
+
+        Args:
+            text: Raw utterance
+
+        Returns:
+            (IntentLabel, keyword) pairs in order of occurrence
+        """
+        text = normalize_utterance(text)
+        matches = []
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for keyword, label in self._output[state]:
+                start = end - len(keyword) + 1
+                if (
+                    _is_word_boundary(text, start - 1)
+                    and _is_word_boundary(text, end + 1)
+                    and not self._negated(text, start)
+                ):
+                    matches.append((label, keyword))
+        return matches
+
+    def _negated(self, text: str, start: int) -> bool:
+        if self.negation_window <= 0:
+            return False
+        clause = _CLAUSE_BREAK.split(text[:start])[-1]
+        preceding = _WORD.findall(clause.replace("\u2019", "'"))[-self.negation_window:]
+        return any(word in NEGATIONS for word in preceding)
+
+    def match(self, text: str) -> Optional[Tuple[str, str]]:
+        """
+        First keyword hit in an utterance.
+
+        Args:
+            text: Raw utterance
+
+        Returns:
+            (IntentLabel, keyword), or None if no keyword occurs
+        """
+        matches = self.find_all(text)
+        return matches[0] if matches else None
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def _is_word_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not text[index].isalnum()
@@ -0,0 +1,317 @@
+"""
+Semantic response cache for FAQ-style questions.
+Reuses approved answers per tenant when a new question's embedding is
+close enough to one already answered, skipping the LLM round trip.
+
+Each call runs in its own job process, so answers are kept on disk (one
+file per tenant) for the calls that follow; memory holds this call's copy.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("response-cache")
+
+
+def tenant_fingerprint(*parts: Any) -> str:
+    """
+    Fingerprint of the configuration a tenant's answers depend on
+    (system prompt, caller_responses templates, ...).
+
+    Returns:
+        Short stable hash; answers cached under another fingerprint are stale
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class CachedAnswer:
+    """An approved answer and the question it was given for."""
+
+    question: str
+    answer: str
+    created_at: float
+    last_used: float
+    hits: int = 0
+
+
+class _TenantAnswers:
+    """One tenant's answers, with their question vectors as one matrix."""
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.entries: List[CachedAnswer] = []
+        self.vectors: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix = np.stack(self.vectors)
+        return self._matrix
+
+    def remove(self, indices: List[int]) -> None:
+        drop = set(indices)
+        self.entries = [e for i, e in enumerate(self.entries) if i not in drop]
+        self.vectors = [v for i, v in enumerate(self.vectors) if i not in drop]
+        self._matrix = None
+
+    def add(self, entry: CachedAnswer, vector: np.ndarray) -> None:
+        self.entries.append(entry)
+        self.vectors.append(vector)
+        self._matrix = None
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+class SemanticResponseCache:
+    """
+    Per-tenant answer cache keyed by question embedding.
+
+    Entries expire after ttl_seconds, the least recently used are evicted
+    past max_entries per tenant, and a tenant's answers are dropped as soon
+    as a lookup or store arrives with a different configuration fingerprint.
+
+    With a cache_dir, load() reads a tenant's answers when a call starts
+    and every store rewrites the tenant's file off the event loop, merged
+    with answers other job processes stored meanwhile.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        ttl_seconds: float = 24 * 3600,
+        max_entries: int = 200,
+        cache_dir: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            threshold: Cosine similarity a question needs to reuse an answer
+            ttl_seconds: Lifetime of an answer
+            max_entries: Answers kept per tenant
+            cache_dir: Directory answers are kept in across calls (None = memory only)
+            clock: Wall-clock time source, since entries outlive the process
+                (injectable for tests)
+        """
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.clock = clock
+        self._tenants: Dict[str, _TenantAnswers] = {}
+        self._write_lock = threading.Lock()
+
+    async def load(self, tenant: str) -> None:
+        """
+        Read a tenant's answers from disk (off the event loop), once per process.
+
+        Args:
+            tenant: Client the call belongs to
+        """
+        if self.cache_dir is None or tenant in self._tenants:
+            return
+        answers = await asyncio.get_running_loop().run_in_executor(None, self._read, tenant)
+        if answers is not None and tenant not in self._tenants:
+            self._tenants[tenant] = answers
+            get_metrics().inc("response_cache.loaded", len(answers.entries))
+
+    def lookup(self, tenant: str, fingerprint: str, vector: np.ndarray) -> Optional[CachedAnswer]:
+        """
+        Find an approved answer to a question.
+
+        Args:
+            tenant: Client the call belongs to
+            fingerprint: Current tenant_fingerprint of the client's configuration
+            vector: Question embedding
+
+        Returns:
+            Closest answer at or above the threshold, or None
+        """
+        metrics = get_metrics()
+        answers = self._answers(tenant, fingerprint)
+        if answers is not None:
+            self._expire(answers)
+        if not answers or not answers.entries:
+            metrics.inc("response_cache.misses")
+            return None
+
+        sims = answers.matrix() @ _unit(vector)
+        best = int(np.argmax(sims))
+        if float(sims[best]) < self.threshold:
+            metrics.inc("response_cache.misses")
+            return None
+
+        entry = answers.entries[best]
+        entry.hits += 1
+        entry.last_used = self.clock()
+        metrics.inc("response_cache.hits")
+        metrics.observe("response_cache.similarity", float(sims[best]))
+        return entry
+
+    def store(self, tenant: str, fingerprint: str, question: str, vector: np.ndarray, answer: str) -> None:
+        """
+        Cache an approved answer.
+
+        Args:
+            tenant: Client the call belongs to
+            fingerprint: tenant_fingerprint the answer was produced under
+            question: Caller's question
+            vector: Question embedding
+            answer: Full reply the caller heard
+        """
+        answers = self._answers(tenant, fingerprint)
+        if answers is None:
+            answers = self._tenants[tenant] = _TenantAnswers(fingerprint)
+        self._expire(answers)
+
+        vector = _unit(vector)
+        if answers.entries and float(np.max(answers.matrix() @ vector)) >= self.threshold:
+            # Already answered (raced with another call)
+            return
+
+        now = self.clock()
+        answers.add(CachedAnswer(question, answer, created_at=now, last_used=now), vector)
+        get_metrics().inc("response_cache.stores")
+
+        if len(answers.entries) > self.max_entries:
+            lru = min(range(len(answers.entries)), key=lambda i: answers.entries[i].last_used)
+            answers.remove([lru])
+            get_metrics().inc("response_cache.evictions")
+        self._persist(tenant, answers)
+
+    def invalidate(self, tenant: Optional[str] = None) -> None:
+        """
+        Drop cached answers.
+
+        Args:
+            tenant: Client whose answers to drop (None = every tenant)
+        """
+        if tenant is None:
+            self._tenants.clear()
+        else:
+            self._tenants.pop(tenant, None)
+        if self.cache_dir is not None:
+            paths = self.cache_dir.glob("*.npz") if tenant is None else [self._path(tenant)]
+            for path in paths:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        get_metrics().inc("response_cache.invalidations")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-tenant cache statistics.
+
+        Returns:
+            Dictionary of tenant -> entries and total hits
+        """
+        return {
+            tenant: {
+                "entries": len(answers.entries),
+                "hits": sum(e.hits for e in answers.entries),
+            }
+            for tenant, answers in self._tenants.items()
+        }
+
+    def _answers(self, tenant: str, fingerprint: str) -> Optional[_TenantAnswers]:
+        answers = self._tenants.get(tenant)
+        if answers is not None and answers.fingerprint != fingerprint:
+            logger.info(f"Configuration of {tenant} changed, dropping {len(answers.entries)} cached answers")
+            # The file is replaced by the next store; other fingerprints are not merged
+            del self._tenants[tenant]
+            get_metrics().inc("response_cache.invalidations")
+            return None
+        return answers
+
+    def _expire(self, answers: _TenantAnswers) -> None:
+        cutoff = self.clock() - self.ttl_seconds
+        expired = [i for i, e in enumerate(answers.entries) if e.created_at <= cutoff]
+        if expired:
+            answers.remove(expired)
+            get_metrics().inc("response_cache.expired", len(expired))
+
+    def _path(self, tenant: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(tenant.encode('utf-8')).hexdigest()[:16]}.npz"
+
+    def _read(self, tenant: str) -> Optional[_TenantAnswers]:
+        path = self._path(tenant)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                vectors = data["vectors"]
+            answers = _TenantAnswers(meta["fingerprint"])
+            for entry, vector in zip(meta["entries"], vectors):
+                answers.add(CachedAnswer(**entry), vector)
+            return answers
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable response cache {path}: {e}")
+            return None
+
+    def _persist(self, tenant: str, answers: _TenantAnswers) -> None:
+        if self.cache_dir is None:
+            return
+        # Snapshot on the event loop; the entries keep changing as calls use them
+        args = (tenant, answers.fingerprint, [asdict(e) for e in answers.entries], answers.matrix())
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(*args)
+            return
+        loop.run_in_executor(None, self._write, *args)
+
+    def _write(self, tenant: str, fingerprint: str, entries: List[Dict[str, Any]], vectors: np.ndarray) -> None:
+        tmp_path = None
+        with self._write_lock:
+            try:
+                path = self._path(tenant)
+                path.parent.mkdir(parents=True, exist_ok=True)
+
+                # Keep answers other job processes stored since this one loaded
+                on_disk = self._read(tenant)
+                if on_disk is not None and on_disk.fingerprint == fingerprint and on_disk.entries:
+                    sims = on_disk.matrix() @ vectors.T
+                    new = [i for i in range(len(on_disk.entries)) if float(np.max(sims[i])) < self.threshold]
+                    if new:
+                        entries = entries + [asdict(on_disk.entries[i]) for i in new]
+                        vectors = np.vstack([vectors, on_disk.matrix()[new]])
+                if len(entries) > self.max_entries:
+                    keep = sorted(range(len(entries)), key=lambda i: entries[i]["last_used"])[-self.max_entries:]
+                    entries = [entries[i] for i in keep]
+                    vectors = vectors[keep]
+
+                fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    meta = json.dumps({"fingerprint": fingerprint, "entries": entries})
+                    np.savez(f, vectors=vectors, meta=np.array(meta))
+                # Atomic: a starting call never reads a half-written file
+                os.replace(tmp_path, path)
+                tmp_path = None
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not store cached answers for {tenant}: {e}")
+            finally:
+                if tmp_path is not None:
+                    try:
+                        os.unlink(tmp_path)
+                    except OSError:
+                        pass
@@ -0,0 +1,173 @@
+"""
+Async intent scoring service.
+Runs embedding encodes off the event loop and coalesces concurrent
+utterances (interim and final transcripts) into a single batched
+model.encode call.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("scoring-service")
+
+LATENCY_METRIC = "scoring.latency_ms"
+BATCH_SIZE_METRIC = "scoring.batch_size"
+
+
+class AsyncScoringService:
+    """
+    Micro-batching front end for a SemanticIntentScorer.
+
+    Utterances that arrive within batch_window_ms of each other are encoded
+    together in a worker thread; each is then scored against its own call's
+    IntentSnapshot. Utterances already in the scorer's embedding cache are
+    answered immediately without joining a batch.
+    """
+
+    def __init__(
+        self,
+        scorer: Any,
+        batch_window_ms: float = 3.0,
+        max_batch_size: int = 32,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Initialize scoring service.
+
+        Args:
+            scorer: Shared SemanticIntentScorer
+            batch_window_ms: How long the first utterance waits for others
+            max_batch_size: Flush immediately once this many are queued
+            executor: Pool to run encodes in (default: one dedicated thread)
+        """
+        self.scorer = scorer
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="scoring"
+        )
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def encode(self, text: str) -> np.ndarray:
+        """
+        Encode one utterance as part of the next batch.
+
+        Args:
+            text: Utterance to encode
+
+        Returns:
+            Embedding, shape (1, dim)
+        """
+        cached = self.scorer.cached(text)
+        if cached is not None:
+            return cached[None, :]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush, loop)
+
+        return await future
+
+    async def score(
+        self, text: str, threshold: float = 0.75, snapshot: Optional[Any] = None
+    ) -> Tuple[str, float]:
+        """
+        Score an utterance without blocking the event loop.
+
+        Args:
+            text: Utterance to classify
+            threshold: Minimum similarity for a match
+            snapshot: Intent set to score against (default: scorer's registered intents)
+
+        Returns:
+            (Best Intent Label, Confidence Score)
+        """
+        snapshot = snapshot if snapshot is not None else self.scorer.snapshot
+        if not self.scorer.model or len(snapshot) == 0:
+            return "None", 0.0
+
+        start = time.perf_counter()
+        input_vec = await self.encode(text)
+        result = snapshot.score_vector(input_vec, threshold)
+        get_metrics().observe(LATENCY_METRIC, (time.perf_counter() - start) * 1000)
+        return result
+
+    async def build_snapshot(self, intents: Dict[str, List[str]]) -> Any:
+        """
+        Build an intent snapshot in the encode executor.
+
+        Args:
+            intents: Dict mapping IntentLabel -> [List of phrases]
+
+        Returns:
+            IntentSnapshot from the scorer's build_snapshot
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.scorer.build_snapshot, intents)
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Hand the queued utterances to the executor as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = loop.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Encode a batch in the executor and resolve each caller's future."""
+        texts = [text for text, _ in batch]
+        loop = asyncio.get_running_loop()
+
+        try:
+            vectors = await loop.run_in_executor(self._executor, self.scorer.encode_and_cache, texts)
+        except Exception as e:
+            logger.error(f"Batch encode failed ({len(texts)} utterances): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        get_metrics().observe(BATCH_SIZE_METRIC, len(batch))
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(vectors[i:i + 1])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scoring latency and batching statistics.
+
+        Returns:
+            Dictionary with latency_ms and batch_size summaries (p50/p99 etc.)
+            and embedding cache hit rates
+        """
+        metrics = get_metrics()
+        cache = self.scorer.cache
+        return {
+            "latency_ms": metrics.histogram(LATENCY_METRIC),
+            "batch_size": metrics.histogram(BATCH_SIZE_METRIC),
+            "queued": len(self._pending),
+            "cache": cache.get_stats() if cache is not None else None,
+        }
+
+    def close(self) -> None:
+        """Shut down the encode executor."""
+        self._executor.shutdown(wait=False)
@@ -1,56 +1,266 @@
-|import logging
+import logging
 import time
-from typing import List, Tuple, Dict
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple, Dict
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from services.logic.embedding_backends import load_backend_model
+from services.logic.embedding_cache import EmbeddingLRUCache, normalize_utterance
 
 logger = logging.getLogger("semantic-scorer")
 
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def load_embedding_model(
+    model_name: str = DEFAULT_MODEL_NAME,
+    backend: str = "torch",
+    max_seq_length: int = 0,
+    onnx_file: str = "",
+) -> Optional[Any]:
+    """
+    Load a sentence embedding model.
+
+    Args:
+        model_name: HuggingFace model name
+        backend: "torch" (full precision), "int8" (dynamic quantization)
+            or "onnx" (ONNX Runtime). Falls back to "torch" on failure.
+        max_seq_length: Truncate inputs to this many tokens (0 = model default)
+        onnx_file: ONNX graph file within the model repo (onnx backend only)
+
+    Returns:
+        Loaded model, or None if the libs or weights are unavailable
+    """
+    attempts = [backend] if backend == "torch" else [backend, "torch"]
+    for attempt in attempts:
+        try:
+            logger.info(f"Loading semantic model: {model_name} ({attempt})...")
+            start = time.time()
+            model = load_backend_model(model_name, attempt, max_seq_length, onnx_file)
+            logger.info(f"Model loaded in {time.time() - start:.2f}s")
+            return model
+        except Exception as e:
+            logger.error(f"Failed to load semantic model on {attempt} backend: {e}")
+
+    return None
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    Row-normalize embeddings to unit length as float32.
+
+    Args:
+        vectors: Embeddings, shape (n, dim)
+
+    Returns:
+        Normalized copy; all-zero rows stay zero
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    """One intent's similarity to an utterance."""
+
+    label: str
+    score: float  # Best single-phrase similarity (max aggregation)
+    mean: float  # Mean similarity over the intent's phrases
+
+
+@dataclass(frozen=True, eq=False)
+class IntentSnapshot:
+    """
+    Immutable set of intent embeddings for one profession.
+    Safe to share between concurrent calls.
+
+    Phrases are grouped by intent and stored as one L2-normalized float32
+    matrix, so scoring is a single matrix product plus segment reductions.
+    """
+
+    labels: Tuple[str, ...] = ()
+    embeddings: Optional[np.ndarray] = None
+    intent_names: Tuple[str, ...] = field(init=False, default=())
+    _starts: np.ndarray = field(init=False, repr=False, default=None)
+    _counts: np.ndarray = field(init=False, repr=False, default=None)
+
+    def __post_init__(self):
+        if not self.labels:
+            return
+
+        # Stable-sort phrases so each intent occupies one contiguous row range
+        first_seen = {}
+        for label in self.labels:
+            first_seen.setdefault(label, len(first_seen))
+        order = sorted(range(len(self.labels)), key=lambda i: first_seen[self.labels[i]])
+        labels = tuple(self.labels[i] for i in order)
+        matrix = l2_normalize(np.asarray(self.embeddings)[order])
+        matrix.setflags(write=False)
+
+        starts = [0] + [i for i in range(1, len(labels)) if labels[i] != labels[i - 1]]
+        counts = np.diff(starts + [len(labels)]).astype(np.float32)
+
+        object.__setattr__(self, "labels", labels)
+        object.__setattr__(self, "embeddings", matrix)
+        object.__setattr__(self, "intent_names", tuple(labels[i] for i in starts))
+        object.__setattr__(self, "_starts", np.asarray(starts, dtype=np.intp))
+        object.__setattr__(self, "_counts", counts)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def score_matrix(self, input_vecs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-intent similarity for a batch of utterances.
+
+        Args:
+            input_vecs: Utterance embeddings, shape (m, dim)
+
+        Returns:
+            (max_scores, mean_scores), each shape (m, num_intents)
+        """
+        sims = l2_normalize(input_vecs) @ self.embeddings.T
+        max_scores = np.maximum.reduceat(sims, self._starts, axis=1)
+        mean_scores = np.add.reduceat(sims, self._starts, axis=1) / self._counts
+        return max_scores, mean_scores
+
+    def score_vectors(
+        self, input_vecs: np.ndarray, threshold: float = 0.75
+    ) -> List[Tuple[str, float]]:
+        """
+        Best intent for each of a batch of encoded utterances.
+
+        Args:
+            input_vecs: Utterance embeddings, shape (m, dim)
+            threshold: Minimum similarity for a match
+
+        Returns:
+            (Best Intent Label, Confidence Score) per utterance
+        """
+        if not self.labels:
+            return [("None", 0.0)] * len(input_vecs)
+
+        max_scores, _ = self.score_matrix(input_vecs)
+        best = np.argmax(max_scores, axis=1)
+
+        results = []
+        for row, idx in enumerate(best):
+            best_score = float(max_scores[row, idx])
+            label = self.intent_names[idx] if best_score >= threshold else "None"
+            results.append((label, best_score))
+        return results
+
+    def score_vector(self, input_vec: np.ndarray, threshold: float = 0.75) -> Tuple[str, float]:
+        """
+        Score an already-encoded utterance against this snapshot.
+
+        Args:
+            input_vec: Utterance embedding, shape (1, dim)
+            threshold: Minimum similarity for a match
+
+        Returns:
+            (Best Intent Label, Confidence Score)
+        """
+        return self.score_vectors(input_vec, threshold)[0]
+
+    def top_k_vector(
+        self, input_vec: np.ndarray, k: int = 3, aggregation: str = "max"
+    ) -> List[IntentMatch]:
+        """
+        Rank intents for an already-encoded utterance.
+
+        Args:
+            input_vec: Utterance embedding, shape (1, dim)
+            k: Number of intents to return
+            aggregation: Rank by "max" (best phrase) or "mean" (all phrases)
+
+        Returns:
+            Up to k IntentMatch objects, best first
+        """
+        if aggregation not in ("max", "mean"):
+            raise ValueError(f"Unknown aggregation: {aggregation}")
+        if not self.labels:
+            return []
+
+        max_scores, mean_scores = self.score_matrix(input_vec)
+        ranking = max_scores[0] if aggregation == "max" else mean_scores[0]
+        order = np.argsort(-ranking, kind="stable")[:k]
+        return [
+            IntentMatch(
+                label=self.intent_names[i],
+                score=float(max_scores[0, i]),
+                mean=float(mean_scores[0, i]),
+            )
+            for i in order
+        ]
+
+
+EMPTY_SNAPSHOT = IntentSnapshot()
+
+
 class SemanticIntentScorer:
     """
     Local micro-model for sub-second intent classification.
-    Uses quantized embeddings for speed.
+    Uses quantized embeddings for speed when an int8/onnx backend is
+    selected (see load_embedding_model).
+
+    The scorer itself only owns the model. Intent sets are built into
+    immutable IntentSnapshot objects so one scorer can serve many calls.
     """
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        model: Optional[Any] = None,
+        cache: Optional[EmbeddingLRUCache] = None,
+    ):
         """
         Initialize the scorer.
         
         Args:
             model_name: HuggingFace model name (default: fast & small)
+            model: Preloaded embedding model (e.g. from worker prewarm).
+                Skips loading when provided.
+            cache: Utterance embedding cache; repeated phrases skip the model
         """
         self.model_name = model_name
-        self.model = None
-        self.intent_embeddings = {}
-        self.intent_labels = []
-        self._load_model()
+        self.model = model
+        self.cache = cache
+        self.snapshot = EMPTY_SNAPSHOT
+        if self.model is None:
+            self._load_model()
 
     def _load_model(self):
         """Lazy load the model to avoid blocking valid imports if libs missing."""
-        try:
-            logger.info(f"Loading semantic model: {self.model_name}...")
-            start = time.time()
-            self.model = SentenceTransformer(self.model_name)
-            logger.info(f"Model loaded in {time.time() - start:.2f}s")
-        except Exception as e:
-            logger.error(f"Failed to load semantic model: {e}")
-            self.model = None
+        self.model = load_embedding_model(self.model_name)
 
-    def register_intents(self, intents: Dict[str, List[str]]):
+    @property
+    def intent_labels(self) -> List[str]:
+        """Labels of the default (registered) snapshot."""
+        return list(self.snapshot.labels)
+
+    @property
+    def intent_embeddings(self) -> Optional[np.ndarray]:
+        """Embeddings of the default (registered) snapshot."""
+        return self.snapshot.embeddings
+
+    def build_snapshot(self, intents: Dict[str, List[str]]) -> IntentSnapshot:
         """
-        Pre-compute embeddings for intent phrases.
+        Pre-compute embeddings for intent phrases without touching scorer state.
         
         Args:
             intents: Dict mapping IntentLabel -> [List of phrases]
             Example: {"EMERGENCY": ["I'm in pain", "It hurts bad"]}
+
+        Returns:
+            Immutable snapshot (empty if model not loaded)
         """
         if not self.model:
-            return
+            return EMPTY_SNAPSHOT
 
-        self.intent_embeddings = {}
-        self.intent_labels = []
-        
         all_phrases = []
         temp_labels = []
 
@@ -60,38 +270,157 @@ class SemanticIntentScorer:
                 temp_labels.append(label)
         
         if not all_phrases:
-            return
+            return EMPTY_SNAPSHOT
 
         # Batch encode all phrases
-        embeddings = self.model.encode(all_phrases)
+        embeddings = np.array(self.model.encode(all_phrases))
+
+        logger.info(f"Built snapshot of {len(all_phrases)} phrases for {len(intents)} intents.")
+        return IntentSnapshot(labels=tuple(temp_labels), embeddings=embeddings)
+
+    def register_intents(self, intents: Dict[str, List[str]]):
+        """
+        Replace the scorer's default snapshot.
+
+        Only for single-call use; concurrent calls should each score
+        against their own snapshot from build_snapshot().
         
-        self.intent_embeddings = embeddings
-        self.intent_labels = temp_labels
-        logger.info(f"Registered {len(all_phrases)} phrases for {len(intents)} intents.")
+        Args:
+            intents: Dict mapping IntentLabel -> [List of phrases]
+        """
+        self.snapshot = self.build_snapshot(intents)
+
+    def cached(self, text: str) -> Optional[np.ndarray]:
+        """
+        Get an utterance's embedding from the cache without touching the model.
+
+        Returns:
+            Embedding, shape (dim,), or None if not cached
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get(text)
+
+    def encode_and_cache(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode utterances with the model and store them in the cache.
+        Repeats within the batch are encoded once.
+
+        Args:
+            texts: Utterances known to be missing from the cache
+
+        Returns:
+            Embeddings, shape (len(texts), dim)
+        """
+        if self.cache is None:
+            return np.asarray(self.model.encode(texts), dtype=np.float32)
 
-    def score(self, text: str, threshold: float = 0.75) -> Tuple[str, float]:
+        groups: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            groups.setdefault(normalize_utterance(text), []).append(i)
+
+        unique = [texts[indices[0]] for indices in groups.values()]
+        encoded = np.asarray(self.model.encode(unique), dtype=np.float32)
+
+        vectors = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+        for row, (text, indices) in enumerate(zip(unique, groups.values())):
+            self.cache.put(text, encoded[row])
+            vectors[indices] = encoded[row]
+        return vectors
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode utterances, serving repeats from the cache.
+
+        Args:
+            texts: Utterances to encode
+
+        Returns:
+            Embeddings, shape (len(texts), dim)
+        """
+        if self.cache is None:
+            return self.encode_and_cache(texts)
+
+        cached = [self.cache.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if not missing:
+            return np.stack(cached)
+
+        encoded = self.encode_and_cache([texts[i] for i in missing])
+        for row, i in enumerate(missing):
+            cached[i] = encoded[row]
+        return np.stack(cached)
+
+    def score(
+        self,
+        text: str,
+        threshold: float = 0.75,
+        snapshot: Optional[IntentSnapshot] = None,
+    ) -> Tuple[str, float]:
         """
         Score incoming text against registered intents.
+
+        Args:
+            text: Utterance to classify
+            threshold: Minimum similarity for a match
+            snapshot: Intent set to score against (default: registered intents)
         
         Returns:
             (Best Intent Label, Confidence Score)
             Returns ("None", 0.0) if below threshold or model not loaded.
         """
-        if not self.model or len(self.intent_labels) == 0:
+        snapshot = snapshot if snapshot is not None else self.snapshot
+        if not self.model or len(snapshot) == 0:
             return "None", 0.0
 
         # Encode input text
-        input_vec = self.model.encode([text])
-        
-        # Calc cosine similarity
-        # input_vec is (1, 384), intent_embeddings is (N, 384)
-        sim_scores = cosine_similarity(input_vec, self.intent_embeddings)[0]
-        
-        best_idx = np.argmax(sim_scores)
-        best_score = float(sim_scores[best_idx])
-        
-        if best_score >= threshold:
-            best_label = self.intent_labels[best_idx]
-            return best_label, best_score
-        
-        return "None", best_score
+        input_vec = self.encode([text])
+        return snapshot.score_vector(input_vec, threshold)
+
+    def score_many(
+        self,
+        texts: List[str],
+        threshold: float = 0.75,
+        snapshot: Optional[IntentSnapshot] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Score a batch of utterances with one encode and one matrix product.
+
+        Args:
+            texts: Utterances to classify
+            threshold: Minimum similarity for a match
+            snapshot: Intent set to score against (default: registered intents)
+
+        Returns:
+            (Best Intent Label, Confidence Score) per utterance
+        """
+        snapshot = snapshot if snapshot is not None else self.snapshot
+        if not self.model or len(snapshot) == 0 or not texts:
+            return [("None", 0.0)] * len(texts)
+
+        return snapshot.score_vectors(self.encode(texts), threshold)
+
+    def top_k(
+        self,
+        text: str,
+        k: int = 3,
+        aggregation: str = "max",
+        snapshot: Optional[IntentSnapshot] = None,
+    ) -> List[IntentMatch]:
+        """
+        Rank the intents closest to an utterance.
+
+        Args:
+            text: Utterance to classify
+            k: Number of intents to return
+            aggregation: Rank by "max" (best phrase) or "mean" (all phrases)
+            snapshot: Intent set to score against (default: registered intents)
+
+        Returns:
+            Up to k IntentMatch objects, best first
+        """
+        snapshot = snapshot if snapshot is not None else self.snapshot
+        if not self.model or len(snapshot) == 0:
+            return []
+
+        return snapshot.top_k_vector(self.encode([text]), k, aggregation)
@@ -0,0 +1,217 @@
+"""
+In-process metrics for the voice agent worker.
+Counters, gauges and latency histograms with percentile snapshots.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional
+
+logger = logging.getLogger("metrics")
+
+
+def percentile(samples: Iterable[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of a sample set.
+
+    Args:
+        samples: Observed values
+        pct: Percentile in the range 0-100
+
+    Returns:
+        Percentile value, or 0.0 for an empty sample set
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = int(round(pct / 100.0 * (len(ordered) - 1)))
+    return float(ordered[max(0, min(rank, len(ordered) - 1))])
+
+
+class Histogram:
+    """Bounded reservoir of recent observations."""
+
+    def __init__(self, max_samples: int = 2048):
+        """
+        Initialize histogram.
+
+        Args:
+            max_samples: Number of most recent samples kept for percentiles
+        """
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        self._samples.append(float(value))
+        self.count += 1
+        self.total += float(value)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Summarize recent observations."""
+        samples = list(self._samples)
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": percentile(samples, 50),
+            "p95": percentile(samples, 95),
+            "p99": percentile(samples, 99),
+            "max": max(samples) if samples else 0.0,
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of named metrics.
+    One per process; a job process reports its call's metrics.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to an absolute value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record an observation in a histogram."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def counter(self, name: str) -> float:
+        """Get current counter value."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def gauge(self, name: str) -> Optional[float]:
+        """Get current gauge value."""
+        with self._lock:
+            return self._gauges.get(name)
+
+    def histogram(self, name: str) -> Dict[str, float]:
+        """Get a histogram summary."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            return histogram.snapshot() if histogram else Histogram().snapshot()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get all metrics.
+
+        Returns:
+            Dictionary with counters, gauges and histogram summaries
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "histograms": {
+                    name: histogram.snapshot()
+                    for name, histogram in self._histograms.items()
+                },
+            }
+
+    def reset(self) -> None:
+        """Clear all metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# Global metrics instance
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the global metrics registry."""
+    return _metrics
+
+
+class MetricsReporter:
+    """
+    Periodic export of the registry as one structured log line.
+
+    Each line is "📊 metrics " followed by a JSON object with the
+    registry snapshot and the stats of any registered components, so log
+    shipping can chart latency percentiles, pool and queue state without
+    a scrape endpoint in the worker.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = 60.0,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """
+        Initialize reporter.
+
+        Args:
+            interval_seconds: Time between log lines (0 = never on a timer)
+            registry: Registry to export (default: the global registry)
+        """
+        self.interval_seconds = interval_seconds
+        self.registry = registry or get_metrics()
+        self.sources: Dict[str, Callable[[], Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add_source(self, name: str, get_stats: Callable[[], Any]) -> None:
+        """
+        Include a component's stats in every line.
+
+        Args:
+            name: Key of the stats in the line
+            get_stats: Returns JSON-serializable stats (e.g. a get_stats method)
+        """
+        self.sources[name] = get_stats
+
+    def emit(self) -> Dict[str, Any]:
+        """
+        Log one metrics line now.
+
+        Returns:
+            The exported record
+        """
+        record = self.registry.snapshot()
+        for name, get_stats in self.sources.items():
+            try:
+                record[name] = get_stats()
+            except Exception as e:
+                record[name] = {"error": str(e)}
+        logger.info(f"📊 metrics {json.dumps(record, sort_keys=True, default=str)}")
+        return record
+
+    def start(self) -> None:
+        """Emit on a timer from the running event loop (once)."""
+        if self.interval_seconds <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the timer and emit a final line."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.emit()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            self.emit()
@@ -0,0 +1,63 @@
+"""
+Local fake TTS.
+Deterministic, offline stand-in for Cartesia, for tests and local runs of
+the phrase cache.
+"""
+import asyncio
+import math
+import struct
+import zlib
+from typing import List
+
+from services.tts.phrase_cache import PhraseAudio
+
+
+class FakeTTS:
+    """Synthesizes a short tone per character; same text, same audio."""
+
+    def __init__(
+        self,
+        voice_id: str = "fake-voice",
+        sample_rate: int = 16000,
+        ms_per_char: float = 5.0,
+        delay: float = 0.0,
+    ):
+        """
+        Initialize fake TTS.
+
+        Args:
+            voice_id: Voice identifier reported to the cache
+            sample_rate: Output sample rate
+            ms_per_char: Audio length per character of text
+            delay: Simulated synthesis latency in seconds
+        """
+        self.voice_id = voice_id
+        self.sample_rate = sample_rate
+        self.ms_per_char = ms_per_char
+        self.delay = delay
+        self.requests: List[str] = []
+
+    async def synthesize(self, text: str) -> PhraseAudio:
+        """
+        Synthesize text.
+
+        Args:
+            text: Text to speak
+
+        Returns:
+            16-bit mono PCM audio
+        """
+        self.requests.append(text)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+        frequency = 200 + zlib.crc32(text.encode("utf-8")) % 600
+        num_samples = int(len(text) * self.ms_per_char / 1000 * self.sample_rate)
+        samples = (
+            int(8000 * math.sin(2 * math.pi * frequency * i / self.sample_rate))
+            for i in range(num_samples)
+        )
+        return PhraseAudio(
+            pcm=struct.pack(f"<{num_samples}h", *samples),
+            sample_rate=self.sample_rate,
+        )
@@ -0,0 +1,217 @@
+"""
+Pre-synthesized audio cache for fixed agent phrases.
+Greetings, the emergency line and booking confirmations are the same on
+every call, so their audio is synthesized once and replayed from disk.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger("phrase-cache")
+
+SAMPLE_WIDTH = 2  # 16-bit PCM
+
+
+@dataclass(frozen=True)
+class PhraseAudio:
+    """Mono or interleaved 16-bit PCM audio for one phrase."""
+
+    pcm: bytes
+    sample_rate: int
+    num_channels: int = 1
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds."""
+        frame_bytes = SAMPLE_WIDTH * self.num_channels
+        return len(self.pcm) / frame_bytes / self.sample_rate
+
+
+def phrase_key(voice_id: str, text: str) -> str:
+    """
+    Cache key for a phrase spoken by a voice.
+
+    Args:
+        voice_id: TTS voice identifier
+        text: Phrase text (exact, so punctuation changes re-synthesize)
+
+    Returns:
+        Hex digest of (voice_id, text)
+    """
+    return hashlib.sha256(f"{voice_id}\0{text.strip()}".encode("utf-8")).hexdigest()[:32]
+
+
+class PhraseAudioCache:
+    """
+    Disk-backed (voice_id, text hash) -> PCM cache, with an in-memory copy
+    of every phrase loaded so far. The disk copy is shared by every job
+    process on the host; the memory copy lasts one call.
+    """
+
+    def __init__(self, cache_dir: str, synthesizer: Any):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding <voice_id>/<key>.wav files
+            synthesizer: TTS with voice_id and async synthesize(text) -> PhraseAudio
+        """
+        self.cache_dir = Path(cache_dir)
+        self.synthesizer = synthesizer
+        self._memory: Dict[str, PhraseAudio] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def voice_id(self) -> str:
+        return self.synthesizer.voice_id
+
+    def path_for(self, text: str) -> Path:
+        """WAV file path for a phrase in the current voice."""
+        return self.cache_dir / _safe_dirname(self.voice_id) / f"{phrase_key(self.voice_id, text)}.wav"
+
+    def get(self, text: str) -> Optional[PhraseAudio]:
+        """
+        Look up a phrase without synthesizing it.
+
+        Args:
+            text: Phrase text
+
+        Returns:
+            Cached audio, or None on a miss
+        """
+        key = phrase_key(self.voice_id, text)
+        audio = self._memory.get(key)
+        if audio is None:
+            audio = self._read(self.path_for(text))
+            if audio is not None:
+                self._memory[key] = audio
+
+        get_metrics().inc("phrase_cache.hits" if audio is not None else "phrase_cache.misses")
+        return audio
+
+    async def lookup(self, text: str) -> Optional[PhraseAudio]:
+        """
+        Look up a phrase without synthesizing it, reading a miss from
+        disk off the event loop.
+
+        Args:
+            text: Phrase text
+
+        Returns:
+            Cached audio, or None on a miss
+        """
+        key = phrase_key(self.voice_id, text)
+        audio = self._memory.get(key)
+        if audio is None:
+            audio = await asyncio.get_running_loop().run_in_executor(None, self._read, self.path_for(text))
+            if audio is not None:
+                self._memory[key] = audio
+
+        get_metrics().inc("phrase_cache.hits" if audio is not None else "phrase_cache.misses")
+        return audio
+
+    async def get_or_synthesize(self, text: str) -> PhraseAudio:
+        """
+        Get a phrase's audio, synthesizing and storing it on first use.
+        Concurrent first uses of the same phrase share one synthesis.
+
+        Args:
+            text: Phrase text
+
+        Returns:
+            Phrase audio
+        """
+        audio = await self.lookup(text)
+        if audio is not None:
+            return audio
+
+        key = phrase_key(self.voice_id, text)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            audio = await self.synthesizer.synthesize(text)
+            get_metrics().inc("phrase_cache.synthesized")
+            self._memory[key] = audio
+            await asyncio.get_running_loop().run_in_executor(None, self._write, self.path_for(text), audio)
+            future.set_result(audio)
+            return audio
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def warm(self, phrases: Iterable[str]) -> int:
+        """
+        Make sure every phrase is cached (deploy time or worker prewarm).
+
+        Args:
+            phrases: Phrase texts
+
+        Returns:
+            Number of phrases that had to be synthesized
+        """
+        synthesized = 0
+        for text in dict.fromkeys(p.strip() for p in phrases if p and p.strip()):
+            key = phrase_key(self.voice_id, text)
+            if key not in self._memory and not self.path_for(text).exists():
+                await self.get_or_synthesize(text)
+                synthesized += 1
+        logger.info(f"🔊 Phrase cache warm: {synthesized} synthesized for voice {self.voice_id}")
+        return synthesized
+
+    def _read(self, path: Path) -> Optional[PhraseAudio]:
+        try:
+            with wave.open(str(path), "rb") as wav:
+                return PhraseAudio(
+                    pcm=wav.readframes(wav.getnframes()),
+                    sample_rate=wav.getframerate(),
+                    num_channels=wav.getnchannels(),
+                )
+        except FileNotFoundError:
+            return None
+        except (wave.Error, EOFError) as e:
+            logger.warning(f"Discarding corrupt phrase audio {path}: {e}")
+            return None
+
+    def _write(self, path: Path, audio: PhraseAudio) -> None:
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f, wave.open(f, "wb") as wav:
+                wav.setnchannels(audio.num_channels)
+                wav.setsampwidth(SAMPLE_WIDTH)
+                wav.setframerate(audio.sample_rate)
+                wav.writeframes(audio.pcm)
+            os.replace(tmp_path, path)
+            tmp_path = None
+        except (OSError, wave.Error) as e:
+            logger.error(f"Could not store phrase audio {path}: {e}")
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+
+def _safe_dirname(voice_id: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in voice_id) or "default"
@@ -0,0 +1,93 @@
+"""
+Shared fixtures and stand-ins for the call agent tests.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+from services.metrics import get_metrics
+
+
+def embed(text, dim=64):
+    """Bag-of-words hash embedding: same words, same vector."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in text.lower().strip("?.!").split():
+        vector[zlib.crc32(word.encode()) % dim] += 1.0
+    return vector
+
+
+class FakeEmbeddingModel:
+    """Deterministic bag-of-words embedding model; encode may block like a real transformer."""
+
+    dim = 64
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.encode_calls = 0
+        self.batch_sizes = []
+
+    def encode(self, texts):
+        self.encode_calls += 1
+        self.batch_sizes.append(len(texts))
+        if self.delay:
+            time.sleep(self.delay)
+        return np.array([embed(text, self.dim) for text in texts], dtype=np.float32)
+
+
+class FakeLLMProvider:
+    """
+    Streams a reply word by word and records every request.
+
+    The reply is "reply to <prompt>" unless a fixed reply is given.
+    """
+
+    def __init__(self, reply=None, delay=0.0):
+        self.reply = reply
+        self.delay = delay
+        self.prompts = []
+        self.contexts = {}
+        self.scheduling = {}
+
+    @property
+    def calls(self):
+        return len(self.prompts)
+
+    async def stream_response(self, prompt, system_prompt="", context="", tenant="", priority="normal", **kwargs):
+        self.prompts.append(prompt)
+        self.contexts[prompt] = context
+        self.scheduling[prompt] = (tenant, priority)
+        reply = self.reply if self.reply is not None else f"reply to {prompt}"
+        for word in reply.split(" "):
+            await asyncio.sleep(self.delay)
+            yield word + " "
+
+
+class NoScoring:
+    """Scoring service that never matches an intent."""
+
+    async def score(self, text, threshold=0.75, snapshot=None):
+        return "None", 0.0
+
+
+class FakeClock:
+    """Monotonic clock advanced by the test."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    get_metrics().reset()
@@ -0,0 +1,208 @@
+"""
+Tests for cancelling LLM generation on caller barge-in, down to the
+HTTP stream of a local fake inference endpoint.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+
+import services.metrics as metrics_module
+import services.llm.http_client as client_module
+import services.llm.stream_parser as parser_module
+import services.llm.fake_endpoint as fake_module
+
+from agent.barge_in import ReplyTracker
+from agent.session import CallSession
+from tests.conftest import NoScoring
+
+LONG_REPLY = " ".join(
+    ["Sure, we have openings on Friday at three and Monday at ten."]
+    + [f"Option {i} is also available if that suits you better." for i in range(40)]
+)
+
+
+class HTTPProvider:
+    """Streams from a fake endpoint over the shared HTTP client, like the HF provider."""
+
+    def __init__(self, client, url):
+        self.client = client
+        self.url = url
+
+    async def stream_response(self, prompt, system_prompt="", **kwargs):
+        async with self.client.stream("POST", f"{self.url}/api/v1/generate", json={"prompt": prompt}) as response:
+            response.raise_for_status()
+            parser = parser_module.TokenStreamParser()
+            async for chunk in response.aiter_bytes():
+                for token in parser.feed(chunk):
+                    yield token
+                if parser.done:
+                    return
+
+
+class StallingProvider:
+    """One sentence, then waits forever for the next token."""
+
+    def __init__(self):
+        self.closed = asyncio.Event()
+
+    async def stream_response(self, prompt, system_prompt="", **kwargs):
+        try:
+            for word in "Sure, we have openings on Friday.".split():
+                yield word + " "
+            await asyncio.sleep(3600)
+            yield "never"
+        finally:
+            self.closed.set()
+
+
+def make_session(provider):
+    return CallSession(
+        incoming_number="+15550000000",
+        client_config={"profession": "dentist"},
+        prof_config={},
+        llm_provider=provider,
+        scoring=NoScoring(),
+        intents=None,
+        interim_intents=False,
+        segment_max_wait_ms=50,
+    )
+
+
+def test_barge_in_cancels_stream_waiting_on_next_token():
+    async def run():
+        provider = StallingProvider()
+        session = make_session(provider)
+        segments = []
+
+        async def consume():
+            async for segment in session.respond("anything friday"):
+                segments.append(segment)
+
+        consumer = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.05)
+        assert session.interrupt(spoken_text="Sure, we have")
+        await asyncio.wait_for(consumer, 1.0)
+        await asyncio.wait_for(provider.closed.wait(), 1.0)
+        return session, segments
+
+    session, segments = asyncio.run(run())
+
+    assert segments == ["Sure, we have openings on Friday."]
+    reply = session.current_reply
+    assert reply.cancelled and not reply.in_flight
+    assert reply.tokens_generated == 6
+    assert reply.tokens_spoken == 3
+    assert session.token_usage() == {"generated": 6, "spoken": 3}
+
+    metrics = metrics_module.get_metrics()
+    assert metrics.counter("llm.barge_in.cancelled") == 1
+    assert metrics.histogram("llm.barge_in.unspoken_tokens")["count"] == 1
+
+
+def test_barge_in_stops_generation_on_inference_server():
+    """Cancelling the reply drops the HTTP stream, so the server stops sending tokens."""
+
+    async def run():
+        async with fake_module.FakeInferenceEndpoint(token_delay_ms=5, reply=LONG_REPLY) as endpoint:
+            client = client_module.SharedHTTPClient(http2=False)
+            session = make_session(HTTPProvider(client, endpoint.url))
+            try:
+                reply_stream = session.respond("anything friday")
+                first = await reply_stream.__anext__()
+                session.interrupt(spoken_text=first)
+                remaining = [segment async for segment in reply_stream]
+                await asyncio.sleep(0.05)
+                sent_after_cancel = endpoint.tokens_sent
+                await asyncio.sleep(0.1)
+                return first, remaining, endpoint, sent_after_cancel, session
+            finally:
+                await client.aclose()
+
+    first, remaining, endpoint, sent_after_cancel, session = asyncio.run(run())
+
+    total_tokens = len(LONG_REPLY.split(" "))
+    assert first.startswith("Sure, we have openings")
+    assert len(remaining) <= 1
+    assert endpoint.disconnects == 1
+    assert endpoint.tokens_sent == sent_after_cancel < total_tokens / 2
+    usage = session.token_usage()
+    assert 0 < usage["spoken"] <= usage["generated"] < total_tokens / 2
+
+
+def test_uninterrupted_reply_counts_every_token_spoken():
+    async def run():
+        session = make_session(StallingProvider())
+        session.max_sentences = 1  # closes the stream after the first sentence
+        segments = [segment async for segment in session.respond("anything friday")]
+        session.reply_spoken()
+        assert not session.interrupt()  # late barge-in: nothing left to cancel
+        session.close()
+        return session, segments
+
+    session, segments = asyncio.run(run())
+
+    assert segments == ["Sure, we have openings on Friday."]
+    assert session.token_usage() == {"generated": 6, "spoken": 6}
+    metrics = metrics_module.get_metrics()
+    assert metrics.counter("llm.tokens.generated") == 6
+    assert metrics.counter("llm.tokens.spoken") == 6
+    assert metrics.counter("llm.barge_in.cancelled") == 0
+
+
+def test_tracker_maps_spoken_text_to_tokens():
+    tracker = ReplyTracker()
+
+    async def source():
+        for token in ["Sure", ",", " we", " have", " openings", "."]:
+            yield token
+
+    async def run():
+        return [token async for token in tracker.track(source())]
+
+    assert asyncio.run(run()) == ["Sure", ",", " we", " have", " openings", "."]
+    assert tracker.mark_spoken("Sure, we") == 3
+    assert tracker.mark_spoken(None) == 3  # first report wins
+
+
+def test_tracker_uses_one_task_per_reply():
+    tracker = ReplyTracker()
+    created = []
+
+    async def source():
+        for i in range(200):
+            await asyncio.sleep(0)
+            yield f"token{i} "
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.set_task_factory(lambda loop, coro, **kwargs: created.append(coro) or asyncio.Task(coro, loop=loop, **kwargs))
+        tokens = [token async for token in tracker.track(source())]
+        return tokens, len(created)
+
+    tokens, tasks = asyncio.run(run())
+    assert len(tokens) == tracker.tokens_generated == 200
+    assert tasks == 1
+
+
+def test_stream_errors_reach_the_reply_consumer():
+    tracker = ReplyTracker()
+
+    async def source():
+        yield "Sure, "
+        raise ConnectionError("inference server went away")
+
+    async def run():
+        tokens = []
+        try:
+            async for token in tracker.track(source()):
+                tokens.append(token)
+        except ConnectionError:
+            return tokens
+        raise AssertionError("stream error was swallowed")
+
+    assert asyncio.run(run()) == ["Sure, "]
+    assert tracker.finished and not tracker.cancelled
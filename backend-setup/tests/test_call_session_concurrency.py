@@ -0,0 +1,158 @@
+"""
+Tests for the call engine under LiveKit's process model.
+Each call runs in its own job process with a freshly built engine, so the
+test runs calls the same way: one spawned process and engine per call.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import json
+import multiprocessing
+
+import pytest
+
+import services.logic.semantic_scorer as scorer_module
+
+from agent.engine import ReceptionistEngine, build_profession_intents
+from agent.session import EMERGENCY_RESPONSE
+from tests.conftest import FakeEmbeddingModel, FakeLLMProvider
+
+SemanticIntentScorer = scorer_module.SemanticIntentScorer
+
+NUM_CALLS = 3
+
+
+def make_engine(clients_db_path):
+    return ReceptionistEngine(
+        llm_provider=FakeLLMProvider(delay=0.001),
+        scorer=SemanticIntentScorer(model=FakeEmbeddingModel()),
+        clients_db_path=clients_db_path,
+    )
+
+
+@pytest.fixture
+def clients_db(tmp_path):
+    clients = {
+        f"client-{i}": {
+            "name": f"client-{i}",
+            "phone_numbers": [f"+1555000{i:04d}"],
+            "profession": "dentist",
+        }
+        for i in range(NUM_CALLS)
+    }
+    db_path = tmp_path / "clients.json"
+    db_path.write_text(json.dumps(clients))
+    return str(db_path)
+
+
+@pytest.fixture
+def engine(clients_db):
+    return make_engine(clients_db)
+
+
+async def simulate_call(engine, call_index):
+    """Run one scripted call and return (session, expected transcript)."""
+    session = await engine.start_session(f"+1555000{call_index:04d}")
+    assert session is not None
+
+    expected = []
+    utterances = [f"caller {call_index} turn {turn}" for turn in range(3)]
+    if call_index % 2 == 0:
+        utterances.insert(1, "emergency")
+
+    for utterance in utterances:
+        session.add_caller_message(utterance)
+        expected.append(f"Caller: {utterance}")
+
+        chunks = [chunk async for chunk in session.respond(utterance)]
+        reply = "".join(chunks).strip()
+        session.add_agent_message(reply)
+        expected.append(f"Agent: {reply}")
+
+        if utterance == "emergency":
+            assert reply == EMERGENCY_RESPONSE
+        else:
+            assert reply == f"reply to {utterance}"
+
+    return session, expected
+
+
+def run_job_process(clients_db_path, call_index, results):
+    """A LiveKit job process: build the engine, run the one call, report it."""
+    engine = make_engine(clients_db_path)
+    session, expected = asyncio.run(simulate_call(engine, call_index))
+    last_turn = f"caller {call_index} turn 2"
+    results.put({
+        "call_index": call_index,
+        "call_id": session.call_id,
+        "history": session.conversation_history,
+        "expected": expected,
+        "context": engine.llm_provider.contexts[last_turn],
+        "scheduling": engine.llm_provider.scheduling[last_turn],
+    })
+
+
+def test_each_call_runs_in_its_own_job_process(clients_db):
+    """Calls in parallel job processes each build an engine and keep their own state."""
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    jobs = [ctx.Process(target=run_job_process, args=(clients_db, i, results)) for i in range(NUM_CALLS)]
+    for job in jobs:
+        job.start()
+    try:
+        reports = sorted((results.get(timeout=60) for _ in jobs), key=lambda r: r["call_index"])
+    finally:
+        for job in jobs:
+            job.join(30)
+
+    assert len({report["call_id"] for report in reports}) == NUM_CALLS
+    for i, report in enumerate(reports):
+        assert report["history"] == report["expected"]
+        # The LLM context holds only this call's earlier turns
+        assert f"User: caller {i} turn 1" in report["context"]
+        assert "caller" not in report["context"].replace(f"caller {i} ", "")
+        # Turns after an emergency keep emergency priority
+        assert report["scheduling"] == (f"client-{i}", "emergency" if i % 2 == 0 else "normal")
+    assert all(job.exitcode == 0 for job in jobs)
+
+
+def test_profession_snapshot_is_shared_and_immutable(engine):
+    """Sessions of one profession on an engine reuse one read-only intent snapshot."""
+
+    async def start_both():
+        # Both calls arrive before the snapshot exists: one build, off the loop
+        return await asyncio.gather(
+            engine.start_session("+15550000000"),
+            engine.start_session("+15550000001"),
+        )
+
+    first, second = asyncio.run(start_both())
+
+    assert first.intents is second.intents
+    assert engine.scorer.model.encode_calls == 1
+    assert not first.intents.embeddings.flags.writeable
+
+    # Building a snapshot does not touch the scorer's default intents
+    assert engine.scorer.intent_labels == []
+
+
+def test_build_profession_intents_does_not_mutate_config():
+    """Legacy emergency keywords are merged into a copy of the config."""
+    prof_config = {
+        "intents": {"EMERGENCY": ["it hurts"], "BOOKING": ["book a visit"]},
+        "emergency_keywords": ["bleeding"],
+    }
+
+    intents = build_profession_intents(prof_config)
+
+    assert intents["EMERGENCY"] == ["it hurts", "bleeding"]
+    assert prof_config["intents"]["EMERGENCY"] == ["it hurts"]
+
+
+def test_unknown_number_has_no_session(engine):
+    """Calls to unrouted numbers do not create a session."""
+    assert asyncio.run(engine.start_session("+19999999999")) is None
@@ -0,0 +1,92 @@
+"""
+Tests for sampled per-call Chrome Trace Event timelines.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import json
+
+import pytest
+
+from agent.session import CallSession
+from agent.trace import LANES, NULL_TRACE, CallTrace, start_trace
+from tests.conftest import FakeClock, FakeLLMProvider
+
+
+def test_events_are_written_as_chrome_trace(tmp_path):
+    clock = FakeClock(100.0)
+    trace = CallTrace("call-1", clock=clock)
+
+    clock.now = 100.5
+    trace.instant("vad", "speech.end")
+    start = trace.now()
+    clock.now = 100.75
+    trace.complete("scoring", "classify", start, label="HOURS")
+    with trace.span("db", "db.log_call"):
+        clock.now = 101.0
+
+    path = trace.write(str(tmp_path / "traces"))
+    assert path.name == "call-1.trace.json"
+    document = json.loads(path.read_text())
+
+    assert document["displayTimeUnit"] == "ms"
+    assert document["otherData"] == {"call_id": "call-1"}
+    lanes = [e for e in document["traceEvents"] if e["ph"] == "M"]
+    assert [e["args"]["name"] for e in lanes] == LANES
+
+    speech, classify, db = [e for e in document["traceEvents"] if e["ph"] != "M"]
+    assert speech["name"] == "speech.end" and speech["ts"] == pytest.approx(500_000)
+    assert speech["tid"] == LANES.index("vad")
+    assert classify["ph"] == "X" and classify["dur"] == pytest.approx(250_000)
+    assert classify["args"] == {"label": "HOURS"}
+    assert db["ts"] == pytest.approx(750_000) and db["dur"] == pytest.approx(250_000)
+
+
+def test_sampling():
+    assert start_trace("a", 0.0, rng=lambda: 0.0) is NULL_TRACE
+    assert start_trace("a", 0.01, rng=lambda: 0.5) is NULL_TRACE
+    traced = start_trace("a", 0.01, rng=lambda: 0.001)
+    assert traced.enabled and traced.call_id == "a"
+
+    # The unsampled trace accepts every call and records nothing
+    with NULL_TRACE.span("db", "db.log_call"):
+        NULL_TRACE.instant("vad", "speech.start")
+        NULL_TRACE.complete("llm", "llm.reply", NULL_TRACE.now(), tokens=3)
+    assert not NULL_TRACE.enabled
+
+
+class FakeScoring:
+    async def score(self, text, threshold=0.75, snapshot=None):
+        return "None", 0.0
+
+
+def test_session_traces_scoring_and_llm():
+    session = CallSession(
+        incoming_number="+15550000000",
+        client_config={"name": "bright-smile", "profession": "dentist"},
+        prof_config={},
+        llm_provider=FakeLLMProvider(reply="Sure, Tuesday works."),
+        scoring=FakeScoring(),
+        intents=None,
+        interim_intents=False,
+    )
+    session.trace = CallTrace(session.call_id)
+
+    async def turn():
+        return [segment async for segment in session.respond("Can I come Tuesday?")]
+
+    assert asyncio.run(turn()) == ["Sure, Tuesday works."]
+
+    events = [(e["name"], LANES[e["tid"]]) for e in session.trace.to_dict()["traceEvents"] if e["ph"] != "M"]
+    assert events == [
+        ("classify", "scoring"),
+        ("llm.request", "llm"),
+        ("llm.reply", "llm"),
+        ("llm.first_token", "llm"),
+    ]
+    reply = next(e for e in session.trace.events if e["name"] == "llm.reply")
+    assert reply["args"] == {"tokens": 3, "cancelled": False, "degraded": False}
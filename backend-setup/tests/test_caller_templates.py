@@ -0,0 +1,172 @@
+"""
+Tests for answering caller turns from onboarding caller_responses templates
+without calling the LLM.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+
+import pytest
+
+import services.metrics as metrics_module
+
+from agent.router import ClientRouter
+from agent.session import EMERGENCY_RESPONSE, CallSession, fixed_phrases
+from agent.templates import compile_templates, template_phrases
+from tests.conftest import FakeLLMProvider
+
+CALLER_RESPONSES = {
+    "appointment_request": "I'd be happy to help you schedule. What day works best?",
+    "pricing_inquiry": "A cleaning is ninety-nine dollars. Would you like to book one?",
+    "emergency": "Please hang up and call our after-hours line at 555 0199.",
+    "other": "Thanks for calling Bright Smile Dental. How can I help?",
+    "parking": {"response": "Parking is free behind the building.", "phrases": ["Where do I park?"]},
+}
+
+
+HOLDING_REPLY = "Let me check on that for you."
+
+
+class LabelScoring:
+    """Labels utterances by keyword."""
+
+    LABELS = {
+        "price": "TEMPLATE:pricing_inquiry",
+        "park": "TEMPLATE:parking",
+        "bleeding": "EMERGENCY",
+    }
+
+    async def score(self, text, threshold=0.75, snapshot=None):
+        for keyword, label in self.LABELS.items():
+            if keyword in text.lower():
+                return label, 0.9
+        return "None", 0.0
+
+
+def make_session(provider, caller_responses=CALLER_RESPONSES, speak_fixed=None):
+    _, templates, emergency = compile_templates(caller_responses)
+    session = CallSession(
+        incoming_number="+15550000000",
+        client_config={"name": "bright-smile", "profession": "dentist"},
+        prof_config={},
+        llm_provider=provider,
+        scoring=LabelScoring(),
+        intents=None,
+        interim_intents=False,
+        templates=templates,
+        emergency_response=emergency,
+    )
+    session.speak_fixed = speak_fixed
+    return session
+
+
+def ask(session, text):
+    async def run():
+        segments = [segment async for segment in session.respond(text)]
+        await asyncio.gather(*session._tasks)
+        return segments
+    return asyncio.run(run())
+
+
+def test_compile_templates():
+    intents, responses, emergency = compile_templates(CALLER_RESPONSES)
+
+    assert set(intents) == {
+        "TEMPLATE:appointment_request", "TEMPLATE:pricing_inquiry", "TEMPLATE:parking",
+    }
+    assert "How much does it cost?" in intents["TEMPLATE:pricing_inquiry"]
+    assert intents["TEMPLATE:parking"] == ["Where do I park?"]
+    assert responses["TEMPLATE:parking"] == "Parking is free behind the building."
+    # The catch-all opener is never matched; emergency replaces the emergency line
+    assert CALLER_RESPONSES["other"] not in responses.values()
+    assert emergency == CALLER_RESPONSES["emergency"]
+
+    intents, _, _ = compile_templates({"insurance_question": "We take most PPO plans.", "blank": " "})
+    assert intents == {"TEMPLATE:insurance_question": ["insurance question"]}
+    assert compile_templates(None) == ({}, {}, None)
+
+
+def test_template_turn_skips_the_llm():
+    provider = FakeLLMProvider(reply=HOLDING_REPLY)
+    session = make_session(provider)
+
+    assert ask(session, "What's the price of a cleaning?") == [
+        "A cleaning is ninety-nine dollars.",
+        "Would you like to book one?",
+    ]
+    assert provider.calls == 0
+
+    ask(session, "Can I bring my dog?")
+    assert provider.calls == 1
+    assert (session.turns, session.template_turns) == (2, 1)
+    assert metrics_module.get_metrics().counter("templates.turns_served") == 1
+
+
+def test_template_plays_from_cached_audio():
+    spoken = []
+
+    async def speak_fixed(text):
+        spoken.append(text)
+
+    session = make_session(FakeLLMProvider(reply=HOLDING_REPLY), speak_fixed=speak_fixed)
+
+    assert ask(session, "Where do I park?") == []
+    assert spoken == ["Parking is free behind the building."]
+
+
+def test_client_emergency_line_overrides_default():
+    session = make_session(FakeLLMProvider(reply=HOLDING_REPLY))
+    assert ask(session, "My gum is bleeding badly") == [CALLER_RESPONSES["emergency"]]
+
+    default = make_session(FakeLLMProvider(reply=HOLDING_REPLY), caller_responses={})
+    assert ask(default, "My gum is bleeding badly") == [EMERGENCY_RESPONSE]
+    assert default.templates == {}
+
+
+def test_templates_are_prewarmed():
+    phrases = fixed_phrases({}, {"caller_responses": CALLER_RESPONSES})
+
+    for text in template_phrases(CALLER_RESPONSES):
+        assert text in phrases
+    assert CALLER_RESPONSES["emergency"] in phrases
+    assert CALLER_RESPONSES["other"] not in phrases
+    assert fixed_phrases({}) == fixed_phrases({}, {})
+
+
+def test_onboarding_templates_reach_clients_db(tmp_path):
+    db_path = tmp_path / "clients.json"
+    router = ClientRouter(str(db_path))
+    router.add_client("bright-smile", ["+15550000000"], "dentist", "voice", "https://example.com")
+
+    # Onboarding step 3 gives the business number and, maybe, a forwarding number
+    assert router.set_caller_responses([None, "+15550000000"], CALLER_RESPONSES) == "bright-smile"
+    assert router.set_caller_responses(["+19999999999"], CALLER_RESPONSES) is None
+
+    # The next call re-reads clients.json and picks up the templates
+    client_config = ClientRouter(str(db_path)).get_client_by_phone("+15550000000")
+    intents, _, emergency = compile_templates(client_config["caller_responses"])
+    assert "TEMPLATE:pricing_inquiry" in intents
+    assert emergency == CALLER_RESPONSES["emergency"]
+
+
+def test_template_share_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # analytics.db creates its database on import
+    import analytics.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "data" / "analytics.db")
+    db.init_db()
+
+    async def log_calls():
+        await db.log_call_to_db("bright-smile", 30, "", "dentist", turns=4, template_turns=3)
+        await db.log_call_to_db("bright-smile", 30, "", "dentist", turns=6, template_turns=1)
+        await db.log_call_to_db("cool-air", 30, "", "hvac", turns=5)
+    asyncio.run(log_calls())
+
+    report = {row["client_name"]: row for row in db.get_template_report()}
+    assert report["bright-smile"]["calls"] == 2
+    assert report["bright-smile"]["template_share"] == pytest.approx(0.4)
+    assert report["cool-air"]["template_share"] == 0.0
@@ -0,0 +1,144 @@
+"""
+Tests for token-budgeted conversation context with a running summary.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import services.metrics as metrics_module
+import services.llm.prompt as prompt_module
+
+from agent.context import ContextBuilder
+
+TokenCounter = prompt_module.TokenCounter
+format_prompt = prompt_module.format_prompt
+
+SYSTEM_PROMPT = "You are the receptionist for Bright Smile Dental. Keep replies short."
+
+
+def talk(builder, turns):
+    """Add caller/agent turn pairs."""
+    for i in range(turns):
+        builder.add_turn("caller", f"Question {i}: can I come in on day {i} at {i} o'clock?")
+        builder.add_turn("agent", f"Yes, day {i} at {i} works. Anything else?")
+
+
+def chat(builder, turns):
+    """Add caller/agent turn pairs that state no key facts."""
+    for i in range(turns):
+        builder.add_turn("caller", f"Question {i}: do you do whitening?")
+        builder.add_turn("agent", f"Answer {i}: yes, we do.")
+
+
+def test_short_call_keeps_every_turn_verbatim():
+    builder = ContextBuilder(TokenCounter(), recent_turns=6)
+    builder.add_turn("caller", "Hi, this is Dana Lee.")
+    builder.add_turn("agent", "Hi Dana, how can I help?")
+
+    context = builder.build(SYSTEM_PROMPT, "Do you take Delta Dental?")
+
+    assert context == "User: Hi, this is Dana Lee.\n\nAssistant: Hi Dana, how can I help?"
+    assert builder.summary == ""
+
+
+def test_older_turns_fold_into_summary():
+    builder = ContextBuilder(TokenCounter(), recent_turns=4)
+    builder.add_turn("caller", "Hi, this is Dana Lee, my number is 555 0100.")
+    builder.add_turn("agent", "Hi Dana. How can I help you today? We are open until six.")
+    talk(builder, 2)
+
+    context = builder.build(SYSTEM_PROMPT, "What was my name again?")
+
+    assert 'the caller said "Hi, this is Dana Lee, my number is 555 0100."' in builder.summary
+    # Only the first sentence of agent turns survives folding
+    assert 'you said "Hi Dana."' in builder.summary
+    assert context.startswith("(Earlier in this call: ")
+    assert context.count("User: ") == 2 and context.count("Assistant: ") == 2
+    assert "User: Hi, this is Dana" not in context
+    assert "User: Question 0" in context and "User: Question 1" in context
+    assert metrics_module.get_metrics().counter("context.folded_turns") == 2
+
+
+def test_summary_prefix_is_stable_between_folds():
+    """Without new key facts, a fold only appends to the summary."""
+    builder = ContextBuilder(TokenCounter(), recent_turns=4)
+    chat(builder, 3)
+    first = builder.build(SYSTEM_PROMPT, "one")
+    summary = builder.summary
+
+    # No turn added: nothing new to fold, identical prompt prefix
+    assert builder.build(SYSTEM_PROMPT, "two") == first
+    builder.add_turn("caller", "Thanks.")
+    builder.build(SYSTEM_PROMPT, "three")
+    assert builder.summary.startswith(summary)
+
+
+def test_long_call_stays_within_token_budget():
+    counter = TokenCounter()
+    builder = ContextBuilder(counter, max_tokens=600, recent_turns=8, summary_max_tokens=80, reply_tokens=128)
+    talk(builder, 60)
+
+    user_msg = "Can you repeat the first time you offered?"
+    context = builder.build(SYSTEM_PROMPT, user_msg)
+    prompt = format_prompt(user_msg, SYSTEM_PROMPT, context)
+
+    assert counter.count(prompt) <= 600 - 128
+    assert counter.count(builder.summary) <= 80
+    # The summary keeps the newest folded turns
+    assert "Question 55" in builder.summary and "Question 0:" not in builder.summary
+    assert "Question 59" in context
+
+
+def test_key_facts_outlive_folded_excerpts():
+    counter = TokenCounter()
+    builder = ContextBuilder(counter, max_tokens=600, recent_turns=8, summary_max_tokens=80, reply_tokens=128)
+    builder.add_turn("caller", "Hi, my name is Dana Lee and I'm calling about a cracked filling.")
+    builder.add_turn("agent", "Sorry to hear that, Dana. Can I get a number?")
+    builder.add_turn("caller", "Sure, it's 555 0100. My insurance is Delta Dental.")
+    builder.add_turn("agent", "Thanks.")
+    talk(builder, 30)
+    builder.add_turn("caller", "Actually, can I do Thursday afternoon instead?")
+    builder.add_turn("agent", "Thursday afternoon works.")
+    chat(builder, 10)
+
+    builder.build(SYSTEM_PROMPT, "What do you have on file for me?")
+
+    assert builder.summary.startswith(
+        "Caller's name Dana Lee; phone 555 0100; insurance Delta Dental; "
+        "reason for calling I'm calling about a cracked filling; requested time Thursday afternoon."
+    )
+    # The turns that stated them were trimmed from the excerpts long ago
+    assert "the caller said \"Hi, my name" not in builder.summary
+    assert counter.count(builder.summary) <= 80
+
+
+def test_committed_utterance_is_not_repeated():
+    """The utterance being answered may already be in history (STT commit order)."""
+    builder = ContextBuilder(TokenCounter())
+    builder.add_turn("caller", "Hello?")
+    builder.add_turn("agent", "Hi, how can I help?")
+    builder.add_turn("caller", "Are you open Saturday?")
+
+    context = builder.build(SYSTEM_PROMPT, "Are you open Saturday?")
+
+    assert "Saturday" not in context
+
+
+def test_system_prompt_is_a_stable_prefix():
+    first = format_prompt("Hi", SYSTEM_PROMPT)
+    later = format_prompt("And Sunday?", SYSTEM_PROMPT, "User: Hi\n\nAssistant: Hello!")
+
+    assert first.startswith(SYSTEM_PROMPT + "\n\n")
+    assert later.startswith(SYSTEM_PROMPT + "\n\nUser: Hi\n\nAssistant: Hello!\n\nUser: And Sunday?")
+    assert later.endswith("\n\nAssistant:")
+
+
+def test_token_counts_are_cached():
+    counter = TokenCounter(cache_size=16)
+    text = "Do you take Delta Dental insurance?"
+    assert counter.count(text) == counter.count(text) > 0
+    assert counter.count("") == 0
+    info = counter.cache_info()
+    assert info.hits == 1 and info.misses == 1
@@ -0,0 +1,113 @@
+"""
+Tests for the utterance embedding LRU cache.
+Covers key normalization, memory-bounded eviction, hit-rate counters
+and that cached phrases skip the embedding model.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st, settings
+
+import services.logic.embedding_cache as cache_module
+import services.logic.semantic_scorer as scorer_module
+import services.logic.scoring_service as service_module
+
+EmbeddingLRUCache = cache_module.EmbeddingLRUCache
+normalize_utterance = cache_module.normalize_utterance
+SemanticIntentScorer = scorer_module.SemanticIntentScorer
+AsyncScoringService = service_module.AsyncScoringService
+
+DIM = 8
+VECTOR_BYTES = DIM * 4
+
+
+class CountingModel:
+    """Embedding model that records every text it encodes."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return np.array([[len(t), t.count("a"), 1, 0, 0, 0, 0, 0] for t in texts], dtype=np.float32)
+
+
+def test_normalization_merges_trivial_variants():
+    """Case, spacing and edge punctuation do not split cache entries."""
+    assert normalize_utterance("  Yes. ") == "yes"
+    assert normalize_utterance("What are   your HOURS?") == "what are your hours"
+    assert normalize_utterance("I'm in pain!") == "i'm in pain"
+
+
+def test_lru_eviction_respects_memory_budget():
+    """Least recently used entries are evicted once the byte budget is exceeded."""
+    cache = EmbeddingLRUCache(max_bytes=3 * VECTOR_BYTES)
+    for text in ("a", "b", "c"):
+        cache.put(text, np.ones(DIM))
+
+    assert cache.get("a") is not None  # "a" is now most recent
+    cache.put("d", np.ones(DIM))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    stats = cache.get_stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] == 1
+
+
+@settings(max_examples=50)
+@given(st.lists(st.sampled_from(["yes", "no", "hours", "pain", "book"]), min_size=1, max_size=40))
+def test_hit_rate_counts_repeats(utterances):
+    """Each distinct phrase misses once; every repeat is a hit."""
+    cache = EmbeddingLRUCache()
+    for text in utterances:
+        if cache.get(text) is None:
+            cache.put(text, np.zeros(DIM))
+
+    stats = cache.get_stats()
+    distinct = len(set(utterances))
+    assert stats["misses"] == distinct
+    assert stats["hits"] == len(utterances) - distinct
+    assert stats["hit_rate"] == pytest.approx(stats["hits"] / len(utterances))
+
+
+def test_scorer_skips_model_for_repeated_phrases():
+    """Repeats across and within batches are encoded once."""
+    model = CountingModel()
+    scorer = SemanticIntentScorer(model=model, cache=EmbeddingLRUCache())
+    scorer.register_intents({"EMERGENCY": ["bleeding"], "HOURS": ["what are your hours"]})
+    model.encoded.clear()
+
+    first = scorer.score_many(["yes", "Yes.", "bleeding"])
+    second = scorer.score_many(["yes", "bleeding"])
+
+    assert model.encoded == ["yes", "bleeding"]
+    assert first[0] == first[1]
+    assert second == [first[0], first[2]]
+
+
+def test_scoring_service_answers_cache_hits_without_batching():
+    """Cached utterances never reach the executor."""
+    model = CountingModel()
+    scorer = SemanticIntentScorer(model=model, cache=EmbeddingLRUCache())
+    snapshot = scorer.build_snapshot({"EMERGENCY": ["bleeding"]})
+    service = AsyncScoringService(scorer, batch_window_ms=1.0)
+    model.encoded.clear()
+
+    async def run_test():
+        await service.score("I'm in pain", snapshot=snapshot)
+        await service.score("i'm in pain!", snapshot=snapshot)
+
+    asyncio.run(run_test())
+
+    assert model.encoded == ["I'm in pain"]
+    assert service.get_stats()["cache"]["hits"] == 1
+    service.close()
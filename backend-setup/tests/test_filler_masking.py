@@ -0,0 +1,113 @@
+"""
+Tests for filler-audio masking of a slow first LLM token.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+
+import services.metrics as metrics_module
+
+from agent.filler import mask_first_token
+from agent.session import CallSession
+from tests.conftest import NoScoring
+
+
+class SlowStartProvider:
+    """First token after first_token_delay, then the rest immediately."""
+
+    def __init__(self, first_token_delay):
+        self.first_token_delay = first_token_delay
+
+    async def stream_response(self, prompt, system_prompt="", **kwargs):
+        await asyncio.sleep(self.first_token_delay)
+        for word in "Sure, we have openings on Friday.".split():
+            yield word + " "
+
+
+def make_session(first_token_delay, events):
+    session = CallSession(
+        incoming_number="+15550000000",
+        client_config={"profession": "dentist"},
+        prof_config={"filler": {"phrases": ["One moment.", "Let me look."]}},
+        llm_provider=SlowStartProvider(first_token_delay),
+        scoring=NoScoring(),
+        intents=None,
+        filler_deadline_ms=20,
+    )
+
+    async def play_filler(text):
+        events.append(("filler-start", text))
+        await asyncio.sleep(0.05)
+        events.append(("filler-end", text))
+
+    session.play_filler = play_filler
+    return session
+
+
+def run_turn(session, events, text="do you have anything friday"):
+    async def run():
+        async for segment in session.respond(text):
+            events.append(("reply", segment))
+    asyncio.run(run())
+
+
+def test_fast_first_token_plays_no_filler():
+    events = []
+    session = make_session(first_token_delay=0.0, events=events)
+    run_turn(session, events)
+
+    assert [kind for kind, _ in events] == ["reply"]
+    assert metrics_module.get_metrics().counter("filler.dentist.turns") == 1
+    assert metrics_module.get_metrics().counter("filler.dentist.fired") == 0
+
+
+def test_slow_first_token_plays_filler_before_reply():
+    """The reply is held back until the filler finishes, so they never overlap."""
+    events = []
+    session = make_session(first_token_delay=0.06, events=events)
+    run_turn(session, events)
+
+    assert events == [
+        ("filler-start", "One moment."),
+        ("filler-end", "One moment."),
+        ("reply", "Sure, we have openings on Friday."),
+    ]
+    assert metrics_module.get_metrics().counter("filler.dentist.fired") == 1
+    assert metrics_module.get_metrics().histogram("filler.dentist.first_token_ms")["count"] == 1
+
+
+def test_filler_phrases_rotate_within_a_call():
+    events = []
+    session = make_session(first_token_delay=0.04, events=events)
+    run_turn(session, events)
+    run_turn(session, events)
+
+    assert [text for kind, text in events if kind == "filler-start"] == ["One moment.", "Let me look."]
+
+
+def test_mask_closes_stream_when_consumer_stops():
+    closed = []
+
+    async def stream():
+        try:
+            for word in ("a", "b", "c"):
+                await asyncio.sleep(0)
+                yield word
+        finally:
+            closed.append(True)
+
+    async def nothing():
+        pass
+
+    async def run():
+        masked = mask_first_token(stream(), 100, nothing)
+        first = await masked.__anext__()
+        await masked.aclose()
+        return first
+
+    assert asyncio.run(run()) == "a"
+    assert closed == [True]
@@ -0,0 +1,143 @@
+"""
+Tests for the shared pooled LLM HTTP client.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import services.metrics as metrics_module
+import services.llm.http_client as client_module
+
+SharedHTTPClient = client_module.SharedHTTPClient
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.05)
+        body = b"data: ok\n\n"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sequential_requests_reuse_one_connection(server_url):
+    """Keep-alive: later requests skip the TCP handshake."""
+    client = SharedHTTPClient(http2=False)
+
+    async def run_test():
+        for _ in range(5):
+            async with client.stream("GET", server_url) as response:
+                await response.aread()
+        await client.aclose()
+
+    asyncio.run(run_test())
+
+    metrics = metrics_module.get_metrics()
+    assert metrics.counter("llm.http.connections_opened") == 1
+    assert metrics.histogram("llm.http.connect_ms")["count"] == 1
+    assert metrics.gauge("llm.http.in_flight") == 0
+
+
+def test_warm_opens_connections_before_first_call(server_url):
+    client = SharedHTTPClient(http2=False)
+
+    async def run_test():
+        opened = await client.warm(server_url, connections=3)
+        async with client.stream("GET", server_url) as response:
+            await response.aread()
+        await client.aclose()
+        return opened
+
+    assert asyncio.run(run_test()) == 3
+    assert metrics_module.get_metrics().counter("llm.http.connections_opened") == 3
+
+
+def test_saturation_counts_requests_beyond_pool_limit(server_url):
+    client = SharedHTTPClient(http2=False, max_connections=2)
+
+    async def run_test():
+        async def fetch():
+            response = await client.request("GET", server_url)
+            return response.status_code
+        statuses = await asyncio.gather(*(fetch() for _ in range(4)))
+        await client.aclose()
+        return statuses
+
+    assert asyncio.run(run_test()) == [200] * 4
+    metrics = metrics_module.get_metrics()
+    assert metrics.counter("llm.http.pool_waits") == 2
+    assert metrics.gauge("llm.http.pool_saturation") == 0
+
+
+def test_pool_wait_time_is_measured_per_request(server_url):
+    """Requests queued behind busy connections record how long they waited."""
+    client = SharedHTTPClient(http2=False, max_connections=1)
+
+    async def run_test():
+        await asyncio.gather(*(client.request("GET", f"{server_url}/slow") for _ in range(2)))
+        await client.aclose()
+
+    asyncio.run(run_test())
+
+    waits = metrics_module.get_metrics().histogram("llm.http.pool_wait_ms")
+    assert waits["count"] == 2
+    assert waits["max"] >= 40  # The second request waited for the first to finish
+    assert waits["p50"] < 40
+
+
+def test_http2_capacity_counts_streams(monkeypatch):
+    """An HTTP/2 connection carries many requests, so it is not one pool slot."""
+    assert SharedHTTPClient(http2=False, max_connections=4).capacity == 4
+
+    monkeypatch.setattr(client_module, "http2_available", lambda: True)
+    monkeypatch.setattr(client_module.httpx, "AsyncClient", lambda **kwargs: None)
+    client = SharedHTTPClient(http2=True, max_connections=4, max_concurrent_streams=100)
+    assert client.capacity == 400
+
+    for _ in range(5):
+        client._acquire()
+    metrics = metrics_module.get_metrics()
+    assert metrics.counter("llm.http.pool_waits") == 0
+    assert metrics.gauge("llm.http.pool_saturation") == 5 / 400
+
+
+def test_warm_reports_unreachable_endpoint():
+    client = SharedHTTPClient(http2=False, connect_timeout=0.5)
+
+    async def run_test():
+        opened = await client.warm("http://127.0.0.1:9", connections=2)
+        await client.aclose()
+        return opened
+
+    assert asyncio.run(run_test()) == 0
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    monkeypatch.setattr(client_module, "http2_available", lambda: False)
+    assert SharedHTTPClient(http2=True).http2 is False
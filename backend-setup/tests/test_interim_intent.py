@@ -0,0 +1,160 @@
+"""
+Tests for early intent triggering on interim STT transcripts.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+
+import services.metrics as metrics_module
+import services.logic.keyword_matcher as matcher_module
+
+from agent.interim import InterimIntentMonitor
+from agent.session import CallSession, EMERGENCY_RESPONSE
+from tests.conftest import FakeLLMProvider, NoScoring
+
+
+class SlowDetector:
+    """Detector that flags 'hurts' as an emergency after a short delay."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.seen = []
+
+    async def __call__(self, text):
+        self.seen.append(text)
+        await asyncio.sleep(self.delay)
+        return ("EMERGENCY", 0.9) if "hurts" in text else ("None", 0.2)
+
+
+def test_fires_once_per_turn():
+    """Repeat crossings within a turn are debounced; end_turn re-arms."""
+    fired = []
+    monitor = InterimIntentMonitor(SlowDetector(), on_trigger=lambda l, s: fired.append(l))
+
+    async def run_test():
+        await monitor.on_interim("it")
+        await monitor.on_interim("it hurts")
+        await monitor.on_interim("it hurts so")
+        await monitor.on_interim("it hurts so much")
+        first_turn = monitor.end_turn()
+        await monitor.on_interim("it hurts again")
+        return first_turn
+
+    assert asyncio.run(run_test()) == ("EMERGENCY", 0.9)
+    assert fired == ["EMERGENCY", "EMERGENCY"]
+    assert metrics_module.get_metrics().histogram("intent.interim.lead_ms")["count"] == 1
+
+
+def test_interims_are_coalesced_while_scoring():
+    """Only the newest interim is scored after an in-flight detection."""
+    detector = SlowDetector(delay=0.02)
+    monitor = InterimIntentMonitor(detector)
+
+    async def run_test():
+        await asyncio.gather(
+            monitor.on_interim("my"),
+            monitor.on_interim("my tooth"),
+            monitor.on_interim("my tooth really"),
+            monitor.on_interim("my tooth really hurts"),
+        )
+
+    asyncio.run(run_test())
+
+    assert detector.seen == ["my", "my tooth really hurts"]
+    assert monitor.triggered == ("EMERGENCY", 0.9)
+
+
+def test_stale_detection_after_commit_is_ignored():
+    """A detection still running when the turn ends does not fire later."""
+    fired = []
+    monitor = InterimIntentMonitor(SlowDetector(delay=0.02), on_trigger=lambda l, s: fired.append(l))
+
+    async def run_test():
+        pending = asyncio.ensure_future(monitor.on_interim("it hurts"))
+        await asyncio.sleep(0)
+        monitor.end_turn()
+        return await pending
+
+    assert asyncio.run(run_test()) is None
+    assert fired == []
+    assert monitor.triggered is None
+
+
+def make_session():
+    return CallSession(
+        incoming_number="+15550000000",
+        client_config={"profession": "dentist"},
+        prof_config={},
+        llm_provider=FakeLLMProvider(),
+        scoring=NoScoring(),
+        intents=None,
+        keywords=matcher_module.KeywordMatcher({"EMERGENCY": ["bleeding", "gums are bleeding"]}),
+    )
+
+
+def test_session_skips_committed_turn_after_early_trigger():
+    """The committed utterance does not repeat an emergency already spoken."""
+    session = make_session()
+    spoken = []
+    session.interim_monitor.on_trigger = lambda label, score: spoken.append(EMERGENCY_RESPONSE)
+
+    async def run_test():
+        await session.interim_monitor.on_interim("my gums are bleeding")
+        first = [c async for c in session.respond("my gums are bleeding a lot")]
+        second = [c async for c in session.respond("thanks")]
+        return first, second
+
+    first, second = asyncio.run(run_test())
+
+    assert spoken == [EMERGENCY_RESPONSE]
+    assert first == []
+    assert second == ["reply to thanks"]
+
+
+def test_session_without_trigger_callback_answers_on_commit():
+    """With nobody speaking early, the committed turn takes the fast path."""
+    session = make_session()
+
+    async def run_test():
+        await session.interim_monitor.on_interim("my gums are bleeding")
+        return [c async for c in session.respond("my gums are bleeding")]
+
+    assert asyncio.run(run_test()) == [EMERGENCY_RESPONSE]
+
+
+def test_single_keyword_does_not_fire_early():
+    """Partial text only fires on phrase hits; single words wait for the commit."""
+    session = make_session()
+    fired = []
+    session.interim_monitor.on_trigger = lambda label, score: fired.append(label)
+
+    async def run_test():
+        await session.interim_monitor.on_interim("it was bleeding")
+        return [c async for c in session.respond("it was bleeding")]
+
+    assert asyncio.run(run_test()) == [EMERGENCY_RESPONSE]
+    assert fired == []
+
+
+def test_unconfirmed_early_trigger_still_answers_the_turn():
+    """If the final transcript classifies differently, the caller's question is answered."""
+    metrics_module.get_metrics().reset()
+    session = make_session()
+    fired = []
+    session.interim_monitor.on_trigger = lambda label, score: fired.append(label)
+
+    async def run_test():
+        await session.interim_monitor.on_interim("my gums are bleeding")
+        reply = [c async for c in session.respond("my gums are not bleeding anymore, can I book a cleaning")]
+        return reply
+
+    reply = asyncio.run(run_test())
+
+    assert fired == ["EMERGENCY"]
+    assert " ".join(reply) == "reply to my gums are not bleeding anymore, can I book a cleaning"
+    assert session.priority == "normal"
+    assert metrics_module.get_metrics().counter("intent.interim.unconfirmed") == 1
@@ -0,0 +1,158 @@
+"""
+Tests for the Aho-Corasick keyword stage of intent detection.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import json
+import re
+
+from hypothesis import given, strategies as st, settings
+
+import services.metrics as metrics_module
+import services.logic.keyword_matcher as matcher_module
+
+from agent.engine import build_profession_intents, build_profession_keywords
+from agent.session import CallSession, KEYWORD_MATCH_SCORE
+
+KeywordMatcher = matcher_module.KeywordMatcher
+
+VOCABULARY = ["he", "she", "hers", "his", "pain", "in pain", "bleeding", "a", "tooth"]
+
+
+def naive_find_all(keywords, text):
+    """Reference: regex whole-word search for every keyword."""
+    text = text.lower()
+    found = []
+    for label, words in keywords.items():
+        for word in words:
+            for m in re.finditer(r"(?<![0-9a-z])" + re.escape(word) + r"(?![0-9a-z])", text):
+                found.append((m.end(), label, word))
+    return sorted((label, word) for _, label, word in found)
+
+
+@settings(max_examples=200)
+@given(
+    words=st.lists(st.sampled_from(VOCABULARY + ["ushers", "painful", "x"]), max_size=12),
+    labels=st.lists(st.sampled_from(["A", "B"]), min_size=len(VOCABULARY), max_size=len(VOCABULARY)),
+)
+def test_matches_reference_search(words, labels):
+    """The automaton finds exactly the whole-word occurrences a regex finds."""
+    keywords = {}
+    for word, label in zip(VOCABULARY, labels):
+        keywords.setdefault(label, []).append(word)
+    matcher = KeywordMatcher(keywords)
+    text = " ".join(words)
+
+    assert sorted(matcher.find_all(text)) == naive_find_all(keywords, text)
+
+
+def test_whole_words_only():
+    """Keywords inside longer words do not fire."""
+    matcher = KeywordMatcher({"EMERGENCY": ["pain", "severe pain"]})
+
+    assert matcher.match("Painting the fence") is None
+    assert matcher.match("I'm in PAIN!") == ("EMERGENCY", "pain")
+    assert ("EMERGENCY", "severe pain") in matcher.find_all("it's severe pain")
+    assert len(matcher) == 2
+
+
+class StubScoring:
+    """Scoring service that records which utterances reached the embedder."""
+
+    def __init__(self):
+        self.scored = []
+
+    async def score(self, text, threshold=0.75, snapshot=None):
+        self.scored.append(text)
+        return ("BOOKING", 0.9) if "book" in text else ("None", 0.1)
+
+
+def test_session_resolves_keywords_before_embedding():
+    """Keyword hits skip the embedding stage and are counted per stage."""
+    metrics = metrics_module.get_metrics()
+    metrics.reset()
+    scoring = StubScoring()
+    session = CallSession(
+        incoming_number="+15550000000",
+        client_config={"profession": "dentist"},
+        prof_config={},
+        llm_provider=None,
+        scoring=scoring,
+        intents=None,
+        keywords=KeywordMatcher({"EMERGENCY": ["bleeding"]}),
+    )
+
+    async def run_test():
+        return [
+            await session.classify(text)
+            for text in ("my gums are bleeding", "can I book a visit", "hello")
+        ]
+
+    results = asyncio.run(run_test())
+
+    assert results[0] == ("EMERGENCY", KEYWORD_MATCH_SCORE)
+    assert results[1] == ("BOOKING", 0.9)
+    assert scoring.scored == ["can I book a visit", "hello"]
+    assert metrics.counter("intent.resolved.keyword") == 1
+    assert metrics.counter("intent.resolved.embedding") == 1
+    assert metrics.counter("intent.resolved.none") == 1
+
+
+def test_negated_keywords_do_not_fire():
+    """A negation shortly before a keyword in the same clause cancels the hit."""
+    matcher = KeywordMatcher({"EMERGENCY": ["pain", "bleeding", "won't stop bleeding"]})
+
+    assert matcher.match("I'm not in any pain, I just want a cleaning") is None
+    assert matcher.match("there's no bleeding") is None
+    assert matcher.match("It doesn’t cause pain") is None
+    # Outside the window or the clause, the keyword stands
+    assert matcher.match("No, it's bleeding") == ("EMERGENCY", "bleeding")
+    assert matcher.match("not sure why but my tooth has this pain") == ("EMERGENCY", "pain")
+    # "won't" is not a negation of the emergency
+    assert matcher.match("it won't stop bleeding") == ("EMERGENCY", "won't stop bleeding")
+    assert KeywordMatcher({"EMERGENCY": ["pain"]}, negation_window=0).match("no pain")
+
+
+def test_only_configured_phrases_are_strong_keywords():
+    """Single generic emergency words are left to the embedding stage."""
+    prof_config = {
+        "emergency_keywords": ["pain", "broken", "severe pain"],
+        "keywords": {"EMERGENCY": ["dental emergency"], "BILLING": ["invoice"]},
+    }
+
+    keywords = build_profession_keywords(prof_config)
+
+    assert keywords == {"EMERGENCY": ["dental emergency", "severe pain"], "BILLING": ["invoice"]}
+    assert "pain" in build_profession_intents(prof_config)["EMERGENCY"]
+
+
+def test_negated_emergency_reaches_the_embedding_stage():
+    """'Not in any pain' is not an emergency keyword hit and keeps normal priority."""
+    scoring = StubScoring()
+    with open(os.path.join(os.path.dirname(__file__), '..', 'agent', 'professions', 'dentist.json')) as f:
+        prof_config = json.load(f)
+    session = CallSession(
+        incoming_number="+15550000000",
+        client_config={"profession": "dentist"},
+        prof_config=prof_config,
+        llm_provider=None,
+        scoring=scoring,
+        intents=None,
+        keywords=KeywordMatcher(build_profession_keywords(prof_config)),
+    )
+    text = "I'm not in any pain, I just want a cleaning"
+
+    async def run_test():
+        return await session.classify(text), await session.classify("I think it's a dental emergency")
+
+    negated, emergency = asyncio.run(run_test())
+
+    assert negated == ("None", 0.1)
+    assert scoring.scored == [text]
+    assert emergency == ("EMERGENCY", KEYWORD_MATCH_SCORE)
+    assert session.priority == "normal"
@@ -0,0 +1,242 @@
+"""
+Tests for the LLM circuit breaker and the local CPU fallback process
+(run with a fake in-process model factory instead of llama.cpp).
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import time
+
+import pytest
+
+import services.metrics as metrics_module
+import services.llm.circuit_breaker as breaker_module
+import services.llm.local_fallback as fallback_module
+import services.llm.fallback_server as server_module
+import services.llm.http_client as client_module
+
+from tests.conftest import FakeClock
+
+CircuitBreaker = breaker_module.CircuitBreaker
+LocalFallbackModel = fallback_module.LocalFallbackModel
+FallbackServer = server_module.FallbackServer
+RemoteFallbackModel = server_module.RemoteFallbackModel
+
+
+def fake_model(reply, token_delay):
+    """Stands in for load_llama: generate() yields the reply word by word."""
+
+    def generate(prompt, max_tokens):
+        for i, word in enumerate(reply.split(" ")[:max_tokens]):
+            time.sleep(token_delay)
+            yield word if i == 0 else " " + word
+
+    return generate
+
+
+def broken_model():
+    raise FileNotFoundError("model.gguf")
+
+
+def start_fallback(*factory_args, factory=fake_model, max_tokens=96):
+    model = LocalFallbackModel(
+        "fake.gguf",
+        max_tokens=max_tokens,
+        factory=factory,
+        factory_args=factory_args,
+        mp_context="fork",
+    )
+    model.start()
+    model.wait_ready(timeout=10)
+    return model
+
+
+async def collect(stream):
+    return [token async for token in stream]
+
+
+def test_breaker_opens_and_recovers_through_half_open_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker("llm", failure_threshold=3, recovery_timeout=30.0, clock=clock)
+    metrics = metrics_module.get_metrics()
+
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == breaker_module.CLOSED
+
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == breaker_module.OPEN
+    assert metrics.gauge("llm.breaker.state") == breaker_module.STATE_VALUES["open"]
+    assert not breaker.allow_request()
+
+    # After the recovery timeout exactly one probe goes through
+    clock.now = 30.0
+    assert breaker.allow_request()
+    assert breaker.state == breaker_module.HALF_OPEN
+    assert not breaker.allow_request()
+
+    # A failed probe re-opens for another full timeout
+    breaker.record_failure()
+    assert breaker.state == breaker_module.OPEN
+    clock.now = 59.0
+    assert not breaker.allow_request()
+
+    clock.now = 60.0
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == breaker_module.CLOSED
+    assert breaker.allow_request()
+
+    assert metrics.counter("llm.breaker.opened") == 2
+    assert metrics.counter("llm.breaker.probes") == 2
+    assert metrics.counter("llm.breaker.rejected") == 3
+    assert metrics.gauge("llm.breaker.state") == 0
+
+
+def test_abandoned_probe_frees_the_probe_slot():
+    clock = FakeClock()
+    breaker = CircuitBreaker("llm", failure_threshold=1, recovery_timeout=5.0, clock=clock)
+    breaker.record_failure()
+    clock.now = 5.0
+
+    assert breaker.allow_request()
+    breaker.record_abandoned()  # caller hung up mid-probe
+    assert breaker.state == breaker_module.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_fallback_streams_reply_from_background_process():
+    model = start_fallback("We can see you Friday.", 0.0)
+    try:
+        assert model.available
+        tokens = asyncio.run(collect(model.stream_response("Any openings?", "Be brief.")))
+        assert "".join(tokens) == "We can see you Friday."
+
+        metrics = metrics_module.get_metrics()
+        assert metrics.counter("llm.fallback.requests") == 1
+        assert metrics.counter("llm.fallback.tokens") == 5
+        assert metrics.histogram("llm.fallback.ttft_ms")
+    finally:
+        model.close()
+    assert not model.available
+
+
+def test_abandoned_fallback_stream_is_cancelled_in_process():
+    reply = " ".join(f"word{i}" for i in range(200))
+    model = start_fallback(reply, 0.005)
+    try:
+        async def scenario():
+            stream = model.stream_response("hi")
+            first = await stream.__anext__()
+            await stream.aclose()  # barge-in
+            # The worker drops the cancelled request and serves the next one
+            started = time.monotonic()
+            second = await collect(model.stream_response("hi again"))
+            return first, second, time.monotonic() - started
+
+        first, second, elapsed = asyncio.run(scenario())
+        assert first == "word0"
+        assert len(second) == 96  # max_tokens
+        # Far less than finishing the abandoned 200-token reply first
+        assert elapsed < 200 * 0.005 + 96 * 0.005
+    finally:
+        model.close()
+
+
+def test_fallback_that_fails_to_load_is_unavailable():
+    model = start_fallback(factory=broken_model)
+    try:
+        assert not model.available
+        assert "FileNotFoundError" in model.load_error
+        with pytest.raises(RuntimeError):
+            asyncio.run(collect(model.stream_response("hi")))
+    finally:
+        model.close()
+
+
+def test_job_processes_share_the_host_fallback_server():
+    """Two job-side handles stream from one loaded model through the server."""
+    model = start_fallback("We can see you Friday.", 0.0)
+    try:
+        async def scenario():
+            server = await FallbackServer(model).start()
+            try:
+                handles = [
+                    RemoteFallbackModel(server.url, client=client_module.SharedHTTPClient(http2=False))
+                    for _ in range(2)
+                ]
+                return await asyncio.gather(
+                    *(collect(handle.stream_response("Any openings?", "Be brief.")) for handle in handles)
+                )
+            finally:
+                await server.close()
+
+        replies = asyncio.run(scenario())
+        assert ["".join(tokens) for tokens in replies] == ["We can see you Friday."] * 2
+    finally:
+        model.close()
+
+
+def test_unreachable_fallback_server_is_skipped_until_retry():
+    clock = FakeClock()
+    handle = RemoteFallbackModel(
+        "http://127.0.0.1:1",
+        client=client_module.SharedHTTPClient(http2=False),
+        retry_seconds=5.0,
+        clock=clock,
+    )
+
+    assert handle.available
+    with pytest.raises(RuntimeError):
+        asyncio.run(collect(handle.stream_response("hi")))
+    assert not handle.available
+
+    clock.now = 5.0
+    assert handle.available
+
+
+def test_fallback_server_reports_loading_model_as_unavailable():
+    model = start_fallback(factory=broken_model)
+    try:
+        async def scenario():
+            server = await FallbackServer(model).start()
+            client = client_module.SharedHTTPClient(http2=False)
+            try:
+                health = await client.request("GET", f"{server.url}{server_module.HEALTH_PATH}")
+                handle = RemoteFallbackModel(server.url, client=client)
+                with pytest.raises(RuntimeError):
+                    await collect(handle.stream_response("hi"))
+                return health.status_code, handle.available
+            finally:
+                await server.close()
+
+        status, available = asyncio.run(scenario())
+        assert status == 503
+        assert not available
+    finally:
+        model.close()
+
+
+def test_second_worker_on_host_does_not_load_another_model():
+    """serve() backs off when the port is taken, without starting the model."""
+    first = start_fallback("hi", 0.0)
+    second = LocalFallbackModel("fake.gguf", factory=fake_model, factory_args=("hi", 0.0), mp_context="fork")
+    try:
+        async def scenario():
+            server = await FallbackServer(first).start()
+            try:
+                port = int(server.url.rsplit(":", 1)[1])
+                await server_module.serve(second, "127.0.0.1", port)
+            finally:
+                await server.close()
+
+        asyncio.run(scenario())
+        assert second._process is None
+    finally:
+        first.close()
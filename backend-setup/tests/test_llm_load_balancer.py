@@ -0,0 +1,142 @@
+"""
+Tests for latency-aware LLM endpoint routing and request hedging,
+run offline against local fake inference endpoints.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import time
+
+import pytest
+
+import services.metrics as metrics_module
+import services.llm.http_client as client_module
+import services.llm.stream_parser as parser_module
+import services.llm.load_balancer as balancer_module
+import services.llm.fake_endpoint as fake_module
+
+LLMLoadBalancer = balancer_module.LLMLoadBalancer
+NoHealthyEndpoint = balancer_module.NoHealthyEndpoint
+FakeInferenceEndpoint = fake_module.FakeInferenceEndpoint
+
+REPLY = "See you Friday."
+
+
+def make_opener(client):
+    """Same request/parse path as HuggingFaceLLMProvider._stream_from."""
+
+    async def open_stream(endpoint):
+        async with client.stream("POST", f"{endpoint.url}/api/v1/generate", json={"prompt": "hi"}) as response:
+            response.raise_for_status()
+            parser = parser_module.TokenStreamParser()
+            async for chunk in response.aiter_bytes():
+                for token in parser.feed(chunk):
+                    yield token
+                if parser.done:
+                    return
+
+    return open_stream
+
+
+async def collect(balancer, client):
+    return "".join([token async for token in balancer.stream(make_opener(client))])
+
+
+def run_with_endpoints(configs, scenario):
+    async def run():
+        endpoints = [await FakeInferenceEndpoint(reply=REPLY, **config).start() for config in configs]
+        client = client_module.SharedHTTPClient(http2=False)
+        try:
+            return await scenario(endpoints, client)
+        finally:
+            await client.aclose()
+            for endpoint in endpoints:
+                await endpoint.close()
+    return asyncio.run(run())
+
+
+def test_routes_to_lower_ewma_ttft():
+    """Once latencies are learned, traffic goes to the faster endpoint."""
+
+    async def scenario(endpoints, client):
+        balancer = LLMLoadBalancer([e.url for e in endpoints], hedge_enabled=False, initial_ttft_ms=1)
+        for _ in range(10):
+            assert await collect(balancer, client) == REPLY
+        return balancer
+
+    endpoints_cfg = [{"ttft_ms": 60}, {"ttft_ms": 2}]
+    balancer = run_with_endpoints(endpoints_cfg, scenario)
+    slow, fast = balancer.endpoints
+
+    assert fast.ewma_ttft_ms < slow.ewma_ttft_ms
+    assert balancer.pick() is fast
+
+
+def test_in_flight_requests_spread_load():
+    async def scenario(endpoints, client):
+        balancer = LLMLoadBalancer([e.url for e in endpoints], hedge_enabled=False)
+        await asyncio.gather(*(collect(balancer, client) for _ in range(6)))
+        return endpoints, balancer
+
+    endpoints, balancer = run_with_endpoints([{"ttft_ms": 30}, {"ttft_ms": 30}], scenario)
+
+    assert [e.requests for e in endpoints] == [3, 3]
+    assert all(e.in_flight == 0 for e in balancer.endpoints)
+
+
+def test_slow_request_is_hedged_and_loser_cancelled():
+    async def scenario(endpoints, client):
+        balancer = LLMLoadBalancer([e.url for e in endpoints], hedge_default_ms=40)
+        balancer.endpoints[1].ewma_ttft_ms = 10_000  # primary is endpoint 0
+        balancer.endpoints[0].consecutive_failures = 1
+        loser_ewma = balancer.endpoints[0].ewma_ttft_ms
+        started = time.monotonic()
+        reply = await collect(balancer, client)
+        await asyncio.sleep(0.05)
+        return reply, time.monotonic() - started, endpoints, balancer, loser_ewma
+
+    reply, elapsed, (slow, fast), balancer, loser_ewma = run_with_endpoints(
+        [{"ttft_ms": 1000}, {"ttft_ms": 5}], scenario
+    )
+
+    metrics = metrics_module.get_metrics()
+    assert reply == REPLY
+    assert elapsed < 0.5
+    assert slow.tokens_sent == 0 and fast.requests == 1
+    assert metrics.counter("llm.lb.hedged") == 1
+    assert metrics.counter("llm.lb.hedge_wins") == 1
+    assert metrics.counter("llm.lb.cancelled") == 1
+    # The loser never produced a token: no TTFT sample and no success
+    loser = balancer.endpoints[0]
+    assert loser.ewma_ttft_ms == loser_ewma
+    assert loser.consecutive_failures == 1
+    assert metrics.counter(f"llm.endpoint.{loser.name}.cancelled") == 1
+    assert metrics.histogram(f"llm.endpoint.{loser.name}.cancelled_ms")["max"] >= 30
+
+
+def test_failed_endpoint_fails_over():
+    async def scenario(endpoints, client):
+        balancer = LLMLoadBalancer([e.url for e in endpoints], hedge_enabled=False)
+        balancer.endpoints[1].ewma_ttft_ms = 10_000  # try the broken one first
+        return await collect(balancer, client), balancer
+
+    reply, balancer = run_with_endpoints([{"status": 503}, {}], scenario)
+
+    assert reply == REPLY
+    assert balancer.endpoints[0].consecutive_failures == 1
+    assert metrics_module.get_metrics().counter("llm.lb.failovers") == 1
+
+
+def test_all_endpoints_down_raises():
+    async def scenario(endpoints, client):
+        balancer = LLMLoadBalancer([e.url for e in endpoints])
+        with pytest.raises(NoHealthyEndpoint):
+            await collect(balancer, client)
+        return balancer
+
+    balancer = run_with_endpoints([{"status": 503}, {"status": 503}], scenario)
+    assert all(e.in_flight == 0 for e in balancer.endpoints)
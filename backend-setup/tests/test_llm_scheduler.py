@@ -0,0 +1,169 @@
+"""
+Tests for the priority-aware LLM request scheduler: priority order,
+per-tenant fairness and admission control.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+
+import pytest
+
+import services.metrics as metrics_module
+import services.llm.scheduler as scheduler_module
+
+LLMScheduler = scheduler_module.LLMScheduler
+SchedulerRejected = scheduler_module.SchedulerRejected
+EMERGENCY = scheduler_module.EMERGENCY
+NORMAL = scheduler_module.NORMAL
+BACKGROUND = scheduler_module.BACKGROUND
+
+
+def queue(scheduler, granted, name, tenant, priority=NORMAL):
+    """Start a request that records its name once it gets a slot."""
+
+    async def request():
+        await scheduler.acquire(tenant, priority)
+        granted.append(name)
+
+    return asyncio.ensure_future(request())
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_freed_slots_go_to_the_most_urgent_class():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, queue_timeout_ms=None)
+        await scheduler.acquire("busy")
+        granted = []
+        queue(scheduler, granted, "summary", "a", BACKGROUND)
+        queue(scheduler, granted, "turn", "b", NORMAL)
+        queue(scheduler, granted, "emergency", "c", EMERGENCY)
+        await settle()
+        assert granted == [] and scheduler.queue_depth == 3
+
+        scheduler.release("busy")
+        for tenant in ("c", "b"):
+            await settle()
+            scheduler.release(tenant)
+        await settle()
+        return granted
+
+    assert asyncio.run(scenario()) == ["emergency", "turn", "summary"]
+    metrics = metrics_module.get_metrics()
+    assert metrics.histogram("llm.scheduler.wait_ms.emergency")["count"] == 1
+    assert metrics.gauge("llm.scheduler.queue_depth") == 0
+
+
+def test_busy_tenant_cannot_starve_others():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=2, per_tenant_limit=2, queue_timeout_ms=None)
+        await scheduler.acquire("big")
+        await scheduler.acquire("big")
+        granted = []
+        for i in range(3):
+            queue(scheduler, granted, f"big-{i}", "big")
+        for i in range(2):
+            queue(scheduler, granted, f"small-{i}", "small")
+        await settle()
+
+        # Each freed slot goes to the tenant with fewer requests in flight
+        for tenant in ("big", "big", "small", "big"):
+            scheduler.release(tenant)
+            await settle()
+        return granted, scheduler.get_stats()
+
+    granted, stats = asyncio.run(scenario())
+    assert granted == ["small-0", "big-0", "small-1", "big-1"]
+    assert stats == {"big": {"in_flight": 1, "queued": 1}, "small": {"in_flight": 1, "queued": 0}}
+
+
+def test_tenant_limit_leaves_room_for_others():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=4, per_tenant_limit=1, queue_timeout_ms=None)
+        granted = []
+        queue(scheduler, granted, "a-0", "a")
+        queue(scheduler, granted, "a-1", "a")
+        queue(scheduler, granted, "b-0", "b")
+        queue(scheduler, granted, "a-emergency", "a", EMERGENCY)
+        await settle()
+        return granted, scheduler.in_flight
+
+    granted, in_flight = asyncio.run(scenario())
+    # Emergencies skip the tenant limit
+    assert granted == ["a-0", "b-0", "a-emergency"]
+    assert in_flight == 3
+
+
+def test_full_queue_sheds_background_work_first():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, max_queue=2, queue_timeout_ms=None)
+        await scheduler.acquire("busy")
+        granted = []
+        queue(scheduler, granted, "turn-0", "a")
+        await settle()
+
+        with pytest.raises(SchedulerRejected):
+            await scheduler.acquire("b", BACKGROUND)
+        queue(scheduler, granted, "turn-1", "b")
+        await settle()
+        with pytest.raises(SchedulerRejected):
+            await scheduler.acquire("c", NORMAL)
+
+        emergency = queue(scheduler, granted, "emergency", "c", EMERGENCY)
+        await settle()
+        assert scheduler.queue_depth == 3
+        scheduler.release("busy")
+        await emergency
+        return granted
+
+    assert asyncio.run(scenario()) == ["emergency"]
+    metrics = metrics_module.get_metrics()
+    assert metrics.counter("llm.scheduler.rejected.background") == 1
+    assert metrics.counter("llm.scheduler.rejected.normal") == 1
+
+
+def test_turn_that_waits_too_long_is_shed():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, queue_timeout_ms=20)
+        await scheduler.acquire("busy")
+        with pytest.raises(SchedulerRejected):
+            await scheduler.acquire("a")
+
+        # Emergencies wait as long as it takes
+        emergency = asyncio.ensure_future(scheduler.acquire("b", EMERGENCY))
+        await asyncio.sleep(0.05)
+        assert not emergency.done()
+        scheduler.release("busy")
+        await emergency
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert scheduler.queue_depth == 0
+    assert scheduler.get_stats() == {"b": {"in_flight": 1, "queued": 0}}
+    assert metrics_module.get_metrics().counter("llm.scheduler.rejected.normal") == 1
+
+
+def test_cancelled_request_does_not_leak_a_slot():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, queue_timeout_ms=None)
+        async with scheduler.slot("a"):
+            waiting = asyncio.ensure_future(scheduler.acquire("b"))
+            await settle()
+            waiting.cancel()  # caller hung up while queued
+            await settle()
+            assert scheduler.queue_depth == 0
+
+        async with scheduler.slot("c"):
+            assert scheduler.in_flight == 1
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert scheduler.in_flight == 0
+    assert scheduler.get_stats() == {}
@@ -0,0 +1,151 @@
+"""
+Tests for the pre-synthesized phrase audio cache.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import threading
+
+import services.metrics as metrics_module
+import services.tts.phrase_cache as cache_module
+import services.tts.fake_tts as fake_module
+import services.logic.keyword_matcher as matcher_module
+
+from agent.session import CallSession, EMERGENCY_RESPONSE, fixed_phrases
+from tests.conftest import NoScoring
+
+PhraseAudioCache = cache_module.PhraseAudioCache
+FakeTTS = fake_module.FakeTTS
+
+GREETING = "Thank you for calling, this is Sarah, how can I help you today?"
+
+
+def test_first_use_synthesizes_then_replays_from_disk(tmp_path):
+    """Audio survives a worker restart: a new cache reads it back from disk."""
+    tts = FakeTTS()
+    cache = PhraseAudioCache(str(tmp_path), tts)
+
+    audio = asyncio.run(cache.get_or_synthesize(GREETING))
+    again = asyncio.run(cache.get_or_synthesize(GREETING))
+
+    restarted = PhraseAudioCache(str(tmp_path), FakeTTS())
+    from_disk = restarted.get(GREETING)
+
+    assert tts.requests == [GREETING]
+    assert again is audio
+    assert from_disk == audio
+    assert audio.duration > 0
+    assert metrics_module.get_metrics().counter("phrase_cache.synthesized") == 1
+
+
+def test_lookup_reads_disk_off_the_event_loop(tmp_path):
+    """Misses in memory are read from disk in the executor, then kept in memory."""
+    asyncio.run(PhraseAudioCache(str(tmp_path), FakeTTS()).warm([GREETING]))
+    cache = PhraseAudioCache(str(tmp_path), FakeTTS())
+    read_threads = []
+    read = cache._read
+
+    def tracked_read(path):
+        read_threads.append(threading.current_thread())
+        return read(path)
+
+    cache._read = tracked_read
+
+    async def run_test():
+        return await cache.lookup(GREETING), await cache.lookup(GREETING), await cache.lookup("Bye.")
+
+    first, second, missing = asyncio.run(run_test())
+
+    assert first is second and first.duration > 0
+    assert missing is None
+    assert len(read_threads) == 2  # The second lookup came from memory
+    assert threading.main_thread() not in read_threads
+    assert metrics_module.get_metrics().counter("phrase_cache.hits") == 2
+
+
+def test_key_includes_voice(tmp_path):
+    """The same text in another voice is a different entry."""
+    asyncio.run(PhraseAudioCache(str(tmp_path), FakeTTS(voice_id="sarah")).warm([GREETING]))
+
+    other_voice = PhraseAudioCache(str(tmp_path), FakeTTS(voice_id="mike"))
+    assert other_voice.get(GREETING) is None
+    assert cache_module.phrase_key("sarah", GREETING) != cache_module.phrase_key("mike", GREETING)
+
+
+def test_concurrent_first_uses_share_one_synthesis(tmp_path):
+    tts = FakeTTS(delay=0.01)
+    cache = PhraseAudioCache(str(tmp_path), tts)
+
+    async def run_test():
+        return await asyncio.gather(*(cache.get_or_synthesize(GREETING) for _ in range(10)))
+
+    results = asyncio.run(run_test())
+
+    assert tts.requests == [GREETING]
+    assert all(audio is results[0] for audio in results)
+
+
+def test_warm_skips_cached_phrases(tmp_path):
+    tts = FakeTTS()
+    cache = PhraseAudioCache(str(tmp_path), tts)
+    phrases = fixed_phrases({"greeting": GREETING, "booking_confirmation": "See you soon."})
+
+    assert asyncio.run(cache.warm(phrases)) == 4
+    assert asyncio.run(cache.warm(phrases + [GREETING])) == 0
+    assert len(tts.requests) == 4
+
+
+def test_corrupt_file_is_treated_as_a_miss(tmp_path):
+    cache = PhraseAudioCache(str(tmp_path), FakeTTS())
+    path = cache.path_for(GREETING)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"not a wav file")
+
+    assert cache.get(GREETING) is None
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    """A write that fails is logged, the audio still served, and the temp file removed."""
+    tts = FakeTTS()
+    cache = PhraseAudioCache(str(tmp_path), tts)
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cache_module.os, "replace", failing_replace)
+    audio = asyncio.run(cache.get_or_synthesize(GREETING))
+
+    assert audio.duration > 0
+    assert list(tmp_path.rglob("*.tmp")) == []
+    assert not cache.path_for(GREETING).exists()
+
+
+def test_session_emergency_uses_fixed_phrase_speaker():
+    """With a phrase speaker attached, the emergency line bypasses the LLM/TTS stream."""
+    session = CallSession(
+        incoming_number="+15550000000",
+        client_config={"profession": "dentist"},
+        prof_config={},
+        llm_provider=None,
+        scoring=NoScoring(),
+        intents=None,
+        keywords=matcher_module.KeywordMatcher({"EMERGENCY": ["bleeding"]}),
+    )
+    spoken = []
+
+    async def speak_fixed(text):
+        spoken.append(text)
+
+    session.speak_fixed = speak_fixed
+
+    async def run_test():
+        chunks = [c async for c in session.respond("my gums are bleeding")]
+        await asyncio.gather(*session._tasks)
+        return chunks
+
+    assert asyncio.run(run_test()) == []
+    assert spoken == [EMERGENCY_RESPONSE]
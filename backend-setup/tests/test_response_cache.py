@@ -0,0 +1,245 @@
+"""
+Tests for the per-tenant semantic response cache and its use by call
+sessions for FAQ-style questions.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+
+import services.metrics as metrics_module
+import services.logic.response_cache as cache_module
+import services.llm.circuit_breaker as breaker_module
+
+from agent.context import ContextBuilder, extract_facts, mentions_personal_facts
+from agent.session import CallSession
+from services.llm.prompt import TokenCounter
+from tests.conftest import FakeClock, FakeLLMProvider, embed
+
+SemanticResponseCache = cache_module.SemanticResponseCache
+tenant_fingerprint = cache_module.tenant_fingerprint
+
+HOURS_ANSWER = "We're open eight to five, Monday through Friday. Saturdays by appointment."
+
+
+class KeywordScoring:
+    """Labels questions mentioning "open" as HOURS."""
+
+    def __init__(self):
+        self.encodes = 0
+
+    async def score(self, text, threshold=0.75, snapshot=None):
+        return ("HOURS", 0.9) if "open" in text.lower() else ("None", 0.0)
+
+    async def encode(self, text):
+        self.encodes += 1
+        return embed(text)[None, :]
+
+
+class CountingProvider:
+    def __init__(self, reply=HOURS_ANSWER, degraded=False):
+        self.reply = reply
+        self.degraded = degraded
+        self.calls = 0
+
+    async def stream_response(self, prompt, system_prompt="", **kwargs):
+        self.calls += 1
+        for word in self.reply.split(" "):
+            token = word + " "
+            yield breaker_module.DegradedText(token) if self.degraded else token
+
+
+def make_session(cache, provider, client="bright-smile", fingerprint="v1", **kwargs):
+    return CallSession(
+        incoming_number="+15550000000",
+        client_config={"name": client, "profession": "dentist"},
+        prof_config={},
+        llm_provider=provider,
+        scoring=KeywordScoring(),
+        intents=None,
+        interim_intents=False,
+        response_cache=cache,
+        cache_intents=["HOURS"],
+        cache_fingerprint=fingerprint,
+        **kwargs,
+    )
+
+
+def ask(session, text):
+    async def run():
+        return [segment async for segment in session.respond(text)]
+    return asyncio.run(run())
+
+
+def test_lookup_matches_above_threshold_only():
+    cache = SemanticResponseCache(threshold=0.9)
+    cache.store("t", "v1", "When are you open?", embed("When are you open?"), HOURS_ANSWER)
+
+    hit = cache.lookup("t", "v1", embed("when are you open"))
+    assert hit is not None and hit.answer == HOURS_ANSWER and hit.hits == 1
+    assert cache.lookup("t", "v1", embed("How much is a cleaning?")) is None
+    # Tenants never see each other's answers
+    assert cache.lookup("other", "v1", embed("When are you open?")) is None
+
+    metrics = metrics_module.get_metrics()
+    assert metrics.counter("response_cache.hits") == 1
+    assert metrics.counter("response_cache.misses") == 2
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = SemanticResponseCache(ttl_seconds=60, clock=clock)
+    cache.store("t", "v1", "When are you open?", embed("When are you open?"), HOURS_ANSWER)
+
+    clock.now = 59
+    assert cache.lookup("t", "v1", embed("When are you open?")) is not None
+    clock.now = 60
+    assert cache.lookup("t", "v1", embed("When are you open?")) is None
+    assert metrics_module.get_metrics().counter("response_cache.expired") == 1
+
+
+def test_least_recently_used_answer_is_evicted():
+    clock = FakeClock()
+    cache = SemanticResponseCache(max_entries=2, clock=clock)
+    questions = ["When are you open?", "How much is a cleaning?", "Do you take Aetna?"]
+    for i, question in enumerate(questions[:2]):
+        clock.now = i
+        cache.store("t", "v1", question, embed(question), f"answer {i}")
+
+    clock.now = 5
+    assert cache.lookup("t", "v1", embed(questions[0])) is not None  # now most recent
+    clock.now = 6
+    cache.store("t", "v1", questions[2], embed(questions[2]), "answer 2")
+
+    assert cache.get_stats()["t"]["entries"] == 2
+    assert cache.lookup("t", "v1", embed(questions[1])) is None
+    assert cache.lookup("t", "v1", embed(questions[0])) is not None
+
+
+def test_configuration_change_invalidates_tenant():
+    cache = SemanticResponseCache()
+    before = tenant_fingerprint("prompt", None, {"pricing_inquiry": "Cleanings are $99."})
+    after = tenant_fingerprint("prompt", None, {"pricing_inquiry": "Cleanings are $120."})
+    assert before != after
+    assert before == tenant_fingerprint("prompt", None, {"pricing_inquiry": "Cleanings are $99."})
+
+    cache.store("t", before, "How much is a cleaning?", embed("How much is a cleaning?"), "$99.")
+    assert cache.lookup("t", after, embed("How much is a cleaning?")) is None
+    assert cache.lookup("t", before, embed("How much is a cleaning?")) is None
+    assert metrics_module.get_metrics().counter("response_cache.invalidations") == 1
+
+
+def test_heard_answer_is_reused_by_later_calls(tmp_path):
+    """Each call runs in its own job process: the answer reaches the next call through disk."""
+    first_provider = CountingProvider()
+    first = make_session(SemanticResponseCache(cache_dir=str(tmp_path)), first_provider)
+    reply = ask(first, "When are you open?")
+    first.reply_spoken()
+
+    later_process = SemanticResponseCache(cache_dir=str(tmp_path))
+    asyncio.run(later_process.load("bright-smile"))
+    second_provider = CountingProvider(reply="should not be generated")
+    second = make_session(later_process, second_provider)
+    cached = ask(second, "when are you open")
+
+    assert first_provider.calls == 1 and second_provider.calls == 0
+    assert cached == reply == [
+        "We're open eight to five, Monday through Friday.",
+        "Saturdays by appointment.",
+    ]
+    # Non-FAQ questions always go to the LLM
+    ask(second, "Can I book Tuesday at three?")
+    assert second_provider.calls == 1
+
+
+def test_job_processes_merge_answers_on_disk(tmp_path):
+    """Answers stored by concurrent calls of one tenant are all kept."""
+    first, second = (SemanticResponseCache(cache_dir=str(tmp_path)) for _ in range(2))
+    for cache in (first, second):
+        asyncio.run(cache.load("t"))
+    first.store("t", "v1", "When are you open?", embed("When are you open?"), HOURS_ANSWER)
+    second.store("t", "v1", "How much is a cleaning?", embed("How much is a cleaning?"), "$99.")
+
+    later = SemanticResponseCache(cache_dir=str(tmp_path))
+    asyncio.run(later.load("t"))
+    assert later.lookup("t", "v1", embed("When are you open?")).answer == HOURS_ANSWER
+    assert later.lookup("t", "v1", embed("How much is a cleaning?")).answer == "$99."
+    # Another configuration's answers are not served
+    assert later.lookup("t", "v2", embed("When are you open?")) is None
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_unreadable_cache_file_is_ignored(tmp_path):
+    cache = SemanticResponseCache(cache_dir=str(tmp_path))
+    cache._path("t").write_bytes(b"not a cache file")
+
+    asyncio.run(cache.load("t"))
+    assert cache.lookup("t", "v1", embed("When are you open?")) is None
+    cache.store("t", "v1", "When are you open?", embed("When are you open?"), HOURS_ANSWER)
+
+    later = SemanticResponseCache(cache_dir=str(tmp_path))
+    asyncio.run(later.load("t"))
+    assert later.lookup("t", "v1", embed("When are you open?")) is not None
+
+
+def test_interrupted_or_degraded_answers_are_not_cached():
+    cache = SemanticResponseCache()
+
+    interrupted = make_session(cache, CountingProvider())
+    ask(interrupted, "When are you open?")
+    interrupted.interrupt(spoken_text="We're open eight")
+    interrupted.reply_spoken()
+
+    degraded = make_session(cache, CountingProvider(degraded=True))
+    ask(degraded, "When are you open?")
+    degraded.reply_spoken()
+
+    unheard = make_session(cache, CountingProvider())
+    ask(unheard, "When are you open?")  # call ended before playout
+
+    assert cache.get_stats() == {}
+    assert metrics_module.get_metrics().counter("response_cache.stores") == 0
+
+
+def test_cacheable_answer_is_generated_without_caller_context():
+    cache = SemanticResponseCache()
+    provider = FakeLLMProvider(reply=HOURS_ANSWER)
+    session = make_session(cache, provider, context=ContextBuilder(TokenCounter()))
+    session.add_caller_message("Hi, I need a cleaning.")
+    session.add_agent_message("Sure, I can help with that.")
+
+    ask(session, "When are you open?")
+    ask(session, "Can I book Tuesday at three?")
+
+    # Replayed to other callers, so generated from the question alone
+    assert provider.contexts["When are you open?"] == ""
+    assert "User: Hi, I need a cleaning." in provider.contexts["Can I book Tuesday at three?"]
+
+
+def test_answers_mentioning_the_caller_are_never_cached():
+    cache = SemanticResponseCache()
+    # The system prompt asks the model to use the caller's name
+    provider = FakeLLMProvider(reply="Thanks Dana! " + HOURS_ANSWER)
+    session = make_session(cache, provider, context=ContextBuilder(TokenCounter()))
+    session.add_caller_message("Hi, my name is Dana Lee.")
+    assert extract_facts("Hi, my name is Dana Lee.")["name"] == "Dana Lee"
+
+    ask(session, "When are you open?")
+    session.reply_spoken()
+
+    assert cache.get_stats() == {}
+    assert metrics_module.get_metrics().counter("response_cache.personal_skipped") == 1
+
+
+def test_personal_facts_in_answers():
+    facts = {"name": "Dana Lee", "phone": "555 0100", "insurance": "Delta Dental", "requested time": "Tuesday"}
+
+    assert mentions_personal_facts("See you then, Dana.", facts)
+    assert mentions_personal_facts("We'll text 5550100 a reminder.", facts)
+    assert mentions_personal_facts("Yes, Delta plans are in network.", facts)
+    # A name, number or insurer of its own is caller-specific too
+    assert mentions_personal_facts("This is Sam at the front desk, my number is 555 0199.", {})
+    assert not mentions_personal_facts(HOURS_ANSWER + " We're open Tuesday too.", facts)
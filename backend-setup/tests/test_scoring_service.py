@@ -0,0 +1,139 @@
+"""
+Tests for the async micro-batching scoring service.
+Checks that encodes leave the event loop and that concurrent
+utterances are coalesced into batched model.encode calls.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import json
+
+import services.metrics as metrics_module
+import services.logic.semantic_scorer as scorer_module
+import services.logic.scoring_service as service_module
+
+from tests.conftest import FakeEmbeddingModel
+
+SemanticIntentScorer = scorer_module.SemanticIntentScorer
+AsyncScoringService = service_module.AsyncScoringService
+
+INTENTS = {
+    "EMERGENCY": ["severe tooth pain", "bleeding gums"],
+    "BOOKING": ["book an appointment", "schedule a cleaning"],
+}
+
+
+def test_concurrent_utterances_are_batched():
+    """Utterances arriving together share one encode call."""
+    model = FakeEmbeddingModel()
+    scorer = SemanticIntentScorer(model=model)
+    snapshot = scorer.build_snapshot(INTENTS)
+    service = AsyncScoringService(scorer, batch_window_ms=5.0, max_batch_size=64)
+    utterances = ["severe tooth pain", "book an appointment", "bleeding gums", "hello there"] * 5
+
+    async def run_test():
+        return await asyncio.gather(
+            *(service.score(text, 0.75, snapshot=snapshot) for text in utterances)
+        )
+
+    results = asyncio.run(run_test())
+
+    # One encode for the snapshot, one for all twenty utterances
+    assert model.batch_sizes == [4, len(utterances)]
+    assert results == [scorer.score(text, 0.75, snapshot=snapshot) for text in utterances]
+
+    stats = service.get_stats()
+    assert stats["batch_size"]["count"] == 1
+    assert stats["batch_size"]["max"] == len(utterances)
+    assert stats["latency_ms"]["count"] == len(utterances)
+    assert stats["latency_ms"]["p99"] >= stats["latency_ms"]["p50"] > 0
+    service.close()
+
+
+def test_max_batch_size_flushes_early():
+    """A full batch is encoded without waiting for the window to expire."""
+    model = FakeEmbeddingModel()
+    scorer = SemanticIntentScorer(model=model)
+    snapshot = scorer.build_snapshot(INTENTS)
+    service = AsyncScoringService(scorer, batch_window_ms=10_000, max_batch_size=4)
+
+    async def run_test():
+        return await asyncio.wait_for(
+            asyncio.gather(*(service.score(f"caller {i}", snapshot=snapshot) for i in range(8))),
+            timeout=2.0,
+        )
+
+    asyncio.run(run_test())
+    assert model.batch_sizes[1:] == [4, 4]
+    service.close()
+
+
+def test_encode_does_not_block_event_loop():
+    """Other coroutines keep running while the model encodes."""
+    model = FakeEmbeddingModel()
+    scorer = SemanticIntentScorer(model=model)
+    snapshot = scorer.build_snapshot(INTENTS)
+    model.delay = 0.2
+    service = AsyncScoringService(scorer, batch_window_ms=1.0)
+
+    async def run_test():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        await service.score("severe tooth pain", snapshot=snapshot)
+        ticker_task.cancel()
+        return ticks
+
+    assert asyncio.run(run_test()) >= 5
+    service.close()
+
+
+def test_empty_snapshot_skips_model():
+    """Nothing is queued when there are no intents to score against."""
+    model = FakeEmbeddingModel()
+    scorer = SemanticIntentScorer(model=model)
+    service = AsyncScoringService(scorer)
+
+    assert asyncio.run(service.score("anything")) == ("None", 0.0)
+    assert model.batch_sizes == []
+    service.close()
+
+
+def test_stats_are_exported_as_a_periodic_log_line(caplog):
+    """The worker's metrics reporter emits scoring percentiles and batch sizes."""
+    model = FakeEmbeddingModel()
+    scorer = SemanticIntentScorer(model=model)
+    snapshot = scorer.build_snapshot(INTENTS)
+    service = AsyncScoringService(scorer, batch_window_ms=1.0)
+    reporter = metrics_module.MetricsReporter(interval_seconds=0.01)
+    reporter.add_source("scoring", service.get_stats)
+    reporter.add_source("broken", lambda: 1 / 0)
+
+    async def run_test():
+        await asyncio.gather(*(service.score(f"caller {i}", snapshot=snapshot) for i in range(3)))
+        reporter.start()
+        reporter.start()  # One timer per reporter
+        await asyncio.sleep(0.05)
+        await reporter.stop()
+
+    with caplog.at_level("INFO", logger="metrics"):
+        asyncio.run(run_test())
+    service.close()
+
+    lines = [r.getMessage() for r in caplog.records if r.getMessage().startswith("📊 metrics ")]
+    assert len(lines) >= 2  # Timer lines plus the final line on stop
+    record = json.loads(lines[-1][len("📊 metrics "):])
+    assert record["histograms"]["scoring.batch_size"]["count"] >= 1
+    assert record["scoring"]["latency_ms"]["count"] == 3
+    assert "p99" in record["scoring"]["latency_ms"]
+    assert record["broken"] == {"error": "division by zero"}
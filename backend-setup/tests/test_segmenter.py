@@ -0,0 +1,191 @@
+"""
+Tests for the sentence-boundary segmenter between the LLM and TTS.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+
+from hypothesis import given, settings, strategies as st
+
+import services.metrics as metrics_module
+
+from agent.segmenter import SentenceSegmenter, segment_stream
+from agent.session import REPLY_ERROR_RESPONSE, CallSession
+from tests.conftest import NoScoring
+
+REPLY = (
+    "Oh no, I'm so sorry to hear that. Dr. Patel has an opening at 3.30 today! "
+    "Would that work for you? We can also text you the forms."
+)
+
+
+class TokenStream:
+    """Async token stream that records whether it was closed early."""
+
+    def __init__(self, text, delay=0.0, pauses=None):
+        self.tokens = [word + " " for word in text.split()]
+        self.delay = delay
+        self.pauses = pauses or {}
+        self.produced = 0
+        self.closed = False
+
+    async def _generate(self):
+        try:
+            for i, token in enumerate(self.tokens):
+                await asyncio.sleep(self.pauses.get(i, self.delay))
+                self.produced += 1
+                yield token
+        finally:
+            self.closed = True
+
+    def __aiter__(self):
+        self._gen = self._generate()
+        return self._gen
+
+    async def aclose(self):
+        await self._gen.aclose()
+
+
+def collect(stream, **kwargs):
+    async def run():
+        return [segment async for segment in segment_stream(stream, **kwargs)]
+    return asyncio.run(run())
+
+
+def test_splits_sentences_but_not_abbreviations_or_decimals():
+    segmenter = SentenceSegmenter()
+    segments = segmenter.feed(REPLY + " ")
+
+    assert segments == [
+        "Oh no, I'm so sorry to hear that.",
+        "Dr. Patel has an opening at 3.30 today!",
+        "Would that work for you?",
+        "We can also text you the forms.",
+    ]
+
+
+def test_no_is_a_sentence_unless_a_number_follows():
+    segmenter = SentenceSegmenter()
+
+    # The first sentence goes to TTS as soon as the next word shows it is one
+    assert segmenter.feed("No. ") == []
+    assert segmenter.feed("We") == ["No."]
+    assert segmenter.feed(" don't take that insurance. ") == ["We don't take that insurance."]
+
+    segmenter = SentenceSegmenter()
+    assert segmenter.feed("Form No. 5 is in your email. ") == ["Form No. 5 is in your email."]
+
+
+def test_long_clause_is_emitted_before_its_sentence_ends():
+    segmenter = SentenceSegmenter(min_clause_chars=20)
+    segments = segmenter.feed("If you can come in this afternoon, we will take a look ")
+
+    assert segments == ["If you can come in this afternoon,"]
+    assert segmenter.pending == "we will take a look "
+
+
+def test_stream_stops_generation_at_sentence_limit():
+    """Reaching max_sentences closes the LLM stream instead of draining it."""
+    stream = TokenStream(REPLY, delay=0.002)
+    segments = collect(stream, max_sentences=2)
+
+    assert segments == [
+        "Oh no, I'm so sorry to hear that.",
+        "Dr. Patel has an opening at 3.30 today!",
+    ]
+    assert stream.closed
+    assert stream.produced < len(stream.tokens)
+    assert metrics_module.get_metrics().counter("segmenter.cutoffs") == 1
+
+
+def test_max_wait_flushes_complete_words():
+    """A stalled sentence is flushed up to its last whole word."""
+    stream = TokenStream("Let me check the schedule for you.", pauses={4: 0.2})
+    segments = collect(stream, max_wait_ms=30)
+
+    assert segments == ["Let me check the", "schedule for you."]
+    assert metrics_module.get_metrics().counter("segmenter.max_wait_flushes") == 1
+
+
+def test_first_segment_latency_is_recorded():
+    collect(TokenStream("Sure thing. See you then."))
+    assert metrics_module.get_metrics().histogram("segmenter.first_segment_ms")["count"] == 1
+
+
+class FailingProvider:
+    """Streams some words, then the connection drops."""
+
+    def __init__(self, text):
+        self.text = text
+
+    async def stream_response(self, prompt, system_prompt="", **kwargs):
+        for word in self.text.split():
+            yield word + " "
+        raise ConnectionError("inference server went away")
+
+
+def test_stream_error_reaches_the_consumer(caplog):
+    async def run():
+        segments = []
+        stream = FailingProvider("Dr. Patel is in today. She can see").stream_response("hi")
+        try:
+            async for segment in segment_stream(stream):
+                segments.append(segment)
+        except ConnectionError:
+            return segments
+        raise AssertionError("stream error was swallowed")
+
+    # The complete sentence is out; the unfinished one is dropped
+    assert asyncio.run(run()) == ["Dr. Patel is in today."]
+    assert metrics_module.get_metrics().counter("segmenter.stream_errors") == 1
+    assert "never retrieved" not in caplog.text
+
+
+def test_failed_reply_is_flagged_and_not_silent():
+    def session_for(text):
+        return CallSession(
+            incoming_number="+15550000000",
+            client_config={"profession": "dentist"},
+            prof_config={},
+            llm_provider=FailingProvider(text),
+            scoring=NoScoring(),
+            intents=None,
+            interim_intents=False,
+        )
+
+    async def ask(session):
+        return [segment async for segment in session.respond("are you open today")]
+
+    silent = session_for("")
+    assert asyncio.run(ask(silent)) == [REPLY_ERROR_RESPONSE]
+    assert silent.current_reply.degraded
+
+    partial = session_for("Yes, we are open until five. And")
+    assert asyncio.run(ask(partial)) == ["Yes, we are open until five."]
+    assert partial.current_reply.degraded
+    assert metrics_module.get_metrics().counter("llm.reply.errors") == 2
+
+
+@settings(max_examples=50, deadline=None)
+@given(
+    words=st.lists(st.sampled_from(["yes", "Dr.", "3.5", "today,", "now.", "ok?", "great!", "the"]), max_size=30),
+    cuts=st.lists(st.integers(min_value=0, max_value=200), max_size=10),
+)
+def test_segments_preserve_text_for_any_chunking(words, cuts):
+    """However the text is chunked, segments rejoin to the original words."""
+    text = " ".join(words)
+    boundaries = sorted(set(c for c in cuts if c < len(text))) + [len(text)]
+    segmenter = SentenceSegmenter(min_clause_chars=5)
+    segments, start = [], 0
+    for end in boundaries:
+        segments.extend(segmenter.feed(text[start:end]))
+        start = end
+    final = segmenter.flush()
+    if final:
+        segments.append(final)
+
+    assert " ".join(segments).split() == text.split()
@@ -0,0 +1,153 @@
+"""
+Tests for the vectorized intent scorer.
+Validates snapshot scoring against a reference cosine similarity and
+the top-k / aggregation / batch APIs.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st, settings, HealthCheck
+
+import services.logic.embedding_backends as backends_module
+import services.logic.semantic_scorer as scorer_module
+
+IntentSnapshot = scorer_module.IntentSnapshot
+SemanticIntentScorer = scorer_module.SemanticIntentScorer
+
+
+class TableModel:
+    """Embedding model backed by a fixed text -> vector table."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def encode(self, texts):
+        return np.array([self.table[text] for text in texts], dtype=np.float32)
+
+
+def reference_cosine(query, matrix):
+    query = query / np.linalg.norm(query)
+    matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix @ query
+
+
+@settings(max_examples=50, suppress_health_check=[HealthCheck.too_slow])
+@given(
+    num_phrases=st.integers(min_value=1, max_value=40),
+    num_intents=st.integers(min_value=1, max_value=6),
+    seed=st.integers(min_value=0, max_value=2**16),
+)
+def test_snapshot_matches_reference_cosine(num_phrases, num_intents, seed):
+    """Best label and score equal a brute-force cosine argmax."""
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((num_phrases, 16))
+    labels = tuple(f"I{rng.integers(num_intents)}" for _ in range(num_phrases))
+    query = rng.standard_normal(16)
+
+    snapshot = IntentSnapshot(labels=labels, embeddings=embeddings)
+    label, score = snapshot.score_vector(query[None, :], threshold=-1.0)
+
+    sims = reference_cosine(query, embeddings)
+    assert score == pytest.approx(sims.max(), abs=1e-5)
+    # Ties aside, the winning intent owns the most similar phrase
+    label_sims = [sims[i] for i, phrase_label in enumerate(labels) if phrase_label == label]
+    assert max(label_sims) == pytest.approx(sims.max(), abs=1e-5)
+
+
+def test_snapshot_groups_interleaved_labels():
+    """Phrases are regrouped by intent and stored normalized as float32."""
+    embeddings = np.array([[1, 0], [0, 2], [3, 0], [0, 1]], dtype=np.float64)
+    snapshot = IntentSnapshot(labels=("A", "B", "A", "B"), embeddings=embeddings)
+
+    assert snapshot.intent_names == ("A", "B")
+    assert snapshot.labels == ("A", "A", "B", "B")
+    assert snapshot.embeddings.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(snapshot.embeddings, axis=1), 1.0, rtol=1e-6)
+    assert not snapshot.embeddings.flags.writeable
+
+
+def test_top_k_max_and_mean_aggregation():
+    """Max ranks by best phrase, mean by the intent's phrase average."""
+    table = {
+        "spiky": [1.0, 0.0, 0.0],
+        "broad": [0.8, 0.6, 0.0],
+        "other": [0.0, 0.0, 1.0],
+        "query": [1.0, 0.0, 0.0],
+    }
+    scorer = SemanticIntentScorer(model=TableModel(table))
+    # SPIKY has one perfect phrase and one orthogonal one; BROAD two decent ones
+    table["spiky-miss"] = [0.0, 1.0, 0.0]
+    snapshot = scorer.build_snapshot({
+        "SPIKY": ["spiky", "spiky-miss"],
+        "BROAD": ["broad", "broad"],
+        "OTHER": ["other"],
+    })
+
+    by_max = scorer.top_k("query", k=2, aggregation="max", snapshot=snapshot)
+    assert [m.label for m in by_max] == ["SPIKY", "BROAD"]
+    assert by_max[0].score == pytest.approx(1.0)
+    assert by_max[0].mean == pytest.approx(0.5)
+
+    by_mean = scorer.top_k("query", k=3, aggregation="mean", snapshot=snapshot)
+    assert [m.label for m in by_mean] == ["BROAD", "SPIKY", "OTHER"]
+
+    with pytest.raises(ValueError):
+        scorer.top_k("query", aggregation="median", snapshot=snapshot)
+
+
+def test_score_many_matches_single_scores():
+    """Batch scoring returns the same results as scoring one at a time."""
+    rng = np.random.default_rng(7)
+    table = {f"t{i}": rng.standard_normal(8) for i in range(12)}
+    scorer = SemanticIntentScorer(model=TableModel(table))
+    scorer.register_intents({"A": ["t0", "t1", "t2"], "B": ["t3", "t4"]})
+
+    texts = [f"t{i}" for i in range(5, 12)] + ["t0"]
+    batch = scorer.score_many(texts, threshold=0.3)
+    single = [scorer.score(text, threshold=0.3) for text in texts]
+
+    assert [label for label, _ in batch] == [label for label, _ in single]
+    np.testing.assert_allclose([s for _, s in batch], [s for _, s in single], rtol=1e-6)
+    assert batch[-1] == ("A", pytest.approx(1.0))
+
+
+def test_no_model_returns_none():
+    """A scorer whose model failed to load never matches."""
+    scorer = SemanticIntentScorer(model=None)
+    scorer.model = None
+    assert scorer.score("hello") == ("None", 0.0)
+    assert scorer.score_many(["a", "b"]) == [("None", 0.0), ("None", 0.0)]
+    assert scorer.top_k("hello") == []
+
+
+def test_backend_falls_back_to_torch(monkeypatch):
+    """A failing quantized backend falls back to the full-precision path."""
+    loaded = []
+
+    def broken(model_name, onnx_file=""):
+        raise RuntimeError("onnxruntime missing")
+
+    def reference(model_name, onnx_file=""):
+        loaded.append(model_name)
+        return TableModel({})
+
+    monkeypatch.setitem(backends_module.BACKENDS, "onnx", broken)
+    monkeypatch.setitem(backends_module.BACKENDS, "torch", reference)
+
+    model = scorer_module.load_embedding_model("mini", backend="onnx", max_seq_length=32)
+
+    assert isinstance(model, TableModel)
+    assert model.max_seq_length == 32
+    assert loaded == ["mini"]
+
+
+def test_unknown_backend_is_rejected():
+    """Backend names are validated before loading anything."""
+    with pytest.raises(ValueError):
+        backends_module.load_backend_model("mini", backend="tpu")
@@ -0,0 +1,153 @@
+"""
+Tests for speculative LLM generation on stable interim transcripts.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+
+import services.metrics as metrics_module
+import services.logic.keyword_matcher as matcher_module
+import services.llm.prompt as prompt_module
+
+from agent.context import ContextBuilder
+from agent.session import CallSession, EMERGENCY_RESPONSE
+from tests.conftest import FakeLLMProvider, NoScoring
+
+STABLE_MS = 10.0
+
+
+def make_session(provider, context=None):
+    return CallSession(
+        incoming_number="+15550000000",
+        client_config={"profession": "dentist"},
+        prof_config={},
+        llm_provider=provider,
+        scoring=NoScoring(),
+        intents=None,
+        keywords=matcher_module.KeywordMatcher({"EMERGENCY": ["bleeding"]}),
+        speculative_stable_ms=STABLE_MS,
+        context=context,
+    )
+
+
+def counter(name):
+    return metrics_module.get_metrics().counter(f"speculative.dentist.{name}")
+
+
+def test_matching_final_reuses_speculative_stream():
+    """A stable interim that matches the final transcript costs one LLM call."""
+    provider = FakeLLMProvider(delay=0.005)
+    session = make_session(provider)
+
+    async def run_test():
+        await session.on_interim_transcript("I need a cleaning")
+        await asyncio.sleep(STABLE_MS / 1000 * 4)
+        return " ".join([c async for c in session.respond("I need a cleaning.")])
+
+    assert asyncio.run(run_test()) == "reply to I need a cleaning"
+    assert provider.prompts == ["I need a cleaning"]
+    assert counter("started") == 1
+    assert counter("hits") == 1
+    assert metrics_module.get_metrics().histogram("speculative.dentist.ttfa_saved_ms")["count"] == 1
+
+
+def test_unstable_interims_do_not_start_generation():
+    """Interims that keep changing inside the window never reach the LLM."""
+    provider = FakeLLMProvider(delay=0.005)
+    session = make_session(provider)
+
+    async def run_test():
+        for text in ("I", "I need", "I need a", "I need a cleaning"):
+            await session.on_interim_transcript(text)
+        return " ".join([c async for c in session.respond("I need a cleaning")])
+
+    assert asyncio.run(run_test()) == "reply to I need a cleaning"
+    assert provider.prompts == ["I need a cleaning"]
+    assert counter("started") == 0
+
+
+def test_mismatched_final_discards_speculation():
+    """A different final transcript cancels the speculation and counts waste."""
+    provider = FakeLLMProvider(delay=0.001)
+    session = make_session(provider)
+
+    async def run_test():
+        await session.on_interim_transcript("I need a")
+        await asyncio.sleep(STABLE_MS / 1000 * 4)
+        return " ".join([c async for c in session.respond("I need a filling")])
+
+    assert asyncio.run(run_test()) == "reply to I need a filling"
+    assert provider.prompts == ["I need a", "I need a filling"]
+    assert counter("mismatch") == 1
+    assert counter("wasted_tokens") > 0
+
+
+def test_superseding_interim_discards_speculation():
+    """New words after speculation started restart the stability window."""
+    provider = FakeLLMProvider(delay=0.005)
+    session = make_session(provider)
+
+    async def run_test():
+        await session.on_interim_transcript("can I book")
+        await asyncio.sleep(STABLE_MS / 1000 * 4)
+        await session.on_interim_transcript("can I book for Friday")
+        await asyncio.sleep(STABLE_MS / 1000 * 4)
+        return " ".join([c async for c in session.respond("can I book for Friday")])
+
+    assert asyncio.run(run_test()) == "reply to can I book for Friday"
+    assert provider.prompts == ["can I book", "can I book for Friday"]
+    assert counter("superseded") == 1
+    assert counter("hits") == 1
+
+
+def test_emergency_cancels_speculation():
+    """The keyword fast path answers directly and drops the speculative stream."""
+    provider = FakeLLMProvider(delay=0.005)
+    session = make_session(provider)
+
+    async def run_test():
+        await session.on_interim_transcript("my gums are bleeding")
+        await asyncio.sleep(STABLE_MS / 1000 * 4)
+        return [c async for c in session.respond("my gums are bleeding")]
+
+    assert asyncio.run(run_test()) == [EMERGENCY_RESPONSE]
+    assert counter("unused") == 1
+
+
+def test_committed_utterance_keeps_speculation_fresh():
+    """Recording the caller's own utterance does not make its stream stale."""
+    provider = FakeLLMProvider(delay=0.005)
+    session = make_session(provider, ContextBuilder(prompt_module.TokenCounter()))
+
+    async def run_test():
+        await session.on_interim_transcript("I need a cleaning")
+        await asyncio.sleep(STABLE_MS / 1000 * 4)
+        session.add_caller_message("I need a cleaning")
+        return " ".join([c async for c in session.respond("I need a cleaning")])
+
+    assert asyncio.run(run_test()) == "reply to I need a cleaning"
+    assert provider.prompts == ["I need a cleaning"]
+    assert counter("hits") == 1
+
+
+def test_context_change_discards_speculation():
+    """A turn committed after speculation started means the stream's context is stale."""
+    provider = FakeLLMProvider(delay=0.005)
+    session = make_session(provider, ContextBuilder(prompt_module.TokenCounter()))
+
+    async def run_test():
+        await session.on_interim_transcript("is Friday free")
+        await asyncio.sleep(STABLE_MS / 1000 * 4)
+        session.add_agent_message("We are closed on Fridays.")
+        session.add_caller_message("is Friday free")
+        return " ".join([c async for c in session.respond("is Friday free")])
+
+    assert asyncio.run(run_test()) == "reply to is Friday free"
+    assert provider.prompts == ["is Friday free", "is Friday free"]
+    assert "closed on Fridays" in provider.contexts["is Friday free"]
+    assert counter("stale") == 1
+    assert counter("hits") == 0
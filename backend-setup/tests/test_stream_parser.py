@@ -0,0 +1,110 @@
+"""
+Tests for the incremental SSE / LLM token stream parser, against recorded
+stream fixtures from each supported server.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+import services.metrics as metrics_module
+import services.llm.stream_parser as parser_module
+
+SSEDecoder = parser_module.SSEDecoder
+TokenStreamParser = parser_module.TokenStreamParser
+StreamError = parser_module.StreamError
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'llm_streams')
+EXPECTED_TEXT = 'Sure, we call it "same-day" care — see you at 3.'
+FIXTURES = {
+    "tgwui.sse": "tgwui",
+    "tgi.sse": "tgi",
+    "openai_chat.sse": "openai",
+    "openai_completions.sse": "openai",
+}
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def parse_chunks(chunks, schema="auto"):
+    parser = TokenStreamParser(schema=schema)
+    tokens = []
+    for chunk in chunks:
+        tokens.extend(parser.feed(chunk))
+    tokens.extend(parser.flush())
+    return parser, tokens
+
+
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_fixture_streams_decode_exactly(name):
+    """Escaped quotes, non-ASCII text and end markers survive intact."""
+    parser, tokens = parse_chunks([read_fixture(name)])
+
+    assert "".join(tokens) == EXPECTED_TEXT
+    assert parser.schema == FIXTURES[name]
+    assert parser.malformed == 0
+
+
+@settings(max_examples=100, deadline=None)
+@given(name=st.sampled_from(sorted(FIXTURES)), cuts=st.lists(st.integers(min_value=0), max_size=40))
+def test_any_chunking_gives_the_same_tokens(name, cuts):
+    """Network chunk boundaries (even mid UTF-8 character) don't change the output."""
+    raw = read_fixture(name)
+    points = sorted({c % (len(raw) + 1) for c in cuts})
+    chunks = [raw[a:b] for a, b in zip([0] + points, points + [len(raw)])]
+
+    _, tokens = parse_chunks(chunks)
+    _, whole = parse_chunks([raw])
+
+    assert tokens == whole
+
+
+def test_malformed_events_are_counted_not_silent():
+    raw = (
+        b'data: {"text": "Hello"}\n\n'
+        b'data: {"text": "broken\n\n'
+        b'data: {"text": " there"}\n\n'
+    )
+    parser, tokens = parse_chunks([raw])
+
+    assert tokens == ["Hello", " there"]
+    assert parser.malformed == 1
+    assert metrics_module.get_metrics().counter("llm.stream.malformed_events") == 1
+
+
+def test_error_event_raises():
+    raw = b'data: {"text": "Hi"}\n\ndata: {"error": "Input validation error: too long"}\n\n'
+    parser = TokenStreamParser()
+
+    with pytest.raises(StreamError, match="too long"):
+        parser.feed(raw)
+
+
+def test_decoder_handles_multiline_data_event_types_and_comments():
+    decoder = SSEDecoder()
+    events = decoder.feed(
+        b": ping\r\n"
+        b"event: update\r\n"
+        b"data: line one\r\n"
+        b"data:line two\r\n"
+        b"\r\n"
+        b"data: tail"
+    )
+    events += decoder.flush()
+
+    assert events == [(b"update", b"line one\nline two"), (b"message", b"tail")]
+
+
+def test_forced_schema_skips_detection():
+    raw = b'data: {"token": {"id": 1, "text": "Hi", "special": false}, "text": "ignored"}\n\n'
+    _, tokens = parse_chunks([raw], schema="tgi")
+
+    assert tokens == ["Hi"]
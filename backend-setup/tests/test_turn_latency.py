@@ -0,0 +1,169 @@
+"""
+Tests for per-turn latency spans and their per-call roll-up.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import sqlite3
+
+import pytest
+
+import services.metrics as metrics_module
+
+from agent.latency import (
+    END_OF_SPEECH,
+    FINAL_TRANSCRIPT,
+    FIRST_AUDIO,
+    FIRST_TOKEN,
+    LAST_AUDIO,
+    CallLatency,
+)
+from agent.session import CallSession
+from tests.conftest import FakeClock
+
+
+def play_turn(latency, clock, start, stt, llm, tts, playout):
+    """Feed one turn's events, each span in seconds after the previous event."""
+    clock.now = start
+    for event, gap in (
+        (END_OF_SPEECH, 0), (FINAL_TRANSCRIPT, stt), (FIRST_TOKEN, llm),
+        (FIRST_AUDIO, tts), (LAST_AUDIO, playout),
+    ):
+        clock.now += gap
+        latency.mark(event)
+
+
+def test_turn_spans_roll_up_into_call_columns():
+    clock = FakeClock()
+    latency = CallLatency(clock=clock)
+    play_turn(latency, clock, 10.0, stt=0.100, llm=0.400, tts=0.150, playout=2.0)
+    play_turn(latency, clock, 20.0, stt=0.200, llm=0.600, tts=0.050, playout=1.0)
+
+    first, second = latency.turn_records()
+    assert first["turn"] == 0 and second["turn"] == 1
+    assert first["stt_ms"] == pytest.approx(100)
+    assert first["llm_ms"] == pytest.approx(400)
+    assert first["tts_ms"] == pytest.approx(150)
+    assert first["response_ms"] == pytest.approx(650)
+    assert first["playout_ms"] == pytest.approx(2000)
+
+    summary = latency.call_summary()
+    assert summary["stt_latency_ms"] == pytest.approx(150)
+    assert summary["llm_latency_ms"] == pytest.approx(500)
+    assert summary["tts_latency_ms"] == pytest.approx(100)
+
+    metrics = metrics_module.get_metrics()
+    assert metrics.histogram("turn.response_ms")["count"] == 2
+    assert metrics.histogram("turn.llm_ms")["max"] == pytest.approx(600)
+
+
+def test_event_ordering_edge_cases():
+    clock = FakeClock()
+    latency = CallLatency(clock=clock)
+
+    # Greeting audio before the caller says anything is not a turn
+    latency.mark(FIRST_AUDIO)
+    latency.mark(LAST_AUDIO)
+
+    # Caller pauses and goes on: the last end of speech counts
+    clock.now = 5.0
+    latency.mark(END_OF_SPEECH)
+    clock.now = 6.0
+    latency.mark(END_OF_SPEECH)
+    # Transcript final before the VAD endpoint: no STT wait
+    clock.now = 5.9
+    latency.mark(FINAL_TRANSCRIPT)
+    clock.now = 6.5
+    latency.mark(FIRST_TOKEN)
+    clock.now = 6.7
+    latency.mark(FIRST_AUDIO)
+
+    # Caller barges in before the agent finishes: the next turn starts
+    clock.now = 8.0
+    latency.mark(END_OF_SPEECH)
+    # ...but the agent never answers it
+    latency.close()
+
+    (record,) = latency.turn_records()
+    assert record["stt_ms"] == 0.0
+    assert record["response_ms"] == pytest.approx(700)
+    assert record["playout_ms"] is None
+    assert latency.call_summary()["llm_latency_ms"] == pytest.approx(600)
+    assert CallLatency().call_summary() == {
+        "stt_latency_ms": None, "llm_latency_ms": None, "tts_latency_ms": None,
+    }
+
+
+class FakeScoring:
+    async def score(self, text, threshold=0.75, snapshot=None):
+        return ("TEMPLATE:hours", 0.9) if "open" in text else ("None", 0.0)
+
+
+class SlowProvider:
+    async def stream_response(self, prompt, system_prompt="", **kwargs):
+        await asyncio.sleep(0.02)
+        yield "Sure, "
+        yield "Tuesday works."
+
+
+def test_session_marks_first_token():
+    session = CallSession(
+        incoming_number="+15550000000",
+        client_config={"name": "bright-smile", "profession": "dentist"},
+        prof_config={},
+        llm_provider=SlowProvider(),
+        scoring=FakeScoring(),
+        intents=None,
+        interim_intents=False,
+        templates={"TEMPLATE:hours": "We're open eight to five."},
+    )
+
+    async def turn(text):
+        session.latency.mark(FINAL_TRANSCRIPT)
+        async for _ in session.respond(text):
+            pass
+        session.latency.mark(FIRST_AUDIO)
+
+    asyncio.run(turn("Can I come Tuesday?"))
+    asyncio.run(turn("When are you open?"))
+    session.close()
+
+    llm_turn, template_turn = session.latency.turn_records()
+    # First LLM token, not the end of the reply
+    assert 15 <= llm_turn["llm_ms"] < 500
+    # Fixed replies count as ready once the text is chosen
+    assert template_turn["llm_ms"] < 20
+
+
+def test_latencies_are_logged_per_call_and_per_turn(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # analytics.db creates its database on import
+    import analytics.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "data" / "analytics.db")
+    db.init_db()
+
+    clock = FakeClock()
+    latency = CallLatency(clock=clock)
+    for i in range(20):
+        play_turn(latency, clock, 10.0 * i, stt=0.1, llm=0.2 + 0.01 * i, tts=0.1, playout=1.0)
+
+    asyncio.run(db.log_call_to_db(
+        "bright-smile", 200, "", "dentist",
+        **latency.call_summary(),
+        turn_latencies=latency.turn_records(),
+    ))
+
+    conn = sqlite3.connect(db.DB_PATH)
+    row = conn.execute("SELECT stt_latency_ms, llm_latency_ms, tts_latency_ms FROM calls").fetchone()
+    conn.close()
+    assert row == pytest.approx((100, 295, 100))
+
+    report = db.get_latency_report("bright-smile")
+    assert report["llm_ms"]["count"] == 20
+    assert report["llm_ms"]["p50"] == pytest.approx(300)
+    assert report["llm_ms"]["p95"] == pytest.approx(380)
+    assert db.get_latency_report("cool-air")["llm_ms"]["count"] == 0
@@ -0,0 +1,200 @@
+"""
+Tests for worker load reporting and call admission.
+"""
+import sys
+import os
+
+# Add backend-setup to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import json
+import multiprocessing
+import time
+
+import pytest
+
+import services.metrics as metrics_module
+
+from agent.worker_load import LOAD_DIR_ENV, WorkerLoad, read_cpu_times
+from tests.conftest import FakeClock
+
+
+class FakeCPU:
+    """(busy, total) counters advanced by the test."""
+
+    def __init__(self):
+        self.busy = 0.0
+        self.total = 0.0
+
+    def __call__(self):
+        return self.busy, self.total
+
+    def advance(self, busy, total):
+        self.busy += busy
+        self.total += total
+
+
+def make_load(clock=None, cpu=None, **limits):
+    return WorkerLoad(
+        max_calls=limits.get("max_calls", 10),
+        max_loop_lag_ms=limits.get("max_loop_lag_ms", 50.0),
+        max_cpu_percent=limits.get("max_cpu_percent", 80.0),
+        load_threshold=limits.get("load_threshold", 1.0),
+        clock=clock or FakeClock(),
+        cpu_reader=cpu or FakeCPU(),
+    )
+
+
+def test_load_is_the_most_saturated_signal():
+    clock = FakeClock()
+    cpu = FakeCPU()
+    load = make_load(clock=clock, cpu=cpu)
+
+    for _ in range(3):
+        load.call_started()
+    cpu.advance(busy=20, total=100)
+    assert load.load() == pytest.approx(0.3)  # 3 of 10 calls; CPU 20% of 80%
+
+    cpu.advance(busy=60, total=100)
+    assert load.load() == pytest.approx(0.75)  # CPU 60% of 80%
+
+    load.record_lag(50.0)
+    assert load.load() == 1.0
+    assert not load.accepting()
+
+    clock.now = 6.0  # The lag spike leaves the window
+    load.call_finished()
+    metrics = metrics_module.get_metrics()
+    assert metrics.gauge("worker.active_calls") == 2
+    # Too soon for a new CPU reading: the last one stands
+    assert load.load() == pytest.approx(0.75)
+    assert metrics.gauge("worker.load.cpu_percent") == pytest.approx(60)
+    assert load.accepting()
+
+
+def test_reported_active_jobs_replace_the_process_count():
+    load = make_load(max_calls=4)
+    assert load.load(active_calls=4) == 1.0
+    assert not load.accepting()
+
+    load.call_finished()
+    assert load.accepting()
+
+
+def test_loop_lag_window():
+    clock = FakeClock()
+    load = make_load(clock=clock)
+
+    load.record_lag(40.0)
+    clock.now = 2.0
+    load.record_lag(5.0)
+    assert load.loop_lag_ms() == 40.0
+    assert load.load() == pytest.approx(0.8)
+
+    # The spike ages out of the 5s window
+    clock.now = 6.0
+    assert load.loop_lag_ms() == 5.0
+    clock.now = 8.0
+    assert load.load() == 0.0
+
+
+def test_draining_worker_refuses_calls_and_reports_full():
+    load = make_load(load_threshold=0.9)
+    load.call_started()
+    assert load.accepting()
+
+    load.drain()
+    assert load.load() == 1.0
+    assert not load.accepting()
+    # Running calls still finish and are counted down
+    load.call_finished()
+    assert load.active_calls == 0
+
+
+def test_sampler_measures_a_blocked_event_loop():
+    load = WorkerLoad(lag_interval_ms=10.0, cpu_reader=lambda: None)
+
+    async def run():
+        load.ensure_sampler()
+        load.ensure_sampler()  # One sampler per process
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # Blocking work on the loop
+        await asyncio.sleep(0.02)
+        load._sampler.cancel()
+
+    asyncio.run(run())
+    assert load.loop_lag_ms() >= 50
+
+
+def test_read_cpu_times(tmp_path):
+    stat = tmp_path / "stat"
+    stat.write_text("cpu  100 0 50 800 50 0 0 0 0 0\ncpu0 1 2 3 4\n")
+    assert read_cpu_times(str(stat)) == (150, 1000)
+    assert read_cpu_times(str(tmp_path / "missing")) is None
+
+
+def run_job_process(report_dir, blocked, done):
+    """A LiveKit job process with one blocking stall."""
+    load = WorkerLoad(lag_interval_ms=10.0, report_interval_ms=20.0, cpu_reader=lambda: None)
+
+    async def run():
+        load.publish(report_dir)
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # Blocking work on the job's loop
+        await asyncio.sleep(0.05)
+        blocked.set()
+        while not done.is_set():
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+
+def test_main_process_load_includes_job_processes(tmp_path, monkeypatch):
+    """load_fnc runs in the main process; calls run in job processes."""
+    monkeypatch.delenv(LOAD_DIR_ENV, raising=False)
+    main = make_load(max_loop_lag_ms=1000.0)
+    report_dir = main.collect(str(tmp_path))
+    assert os.environ[LOAD_DIR_ENV] == str(report_dir)
+
+    ctx = multiprocessing.get_context("spawn")
+    blocked, done = ctx.Event(), ctx.Event()
+    job = ctx.Process(target=run_job_process, args=(os.environ[LOAD_DIR_ENV], blocked, done))
+    job.start()
+    try:
+        assert blocked.wait(30)
+        time.sleep(0.1)  # Next report after the stall
+        assert main.signals()["loop_lag_ms"] >= 100
+        assert main.load(active_calls=1) >= 0.1  # The job's lag outweighs 1 of 10 calls
+    finally:
+        done.set()
+        job.join(30)
+
+    # The job process exited: its report no longer counts
+    assert main.signals()["loop_lag_ms"] == 0.0
+    assert list(report_dir.glob("*.json")) == []
+
+
+def test_stale_job_report_counts_as_loop_lag(tmp_path, monkeypatch):
+    monkeypatch.delenv(LOAD_DIR_ENV, raising=False)
+    main = make_load(max_loop_lag_ms=1000.0)
+    report_dir = main.collect(str(tmp_path))
+
+    # A live job whose loop has not run for 3s cannot write its report
+    report = {"loop_lag_ms": 5.0, "time": time.time() - 3.0}
+    (report_dir / f"{os.getpid()}.json").write_text(json.dumps(report))
+
+    assert main.signals()["loop_lag_ms"] >= 2000
+    assert main.load() == 1.0
+
+
+def test_collect_removes_reports_of_exited_workers(tmp_path, monkeypatch):
+    monkeypatch.delenv(LOAD_DIR_ENV, raising=False)
+    exited = multiprocessing.get_context("spawn").Process(target=time.sleep, args=(0,))
+    exited.start()
+    exited.join()
+    (tmp_path / str(exited.pid)).mkdir()
+
+    report_dir = make_load().collect(str(tmp_path))
+
+    assert [p.name for p in tmp_path.iterdir()] == [report_dir.name]